@@ -0,0 +1,4 @@
+"""Micro-benchmarks for pipeline hot paths.
+
+Run from the ``iptv-data`` directory, e.g. ``python -m benchmarks.process_channels``.
+"""
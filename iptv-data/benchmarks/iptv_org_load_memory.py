@@ -0,0 +1,81 @@
+"""Measure peak traced memory of a full IPTV-org load over local HTTP.
+
+A local aiohttp server serves the synthetic upstream (or a stored snapshot),
+so the body download, decoding and filtering all run as they would live.
+
+Usage:
+    python -m benchmarks.iptv_org_load_memory [--snapshot PATH] [--countries IN,US,GB]
+        [--latency-ms 0]
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import time
+import tracemalloc
+
+from aiohttp import web
+
+from src.loaders.iptv_org_loader import IptvOrgLoader
+from src.utils.config import SourceConfig
+
+from .upstream import load_payloads
+
+
+async def _run(args: argparse.Namespace) -> None:
+    payloads = load_payloads(args.snapshot)
+    bodies = {endpoint: json.dumps(rows).encode() for endpoint, rows in payloads.items()}
+    del payloads
+
+    async def serve(request: web.Request) -> web.Response:
+        await asyncio.sleep(args.latency_ms / 1000)
+        return web.Response(
+            body=bodies[request.match_info["endpoint"]], content_type="application/json"
+        )
+
+    app = web.Application()
+    app.router.add_get("/{endpoint}.json", serve)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+
+    targets = [country.strip().upper() for country in args.countries.split(",") if country]
+    loader = IptvOrgLoader(
+        SourceConfig(enabled=True, base_url=f"http://127.0.0.1:{port}"),
+        target_countries=targets,
+        keep_snapshot=args.keep_snapshot,
+    )
+    try:
+        gc.collect()
+        tracemalloc.start()
+        started = time.perf_counter()
+        channels = await loader.load()
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        await runner.cleanup()
+
+    print(
+        f"upstream_mib={sum(map(len, bodies.values())) / 2**20:.1f} "
+        f"channels_out={len(channels)} peak_mib={peak / 2**20:.1f} seconds={elapsed:.2f}"
+    )
+
+
+def main() -> None:
+    """Report the traced peak of ``IptvOrgLoader.load``."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--snapshot", help="Stored IPTV-org snapshot (default: synthetic)")
+    parser.add_argument("--countries", default="IN,US,GB", help="Comma-separated targets")
+    parser.add_argument(
+        "--keep-snapshot", action="store_true", help="Keep every row (no country pushdown)"
+    )
+    parser.add_argument("--latency-ms", type=float, default=0, help="Upstream response delay")
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
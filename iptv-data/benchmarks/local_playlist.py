@@ -0,0 +1,63 @@
+"""Benchmark loading a large aggregated playlist from local disk.
+
+Usage:
+    python -m benchmarks.local_playlist [--copies 20] [--files 1] [--playlist PATH]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from src.loaders.local_loader import LocalFileLoader
+from src.utils.config import SourceConfig
+
+from .m3u_parser import DEFAULT_PLAYLIST
+
+
+async def _stream(loader: LocalFileLoader) -> int:
+    count = 0
+    async for _ in loader.iter_channels():
+        count += 1
+    return count
+
+
+def main() -> None:
+    """Report load time and parser memory for ``--copies`` concatenated playlists."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--playlist", type=Path, default=DEFAULT_PLAYLIST)
+    parser.add_argument("--copies", type=int, default=20)
+    parser.add_argument("--files", type=int, default=1, help="Files the copies are split into")
+    args = parser.parse_args()
+
+    body = args.playlist.read_bytes()
+    with tempfile.TemporaryDirectory() as directory:
+        for file in range(args.files):
+            with open(Path(directory) / f"aggregated-{file:03d}.m3u", "wb") as f:
+                for _ in range(file, args.copies, args.files):
+                    f.write(body)
+        del body
+        size_mib = sum(path.stat().st_size for path in Path(directory).iterdir()) / 2**20
+        loader = LocalFileLoader(SourceConfig(enabled=True, paths=[directory]))
+
+        started = time.perf_counter()
+        channels = asyncio.run(loader.load())
+        elapsed = time.perf_counter() - started
+        count = len(channels)
+        del channels
+
+        # Streamed without keeping channels: what parsing itself holds.
+        tracemalloc.start()
+        asyncio.run(_stream(loader))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    print(f"playlist: {size_mib:.1f} MiB, {count} channels")
+    print(f"load seconds={elapsed:.2f} mib_per_sec={size_mib / elapsed:.1f}")
+    print(f"streaming parse peak_mib={peak / 2**20:.1f}")
+
+
+if __name__ == "__main__":
+    main()
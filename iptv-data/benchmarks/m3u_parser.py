@@ -0,0 +1,68 @@
+"""Benchmark M3U playlist parsing over the bundled IPTV-org index.
+
+Usage:
+    python -m benchmarks.m3u_parser [--playlist PATH] [--repeat 7]
+"""
+
+import argparse
+import gc
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+from src.loaders.m3u_loader import M3ULoader
+from src.utils.config import SourceConfig
+
+DEFAULT_PLAYLIST = Path(__file__).parents[1] / "fixtures" / "iptv-org" / "index.m3u"
+
+
+def main() -> None:
+    """Report parse throughput and allocations of ``M3ULoader._parse_m3u``."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--playlist", type=Path, default=DEFAULT_PLAYLIST)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    text = args.playlist.read_text(encoding="utf-8")
+    line_count = text.count("\n") + 1
+    extinf_lines = [line for line in text.splitlines() if line.startswith("#EXTINF:")]
+    loader = M3ULoader(SourceConfig(enabled=True))
+
+    def best_of(run: object) -> float:
+        timings = []
+        for _ in range(args.repeat):
+            gc.collect()
+            started = time.perf_counter()
+            run()  # type: ignore[operator]
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings)
+
+    parse_seconds = best_of(lambda: loader._parse_m3u(text))
+    extinf_seconds = best_of(lambda: [loader._parse_extinf(line) for line in extinf_lines])
+
+    gc.collect()
+    tracemalloc.start()
+    channels = loader._parse_m3u(text)
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.stop()
+
+    print(f"playlist: {line_count} lines, {len(extinf_lines)} EXTINF, {len(channels)} channels")
+    print(
+        f"parse_m3u median_ms={parse_seconds * 1000:.2f} "
+        f"lines_per_sec={line_count / parse_seconds:,.0f}"
+    )
+    print(
+        f"parse_extinf median_ms={extinf_seconds * 1000:.2f} "
+        f"lines_per_sec={len(extinf_lines) / extinf_seconds:,.0f}"
+    )
+    print(
+        f"allocations: retained_blocks={blocks} retained_mib={retained / 2**20:.1f} "
+        f"peak_mib={peak / 2**20:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Benchmark IPTV-org channel filtering and RawChannel construction.
+
+Usage:
+    python -m benchmarks.process_channels [--snapshot PATH] [--countries IN,US,GB]
+"""
+
+import argparse
+import gc
+import statistics
+import time
+
+from .upstream import load_payloads, loader_with
+
+
+def main() -> None:
+    """Time ``IptvOrgLoader._process_channels`` over one upstream payload."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--snapshot", help="Stored IPTV-org snapshot (default: synthetic)")
+    parser.add_argument("--countries", default="IN,US,GB", help="Comma-separated targets")
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    payloads = load_payloads(args.snapshot)
+    targets = [country.strip().upper() for country in args.countries.split(",") if country]
+    print(
+        f"upstream: {len(payloads['channels'])} channels, {len(payloads['streams'])} streams, "
+        f"{len(payloads['feeds'])} feeds, {len(payloads['logos'])} logos"
+    )
+
+    timings = []
+    produced = 0
+    for _ in range(args.repeat):
+        loader = loader_with(payloads, targets)
+        gc.collect()
+        started = time.perf_counter()
+        produced = len(loader._process_channels())
+        timings.append(time.perf_counter() - started)
+
+    print(
+        f"targets={','.join(targets)} channels_out={produced} "
+        f"median_ms={statistics.median(timings) * 1000:.2f} "
+        f"min_ms={min(timings) * 1000:.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
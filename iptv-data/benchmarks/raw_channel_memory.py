@@ -0,0 +1,42 @@
+"""Measure memory retained by the RawChannels built from the IPTV-org upstream.
+
+Usage:
+    python -m benchmarks.raw_channel_memory [--snapshot PATH] [--countries all|IN,US,GB]
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+from .upstream import load_payloads, loader_with
+
+
+def main() -> None:
+    """Report retained and peak allocation of ``_process_channels``."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--snapshot", help="Stored IPTV-org snapshot (default: synthetic)")
+    parser.add_argument("--countries", default="all", help="Comma-separated targets or 'all'")
+    args = parser.parse_args()
+
+    payloads = load_payloads(args.snapshot)
+    if args.countries == "all":
+        targets = sorted({str(row.get("country") or "").upper() for row in payloads["channels"]})
+    else:
+        targets = [country.strip().upper() for country in args.countries.split(",") if country]
+    loader = loader_with(payloads, targets)
+
+    gc.collect()
+    tracemalloc.start()
+    channels = loader._process_channels()
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"channels_out={len(channels)} retained_mib={retained / 2**20:.1f} "
+        f"peak_mib={peak / 2**20:.1f} bytes_per_channel={retained / max(1, len(channels)):.0f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Measure StreamHealthProcessor throughput with and without the HLS tier.
+
+A local stub serves an HLS master playlist per source; ``--hls-share`` of
+them advertise RESOLUTION and FRAME-RATE, the rest only BANDWIDTH. ffprobe
+is stood in for by a probe that takes ``--ffprobe-ms``, the wall time a real
+probe spends opening a live stream, so the figure is the stage's scheduling
+throughput rather than ffprobe's own speed.
+
+Usage:
+    python -m benchmarks.stream_health_throughput [--sources 400] [--hls]
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any
+
+from aiohttp import web
+
+from src.models import ProcessedChannel, StreamSource
+from src.processors.stream_health import StreamHealthProcessor
+from src.utils.config import StreamHealthConfig
+
+_FULL = (
+    '#EXT-X-STREAM-INF:BANDWIDTH=2500000,RESOLUTION=1280x720,FRAME-RATE=29.970,'
+    'CODECS="avc1.64001f,mp4a.40.2"\n720.m3u8\n'
+)
+_BARE = "#EXT-X-STREAM-INF:BANDWIDTH=2500000\n720.m3u8\n"
+
+
+async def _run(args: argparse.Namespace) -> None:
+    full = round(args.sources * args.hls_share)
+    ffprobe_calls = 0
+
+    async def serve(request: web.Request) -> web.Response:
+        await asyncio.sleep(args.latency_ms / 1000)
+        index = int(request.match_info["index"])
+        body = "#EXTM3U\n" + (_FULL if index < full else _BARE)
+        return web.Response(text=body, content_type="application/vnd.apple.mpegurl")
+
+    async def ffprobe(_url: str, _headers: dict[str, str], _timeout: float) -> dict[str, Any]:
+        nonlocal ffprobe_calls
+        ffprobe_calls += 1
+        await asyncio.sleep(args.ffprobe_ms / 1000)
+        video = {"codec_type": "video", "codec_name": "h264", "width": 1280, "height": 720}
+        return {"streams": [{**video, "avg_frame_rate": "30000/1001"}], "format": {}}
+
+    app = web.Application()
+    app.router.add_get("/{index}/master.m3u8", serve)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+
+    channels = [
+        ProcessedChannel(
+            id=f"c{index}",
+            name=f"Channel {index}",
+            stream_url=f"http://127.0.0.1:{port}/{index}/master.m3u8",
+            logo_url=None,
+            category="general",
+            country="IN",
+            language="en",
+            flavor="general",
+            group="General",
+            quality_urls={},
+            alt_names=[],
+            headers=None,
+            sources=["m3u"],
+            stream_sources=[
+                StreamSource(url=f"http://127.0.0.1:{port}/{index}/master.m3u8", health="unchecked")
+            ],
+        )
+        for index in range(args.sources)
+    ]
+    config = StreamHealthConfig(
+        enabled=True,
+        max_concurrent=args.concurrency,
+        global_budget_seconds=3600,
+        hls_probe=args.hls,
+    )
+    processor = StreamHealthProcessor(config, ffprobe)
+    try:
+        started = time.perf_counter()
+        _, summary = await processor.enrich(channels)
+        elapsed = time.perf_counter() - started
+    finally:
+        await runner.cleanup()
+
+    print(
+        f"sources={args.sources} hls={args.hls} available={summary.available} "
+        f"from_playlist={processor.playlist_probes} ffprobe={ffprobe_calls} "
+        f"seconds={elapsed:.2f} probes_per_sec={args.sources / elapsed:,.1f}"
+    )
+
+
+def main() -> None:
+    """Report sources inspected per second by ``StreamHealthProcessor.enrich``."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sources", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=4, help="ffprobe slots")
+    parser.add_argument("--ffprobe-ms", type=float, default=1500)
+    parser.add_argument("--latency-ms", type=float, default=50, help="playlist fetch time")
+    parser.add_argument("--hls-share", type=float, default=0.9, help="share with full attrs")
+    parser.add_argument("--hls", action="store_true", help="enable the HLS playlist tier")
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
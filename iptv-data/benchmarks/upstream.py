@@ -0,0 +1,116 @@
+"""Upstream payloads for benchmarks: a stored snapshot or a synthetic world."""
+
+import random
+import string
+from pathlib import Path
+from typing import Any
+
+from src.loaders.iptv_org_loader import ENDPOINTS, IptvOrgLoader
+from src.loaders.snapshot import read_snapshot
+from src.utils.config import SourceConfig
+
+COUNTRY_CODES = [a + b for a in string.ascii_uppercase for b in string.ascii_uppercase][:250]
+
+
+def synthetic_payloads(channel_count: int = 40_000, seed: int = 7) -> dict[str, list[Any]]:
+    """Build a deterministic, schema-valid payload shaped like the live API.
+
+    Channels are spread over 250 countries with one to four streams, one or
+    two feeds and one or two logos each, roughly the proportions upstream.
+    """
+    rnd = random.Random(seed)
+    channels: list[dict[str, Any]] = []
+    streams: list[dict[str, Any]] = []
+    feeds: list[dict[str, Any]] = []
+    logos: list[dict[str, Any]] = []
+    blocklist: list[dict[str, Any]] = []
+    for index in range(channel_count):
+        country = COUNTRY_CODES[index % len(COUNTRY_CODES)]
+        channel_id = f"Channel{index}.{country.lower()}"
+        channels.append(
+            {
+                "id": channel_id,
+                "name": f"Channel {index} HD",
+                "alt_names": [f"Ch {index}"],
+                "network": None,
+                "owners": [f"Owner {index % 97}"],
+                "country": country,
+                "categories": [rnd.choice(["news", "movies", "sports", "kids", "music"])],
+                "is_nsfw": index % 211 == 0,
+                "launched": None,
+                "closed": "2020-01-01" if index % 53 == 0 else None,
+                "replaced_by": (
+                    f"Channel{index + 1}.{COUNTRY_CODES[(index + 1) % 250].lower()}"
+                    if index % 89 == 0
+                    else None
+                ),
+                "website": f"https://channel{index}.example",
+            }
+        )
+        for feed_index in range(1 + index % 2):
+            feeds.append(
+                {
+                    "channel": channel_id,
+                    "id": "SD" if feed_index == 0 else "HD",
+                    "name": "Feed",
+                    "is_main": feed_index == 0,
+                    "broadcast_area": [f"c/{country}"],
+                    "timezones": ["Etc/UTC"],
+                    "languages": ["eng"],
+                    "format": "576i" if feed_index == 0 else "1080i",
+                }
+            )
+        for stream_index in range(1 + rnd.randrange(4)):
+            streams.append(
+                {
+                    "channel": channel_id,
+                    "feed": "SD" if stream_index == 0 else None,
+                    "title": f"Channel {index}",
+                    "url": f"https://cdn{index % 13}.example/{index}/{stream_index}.m3u8",
+                    "referrer": None,
+                    "user_agent": None,
+                    "quality": rnd.choice(["720p", "1080p", "480p", None]),
+                }
+            )
+        for logo_index in range(1 + index % 2):
+            logos.append(
+                {
+                    "channel": channel_id,
+                    "feed": None if logo_index == 0 else "HD",
+                    "tags": [],
+                    "width": 512,
+                    "height": 512,
+                    "format": "PNG",
+                    "in_use": True,
+                    "url": f"https://logos.example/{index}/{logo_index}.png",
+                }
+            )
+        if index % 307 == 0:
+            blocklist.append({"channel": channel_id, "reason": "dmca", "ref": "x"})
+    return {
+        "channels": channels,
+        "streams": streams,
+        "blocklist": blocklist,
+        "logos": logos,
+        "feeds": feeds,
+        "categories": [],
+        "countries": [{"code": code, "name": code} for code in COUNTRY_CODES],
+        "regions": [],
+        "languages": [],
+    }
+
+
+def load_payloads(snapshot: str | Path | None) -> dict[str, list[Any]]:
+    """Read ``snapshot`` if given, otherwise build the synthetic payload."""
+    if snapshot is None:
+        return synthetic_payloads()
+    return read_snapshot(snapshot, ENDPOINTS)
+
+
+def loader_with(
+    payloads: dict[str, list[Any]], target_countries: list[str]
+) -> IptvOrgLoader:
+    """Create an IPTV-org loader whose upstream state is already populated."""
+    loader = IptvOrgLoader(SourceConfig(enabled=True), target_countries=target_countries)
+    loader._apply_payloads(payloads)
+    return loader
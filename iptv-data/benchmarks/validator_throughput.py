@@ -0,0 +1,141 @@
+"""Measure StreamValidator throughput against local stub stream servers.
+
+Loopback connections cost no DNS lookup, TLS handshake or network round
+trip, so the connection count is the figure that carries over to real hosts.
+With ``--hosts`` above 1, one stub listens per host (told apart by port),
+``--skew`` of the channels sit on the first one, and a host answers 429
+with Retry-After once more than ``--host-limit`` of its requests are in
+flight, as a throttling CDN origin would. ``--capacity`` makes every request
+beyond that many in flight overall stall for ``--overload-ms``, as a
+saturated network would; ``--adaptive`` lets the validator find that
+ceiling with its AIMD concurrency limit, starting from ``--concurrency``.
+``--hung-share`` of the channels sit on one more host that accepts
+connections but never answers, as a blackholed origin would.
+``--cached`` validates twice through one validation cache (48h/6h TTLs) and
+reports the second, warm run.
+
+Usage:
+    python -m benchmarks.validator_throughput [--channels 2000] [--concurrency 50]
+    python -m benchmarks.validator_throughput --hosts 5 --skew 0.8 --host-limit 8
+    python -m benchmarks.validator_throughput --capacity 16 --latency-ms 20 [--adaptive]
+    python -m benchmarks.validator_throughput --latency-ms 20 --cached
+    python -m benchmarks.validator_throughput --hosts 5 --hung-share 0.2
+"""
+
+import argparse
+import asyncio
+import time
+
+from aiohttp import web
+
+from src.models import NormalizedChannel, SourceType
+from src.processors.validator import StreamValidator
+from src.utils.config import ValidationConfig
+from src.utils.validation_cache import ValidationCache
+
+
+async def _run(args: argparse.Namespace) -> None:
+    # Transports are kept (not their ids, which get reused) to count each once.
+    connections: set[object] = set()
+    in_flight: dict[str, int] = {}
+    throttled = 0
+
+    async def serve(request: web.Request) -> web.Response:
+        nonlocal throttled
+        connections.add(request.transport)
+        if request.match_info["stream"].startswith("hung"):
+            await asyncio.sleep(3600)
+        host = request.host
+        if args.host_limit and in_flight.get(host, 0) >= args.host_limit:
+            throttled += 1
+            return web.Response(status=429, headers={"Retry-After": "1"})
+        if args.capacity and sum(in_flight.values()) >= args.capacity:
+            # Dropped on the floor: the client only learns of it by timing out.
+            await asyncio.sleep(args.overload_ms / 1000)
+            return web.Response(status=503)
+        in_flight[host] = in_flight.get(host, 0) + 1
+        try:
+            await asyncio.sleep(args.latency_ms / 1000)
+        finally:
+            in_flight[host] -= 1
+        return web.Response(body=b"#EXTM3U\n", content_type="application/vnd.apple.mpegurl")
+
+    app = web.Application()
+    app.router.add_get("/{stream}.m3u8", serve)  # HEAD is answered from the GET route
+    runner = web.AppRunner(app, shutdown_timeout=0.1)
+    await runner.setup()
+    ports = []
+    for _ in range(args.hosts):
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        ports.append(site._server.sockets[0].getsockname()[1])  # type: ignore[union-attr]
+
+    hung_site = web.TCPSite(runner, "127.0.0.1", 0)
+    await hung_site.start()
+    hung_port = hung_site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+
+    hung = round(args.channels * args.hung_share)
+    served = args.channels - hung
+    clustered = round(served * args.skew) if args.hosts > 1 else served
+    channels = [
+        NormalizedChannel(
+            id=f"c{index}",
+            name=f"Channel {index}",
+            normalized_name=f"channel {index}",
+            stream_url=(
+                f"http://127.0.0.1:{hung_port}/hung{index}.m3u8"
+                if index >= served
+                else f"http://127.0.0.1:"
+                f"{ports[0 if index < clustered else 1 + index % (args.hosts - 1)]}"
+                f"/{index}.m3u8"
+            ),
+            source=SourceType.M3U,
+        )
+        for index in range(args.channels)
+    ]
+    config = ValidationConfig(
+        max_concurrent=args.concurrency, timeout_seconds=args.timeout, retry_once=False
+    )
+    if args.adaptive:
+        config.adaptive_concurrency = True
+    cache = ValidationCache(None, 48 * 3600, 6 * 3600) if args.cached else None
+    validator = StreamValidator(config, cache=cache)
+    try:
+        if cache is not None:
+            await validator.validate(channels)
+            connections.clear()
+        started = time.perf_counter()
+        _, dead = await validator.validate(channels)
+        elapsed = time.perf_counter() - started
+    finally:
+        await runner.cleanup()
+
+    print(
+        f"channels={len(channels)} hosts={args.hosts} dead={dead} throttled={throttled} "
+        f"connections={len(connections)} seconds={elapsed:.2f} "
+        f"validations_per_sec={len(channels) / elapsed:,.0f}"
+    )
+    if args.adaptive:
+        print(f"concurrency {validator.concurrency.summary()}")  # type: ignore[union-attr]
+
+
+def main() -> None:
+    """Report validations per second of ``StreamValidator.validate``."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--channels", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--hosts", type=int, default=1)
+    parser.add_argument("--skew", type=float, default=0.8, help="share on the first host")
+    parser.add_argument("--host-limit", type=int, default=0, help="in-flight before 429")
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--capacity", type=int, default=0, help="in-flight before stalls")
+    parser.add_argument("--overload-ms", type=float, default=1500)
+    parser.add_argument("--timeout", type=float, default=1)
+    parser.add_argument("--adaptive", action="store_true")
+    parser.add_argument("--cached", action="store_true", help="report a warm second run")
+    parser.add_argument("--hung-share", type=float, default=0, help="share on a hung host")
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,8 @@
 
 from .base_loader import BaseLoader
 from .iptv_org_loader import IptvOrgLoader
+from .local_loader import LocalFileLoader
 from .m3u_loader import M3ULoader
 
-__all__ = ["BaseLoader", "M3ULoader", "IptvOrgLoader"]
+__all__ = ["BaseLoader", "M3ULoader", "IptvOrgLoader", "LocalFileLoader"]
 
@@ -1,19 +1,43 @@
 """Base loader abstract class."""
 
+import asyncio
+import contextlib
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from contextlib import AbstractAsyncContextManager
+from typing import Any
 
 from ..models import RawChannel
 from ..utils.config import SourceConfig
+from ..utils.http_cache import HttpCache
 
 
 class BaseLoader(ABC):
     """Abstract base class for source loaders."""
 
-    def __init__(self, config: SourceConfig) -> None:
-        """Initialize loader with configuration."""
+    def __init__(
+        self,
+        config: SourceConfig,
+        http_cache: HttpCache | None = None,
+        fetch_slots: asyncio.Semaphore | None = None,
+    ) -> None:
+        """Initialize loader with configuration.
+
+        Args:
+            config: Source configuration.
+            http_cache: Shared upstream cache; requests go straight out without one.
+            fetch_slots: Pipeline-wide cap on concurrently loading source URLs.
+        """
         self.config = config
+        self.http_cache = http_cache or HttpCache(None)
+        self.fetch_slots = fetch_slots
         self._channels: list[RawChannel] = []
 
+    @property
+    def cache_max_age_seconds(self) -> float:
+        """Get how long a cached upstream body is served without revalidation."""
+        return self.config.cache_hours * 3600
+
     @property
     def is_enabled(self) -> bool:
         """Check if loader is enabled."""
@@ -24,6 +48,10 @@ class BaseLoader(ABC):
         """Get loader priority."""
         return self.config.priority
 
+    def fetch_slot(self) -> AbstractAsyncContextManager[Any]:
+        """Hold one pipeline-wide fetch slot while a source URL loads."""
+        return self.fetch_slots if self.fetch_slots is not None else contextlib.nullcontext()
+
     @abstractmethod
     async def load(self) -> list[RawChannel]:
         """Load channels from source.
@@ -36,6 +64,19 @@ class BaseLoader(ABC):
         """
         ...
 
+    async def iter_channels(self) -> AsyncIterator[RawChannel]:
+        """Yield channels from source as they become available.
+
+        Loaders that parse incrementally override this; the default yields the
+        result of ``load()`` once it completes. Channels are yielded in the
+        same order ``load()`` returns them.
+
+        Raises:
+            LoaderError: If loading fails.
+        """
+        for channel in await self.load():
+            yield channel
+
     @abstractmethod
     def get_source_name(self) -> str:
         """Get human-readable source name."""
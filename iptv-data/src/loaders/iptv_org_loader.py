@@ -1,21 +1,192 @@
 """IPTV-org API loader."""
 
-from typing import Any, cast
+import asyncio
+from collections.abc import AsyncGenerator, Iterator, MutableMapping
+from contextlib import aclosing
+from pathlib import Path
+from typing import Any
 
 import aiohttp
 
 from ..models import ChannelHeaders, RawChannel, SourceType
 from ..utils import get_logger
 from ..utils.config import SourceConfig
+from ..utils.delta import DeltaState, content_hash
+from ..utils.http_cache import HttpCache
+from ..utils.json_stream import iter_json_array
 from .base_loader import BaseLoader, LoaderError
+from .snapshot import SnapshotError, read_snapshot, write_snapshot
 
 logger = get_logger(__name__)
 
+CORE_ENDPOINTS = ("channels", "streams", "blocklist", "logos", "feeds")
+TAXONOMY_ENDPOINTS = ("categories", "countries", "regions", "languages")
+ENDPOINTS = (*CORE_ENDPOINTS, *TAXONOMY_ENDPOINTS)
+DNS_CACHE_TTL_SECONDS = 300
+SCHEMA_SAMPLE_SIZE = 100
+# Rows of endpoints keyed by channel that are only kept for eligible channels.
+CHANNEL_SCOPED_ENDPOINTS = ("streams", "logos", "feeds")
+# Fields kept from channels outside the target countries: enough to apply
+# the block/closed/replaced policy and its drop counts.
+POLICY_FIELDS = ("id", "country", "is_nsfw", "closed", "replaced_by")
+
+SCHEMA_SPECS: dict[str, dict[str, tuple[type, ...]]] = {
+    "channels": {
+        "id": (str,),
+        "name": (str,),
+        "country": (str,),
+        "categories": (list,),
+        "is_nsfw": (bool,),
+        "closed": (str, type(None)),
+        "replaced_by": (str, type(None)),
+    },
+    "streams": {
+        "channel": (str, type(None)),
+        "feed": (str, type(None)),
+        "url": (str,),
+        "quality": (str, type(None)),
+        "user_agent": (str, type(None)),
+        "referrer": (str, type(None)),
+    },
+    "blocklist": {"channel": (str,), "reason": (str,)},
+    "logos": {
+        "channel": (str,),
+        "feed": (str, type(None)),
+        "in_use": (bool,),
+        "width": (int,),
+        "height": (int,),
+        "format": (str,),
+        "url": (str,),
+    },
+    "feeds": {
+        "channel": (str,),
+        "id": (str,),
+        "is_main": (bool,),
+        "languages": (list,),
+        "format": (str, type(None)),
+        "timezones": (list,),
+    },
+}
+
 
 class UpstreamSchemaError(ValueError):
     """Consumed IPTV-org payload no longer matches the expected contract."""
 
 
+def _quality_height(value: object) -> int:
+    if not isinstance(value, str):
+        return 0
+    digits = "".join(character for character in value if character.isdigit())
+    return int(digits) if digits else (2160 if value.lower() == "4k" else 0)
+
+
+class IptvOrgAttrs(MutableMapping[str, Any]):
+    """``extra_attrs`` of one IPTV-org stream, read through from upstream rows.
+
+    Channel- and feed-level fields live in one record shared by every stream
+    of the channel, and stream-level fields are read from the upstream stream
+    row on access, so no per-stream dict is built. The first write or delete
+    copies the fields into a private dict; shared rows are never modified.
+    """
+
+    KEYS = (
+        "iptv_org_id",
+        "feed_id",
+        "is_main_feed",
+        "alt_names",
+        "categories",
+        "is_nsfw",
+        "network",
+        "owners",
+        "website",
+        "status",
+        "quality",
+        "format",
+        "timezones",
+        "width",
+        "height",
+        "bitrate",
+        "fps",
+    )
+    _KEY_SET = frozenset(KEYS)
+
+    __slots__ = ("_channel", "_stream", "_main_feed", "_data")
+
+    def __init__(
+        self,
+        channel: dict[str, Any],
+        stream: dict[str, Any],
+        main_feed: dict[str, Any] | None,
+    ) -> None:
+        """Initialize view over a shared channel record and one stream row."""
+        self._channel = channel
+        self._stream = stream
+        self._main_feed = main_feed
+        self._data: dict[str, Any] | None = None
+
+    @staticmethod
+    def channel_record(
+        channel_data: dict[str, Any], selected_feed: dict[str, Any] | None
+    ) -> dict[str, Any]:
+        """Build the record shared by every stream of ``channel_data``."""
+        return {
+            "iptv_org_id": channel_data.get("id", ""),
+            "alt_names": channel_data.get("alt_names", []),
+            "categories": channel_data.get("categories", []),
+            "is_nsfw": channel_data.get("is_nsfw", False),
+            "network": channel_data.get("network"),
+            "owners": channel_data.get("owners", []),
+            "website": channel_data.get("website"),
+            "format": selected_feed.get("format") if selected_feed else None,
+            "timezones": selected_feed.get("timezones", []) if selected_feed else [],
+        }
+
+    def _lookup(self, key: str) -> Any:
+        if key in self._channel:
+            return self._channel[key]
+        stream = self._stream
+        if key == "feed_id":
+            return stream.get("feed")
+        if key == "is_main_feed":
+            main_feed = self._main_feed
+            return main_feed is not None and stream.get("feed") == main_feed.get("id")
+        if key == "height":
+            return stream.get("height") or _quality_height(stream.get("quality"))
+        return stream.get(key)
+
+    def _materialize(self) -> dict[str, Any]:
+        if self._data is None:
+            self._data = {key: self._lookup(key) for key in self.KEYS}
+        return self._data
+
+    def __getitem__(self, key: str) -> Any:
+        if self._data is not None:
+            return self._data[key]
+        if key not in self._KEY_SET:
+            raise KeyError(key)
+        return self._lookup(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._materialize()[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        del self._materialize()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data if self._data is not None else self.KEYS)
+
+    def __len__(self) -> int:
+        return len(self._data if self._data is not None else self.KEYS)
+
+    def __contains__(self, key: object) -> bool:
+        if self._data is not None:
+            return key in self._data
+        return key in self._KEY_SET
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+
 class IptvOrgLoader(BaseLoader):
     """Loader for IPTV-org API data."""
 
@@ -25,9 +196,24 @@ class IptvOrgLoader(BaseLoader):
         target_countries: list[str] | None = None,
         *,
         filter_nsfw: bool = True,
+        http_cache: HttpCache | None = None,
+        fetch_slots: asyncio.Semaphore | None = None,
+        snapshot_path: str | Path | None = None,
+        keep_snapshot: bool = False,
+        delta: DeltaState | None = None,
     ) -> None:
-        """Initialize IPTV-org loader."""
-        super().__init__(config)
+        """Initialize IPTV-org loader.
+
+        With ``snapshot_path`` set, the upstream payloads are replayed from a
+        stored snapshot and no request is made. ``keep_snapshot`` keeps every
+        fetched row, not only those the target countries need, so the
+        snapshot can be saved. With ``delta`` set, each output channel and
+        stream URL is hashed and compared against the previous run.
+        """
+        super().__init__(config, http_cache, fetch_slots)
+        self.snapshot_path = Path(snapshot_path) if snapshot_path is not None else None
+        self.keep_snapshot = keep_snapshot
+        self.delta = delta
         self.base_url = config.base_url or "https://iptv-org.github.io/api"
         self.endpoints = config.endpoints or {
             "channels": "/channels.json",
@@ -43,6 +229,8 @@ class IptvOrgLoader(BaseLoader):
         self._logos_data: list[dict[str, Any]] = []
         self._feeds_data: list[dict[str, Any]] = []
         self._blocklist: dict[str, str] = {}
+        self._payloads: dict[str, list[dict[str, Any]]] = {}
+        self._field_names: dict[str, str] = {}
         self.drop_counts = {"dmca": 0, "nsfw": 0, "closed": 0, "replaced": 0}
         self.taxonomies: dict[str, list[dict[str, Any]]] = {}
 
@@ -58,7 +246,8 @@ class IptvOrgLoader(BaseLoader):
 
         try:
             # Fetch all data
-            await self._fetch_all_data()
+            async with self.fetch_slot():
+                await self._fetch_all_data()
 
             # Filter and process channels
             channels = self._process_channels()
@@ -70,151 +259,265 @@ class IptvOrgLoader(BaseLoader):
             raise LoaderError(f"Failed to load from IPTV-org: {e}", "iptv_org", e) from e
 
     async def _fetch_all_data(self) -> None:
-        """Fetch and validate one coherent upstream snapshot."""
-        async with aiohttp.ClientSession() as session:
-            payloads = {}
-            for endpoint in ("channels", "streams", "blocklist", "logos", "feeds"):
-                payloads[endpoint] = await self._fetch_json(
-                    session, f"{self.base_url}{self.endpoints[endpoint]}"
-                )
+        """Fetch (or replay) and validate one coherent upstream snapshot."""
+        if self.snapshot_path is not None:
+            payloads = read_snapshot(self.snapshot_path, ENDPOINTS)
+            for endpoint in CORE_ENDPOINTS:
                 self._validate_schema(endpoint, payloads[endpoint])
-                logger.info(f"Fetched {len(payloads[endpoint])} {endpoint} from IPTV-org")
-            self._channels_data = payloads["channels"]
-            self._streams_data = payloads["streams"]
-            self._logos_data = payloads["logos"]
-            self._feeds_data = payloads["feeds"]
-            self._blocklist = {
-                str(item["channel"]): str(item["reason"]).lower() for item in payloads["blocklist"]
-            }
-
-            for endpoint in (
-                "categories",
-                "countries",
-                "regions",
-                "languages",
-            ):
-                path = self.endpoints.get(endpoint, f"/{endpoint}.json")
-                self.taxonomies[endpoint] = await self._fetch_json(
-                    session, f"{self.base_url}{path}"
-                )
+            logger.info(f"Replaying IPTV-org snapshot {self.snapshot_path}")
+        else:
+            payloads = await self._fetch_payloads()
+            self._apply_payloads(payloads, complete=self.keep_snapshot)
+            return
+        self._apply_payloads(payloads)
+
+    def _apply_payloads(
+        self, payloads: dict[str, list[dict[str, Any]]], complete: bool = True
+    ) -> None:
+        """Replace loader state with one validated upstream snapshot.
+
+        Only ``complete`` payloads (not reduced to the target countries) can
+        later be saved as a snapshot.
+        """
+        self._payloads = payloads if complete else {}
+        self._channels_data = payloads["channels"]
+        self._streams_data = payloads["streams"]
+        self._logos_data = payloads["logos"]
+        self._feeds_data = payloads["feeds"]
+        self._blocklist = self._blocklist_map(payloads["blocklist"])
+        self.taxonomies = {endpoint: payloads[endpoint] for endpoint in TAXONOMY_ENDPOINTS}
+
+    @staticmethod
+    def _blocklist_map(rows: list[dict[str, Any]]) -> dict[str, str]:
+        return {str(item["channel"]): str(item["reason"]).lower() for item in rows}
+
+    async def _fetch_payloads(self) -> dict[str, list[dict[str, Any]]]:
+        """Fetch every endpoint concurrently over one pooled session.
+
+        Bodies are decoded row by row, and the first rows of each core
+        endpoint are schema-checked as they arrive. Unless ``keep_snapshot``
+        is set, channels outside the target countries are reduced to their
+        policy fields, and streams, logos and feeds keep only the rows of
+        eligible channels. Those are requested with everything else, and their
+        bodies are read on once eligibility is known. The first failure
+        cancels the sibling fetches, so loader state is only replaced once
+        every endpoint has succeeded.
+        """
+        payloads: dict[str, list[dict[str, Any]]] = {}
+        pushdown = not self.keep_snapshot
+        eligible_ids: asyncio.Future[set[str]] = asyncio.get_running_loop().create_future()
+
+        async def fetch(session: aiohttp.ClientSession, endpoint: str) -> None:
+            path = self.endpoints.get(endpoint, f"/{endpoint}.json")
+            url = f"{self.base_url}{path}"
+            if pushdown and endpoint == "channels":
+                rows = await self._fetch_channels(session, url)
+            elif pushdown and endpoint in CHANNEL_SCOPED_ENDPOINTS:
+                rows = await self._fetch_rows(session, url, endpoint, eligible_ids)
+            else:
+                rows = await self._fetch_rows(session, url, endpoint)
+            if endpoint in CORE_ENDPOINTS:
+                logger.info(f"Fetched {len(rows)} {endpoint} from IPTV-org")
+            payloads[endpoint] = rows
+
+            if pushdown and "channels" in payloads and "blocklist" in payloads:
+                if not eligible_ids.done():
+                    eligible, _, _ = self._select_eligible(
+                        payloads["channels"], self._blocklist_map(payloads["blocklist"])
+                    )
+                    eligible_ids.set_result({row.get("id", "") for row in eligible})
+
+        connector = aiohttp.TCPConnector(
+            limit=len(ENDPOINTS),
+            limit_per_host=len(ENDPOINTS),
+            ttl_dns_cache=DNS_CACHE_TTL_SECONDS,
+        )
+        async with aiohttp.ClientSession(connector=connector) as session:
+            try:
+                async with asyncio.TaskGroup() as group:
+                    for endpoint in ENDPOINTS:
+                        group.create_task(fetch(session, endpoint))
+            except ExceptionGroup as errors:
+                # Surface the first failure itself so callers can still match
+                # on UpstreamSchemaError and network errors.
+                raise errors.exceptions[0] from None
+        return payloads
+
+    async def _fetch_channels(
+        self, session: aiohttp.ClientSession, url: str
+    ) -> list[dict[str, Any]]:
+        """Fetch channels, keeping full rows only where they can be eligible.
+
+        Rows outside the target countries keep just their policy fields.
+        Such a channel can still be eligible as a replacement; if it was
+        reduced before the row replacing it arrived, its full row is read
+        again (from the HTTP cache when enabled).
+        """
+        target_countries = set(self.target_countries)
+        referenced: set[str] = set()
+        reduced: dict[str, int] = {}
+        rows: list[dict[str, Any]] = []
+        async for row in self._iter_rows(session, url, "channels"):
+            channel_id = str(row.get("id", ""))
+            if row.get("replaced_by"):
+                referenced.add(str(row["replaced_by"]))
+            country = row.get("country", "")
+            if not country or country.upper() in target_countries or channel_id in referenced:
+                rows.append(self._share_keys(row))
+            else:
+                reduced[channel_id] = len(rows)
+                rows.append({key: row[key] for key in POLICY_FIELDS if key in row})
+
+        missing = {
+            channel_id: position
+            for channel_id, position in reduced.items()
+            if channel_id in referenced
+        }
+        if missing:
+            logger.info(f"Re-reading {len(missing)} replacement channels from IPTV-org")
+            async with aclosing(self._iter_rows(session, url, "channels")) as again:
+                async for row in again:
+                    position = missing.pop(str(row.get("id", "")), None)
+                    if position is not None:
+                        rows[position] = self._share_keys(row)
+                    if not missing:
+                        break
+        return rows
+
+    async def _fetch_rows(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        endpoint: str,
+        channel_ids: asyncio.Future[set[str]] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Fetch all rows of an endpoint, or only those of ``channel_ids``.
+
+        The request does not wait for ``channel_ids``: once the first row has
+        arrived, the rest of the body is left to flow control until it
+        resolves, so the response latency overlaps the channel download while
+        no more than one chunk of unfiltered rows is held. The wait counts
+        against the request timeout.
+        """
+        if channel_ids is None:
+            return [self._share_keys(row) async for row in self._iter_rows(session, url, endpoint)]
+        eligible: set[str] | None = None
+        rows = []
+        async for row in self._iter_rows(session, url, endpoint):
+            if eligible is None:
+                eligible = await channel_ids
+            channel_id = row.get("channel", "") if endpoint == "streams" else str(row["channel"])
+            if channel_id in eligible:
+                rows.append(self._share_keys(row))
+        return rows
+
+    def _share_keys(self, row: dict[str, Any]) -> dict[str, Any]:
+        """Rebuild a kept row over one shared string per field name.
 
-    async def _fetch_json(self, session: aiohttp.ClientSession, url: str) -> list[dict[str, Any]]:
-        """Fetch JSON data from URL."""
-        async with session.get(
+        Each row is decoded on its own, so unlike a whole-document
+        ``json.loads`` its keys are fresh strings; sharing them roughly
+        halves the memory of kept rows.
+        """
+        keys = self._field_names
+        return {keys.setdefault(key, key): value for key, value in row.items()}
+
+    async def _iter_rows(
+        self, session: aiohttp.ClientSession, url: str, endpoint: str
+    ) -> AsyncGenerator[dict[str, Any], None]:
+        """Yield the rows of a JSON array endpoint as its body is decoded."""
+        async with self.http_cache.request(
+            session,
             url,
-            timeout=aiohttp.ClientTimeout(total=60),
+            max_age_seconds=self.cache_max_age_seconds,
+            timeout=60,
             headers={"User-Agent": "IPTV-Sanity-Agent/1.0"},
-        ) as response:
-            response.raise_for_status()
-            return cast(list[dict[str, Any]], await response.json())
+        ) as body:
+            index = 0
+            async for row in iter_json_array(body.chunks, body.charset or "utf-8"):
+                if endpoint in SCHEMA_SPECS and index < SCHEMA_SAMPLE_SIZE:
+                    self._validate_row(endpoint, index, row)
+                index += 1
+                yield row
+
+    def save_snapshot(self, path: str | Path) -> None:
+        """Persist the last validated upstream payloads for offline replay.
+
+        Raises:
+            SnapshotError: If nothing has been loaded yet, or the load was
+                reduced to the target countries (``keep_snapshot`` unset).
+        """
+        if not self._payloads:
+            raise SnapshotError(
+                "No complete IPTV-org payloads to snapshot; load with keep_snapshot=True"
+            )
+        write_snapshot(path, self._payloads, self.base_url)
+        logger.info(f"Saved IPTV-org snapshot to {path}")
 
     def _validate_schema(
-        self, endpoint: str, rows: list[dict[str, Any]], sample_size: int = 100
+        self, endpoint: str, rows: list[dict[str, Any]], sample_size: int = SCHEMA_SAMPLE_SIZE
     ) -> None:
-        specs: dict[str, dict[str, tuple[type, ...]]] = {
-            "channels": {
-                "id": (str,),
-                "name": (str,),
-                "country": (str,),
-                "categories": (list,),
-                "is_nsfw": (bool,),
-                "closed": (str, type(None)),
-                "replaced_by": (str, type(None)),
-            },
-            "streams": {
-                "channel": (str, type(None)),
-                "feed": (str, type(None)),
-                "url": (str,),
-                "quality": (str, type(None)),
-                "user_agent": (str, type(None)),
-                "referrer": (str, type(None)),
-            },
-            "blocklist": {"channel": (str,), "reason": (str,)},
-            "logos": {
-                "channel": (str,),
-                "feed": (str, type(None)),
-                "in_use": (bool,),
-                "width": (int,),
-                "height": (int,),
-                "format": (str,),
-                "url": (str,),
-            },
-            "feeds": {
-                "channel": (str,),
-                "id": (str,),
-                "is_main": (bool,),
-                "languages": (list,),
-                "format": (str, type(None)),
-                "timezones": (list,),
-            },
-        }
-        expected = specs[endpoint]
         for index, row in enumerate(rows[:sample_size]):
-            missing = sorted(set(expected) - set(row))
-            wrong = sorted(
-                key
-                for key, types in expected.items()
-                if key in row and not isinstance(row[key], types)
+            self._validate_row(endpoint, index, row)
+
+    def _validate_row(self, endpoint: str, index: int, row: Any) -> None:
+        if not isinstance(row, dict):
+            raise UpstreamSchemaError(f"{endpoint}.json schema drift at row {index}: not an object")
+        expected = SCHEMA_SPECS[endpoint]
+        missing = sorted(set(expected) - set(row))
+        wrong = sorted(
+            key for key, types in expected.items() if key in row and not isinstance(row[key], types)
+        )
+        if missing or wrong:
+            details = []
+            if missing:
+                details.append(f"missing {missing}")
+            if wrong:
+                details.append(f"wrong_type {wrong}")
+            raise UpstreamSchemaError(
+                f"{endpoint}.json schema drift at row {index}: " + ", ".join(details)
             )
-            if missing or wrong:
-                details = []
-                if missing:
-                    details.append(f"missing {missing}")
-                if wrong:
-                    details.append(f"wrong_type {wrong}")
-                raise UpstreamSchemaError(
-                    f"{endpoint}.json schema drift at row {index}: " + ", ".join(details)
-                )
-            unexpected = sorted(set(row) - set(expected))
-            if unexpected:
-                logger.info(
-                    f"{endpoint}.json schema additions at row {index}: unexpected {unexpected}"
-                )
+        unexpected = sorted(set(row) - set(expected))
+        if unexpected:
+            logger.info(f"{endpoint}.json schema additions at row {index}: unexpected {unexpected}")
 
-    def _process_channels(self) -> list[RawChannel]:
-        """Process and filter channels."""
-        # Build stream lookup by channel ID
-        stream_lookup: dict[str, list[dict[str, Any]]] = {}
-        for stream in self._streams_data:
-            channel_id = stream.get("channel", "")
-            if channel_id:
-                if channel_id not in stream_lookup:
-                    stream_lookup[channel_id] = []
-                stream_lookup[channel_id].append(stream)
-        feed_lookup: dict[str, list[dict[str, Any]]] = {}
-        for feed in self._feeds_data:
-            feed_lookup.setdefault(str(feed["channel"]), []).append(feed)
-        logo_lookup: dict[str, list[dict[str, Any]]] = {}
-        for logo in self._logos_data:
-            if logo["in_use"]:
-                logo_lookup.setdefault(str(logo["channel"]), []).append(logo)
-        channel_ids = {str(channel["id"]) for channel in self._channels_data}
-        replacement_ids = {
-            str(channel["replaced_by"])
-            for channel in self._channels_data
-            if channel.get("replaced_by") in channel_ids
-        }
+    def _select_eligible(
+        self, channels_data: list[dict[str, Any]], blocklist: dict[str, str]
+    ) -> tuple[list[dict[str, Any]], dict[str, int], list[tuple[str, str]]]:
+        """Apply the block/closed/replaced policy and the country filter.
 
-        channels: list[RawChannel] = []
-        self.drop_counts = {"dmca": 0, "nsfw": 0, "closed": 0, "replaced": 0}
+        Returns:
+            Tuple of (eligible channel rows, policy drop counts, redirected
+            ``(channel, replacement)`` pairs).
+        """
+        channel_ids: set[str] = set()
+        replaced_by: set[str] = set()
+        for channel_data in channels_data:
+            channel_ids.add(str(channel_data["id"]))
+            if channel_data.get("replaced_by"):
+                replaced_by.add(str(channel_data["replaced_by"]))
+        replacement_ids = replaced_by & channel_ids
 
-        for channel_data in self._channels_data:
+        drop_counts = {"dmca": 0, "nsfw": 0, "closed": 0, "replaced": 0}
+        redirects: list[tuple[str, str]] = []
+        target_countries = set(self.target_countries)
+        eligible: list[dict[str, Any]] = []
+        for channel_data in channels_data:
             channel_id = channel_data.get("id", "")
 
-            block_reason = self._blocklist.get(channel_id)
+            block_reason = blocklist.get(channel_id)
             if block_reason == "dmca":
-                self.drop_counts["dmca"] += 1
+                drop_counts["dmca"] += 1
                 continue
             if self.filter_nsfw and (block_reason == "nsfw" or channel_data.get("is_nsfw") is True):
-                self.drop_counts["nsfw"] += 1
+                drop_counts["nsfw"] += 1
                 continue
             if channel_data.get("closed") is not None:
-                self.drop_counts["closed"] += 1
+                drop_counts["closed"] += 1
                 continue
             replacement = channel_data.get("replaced_by")
             if replacement and replacement in channel_ids:
-                self.drop_counts["replaced"] += 1
-                logger.info(f"Redirecting closed channel {channel_id} to {replacement}")
+                drop_counts["replaced"] += 1
+                redirects.append((channel_id, replacement))
                 continue
 
             # Filter by country
@@ -222,9 +525,48 @@ class IptvOrgLoader(BaseLoader):
             if (
                 channel_id not in replacement_ids
                 and country
-                and country.upper() not in self.target_countries
+                and country.upper() not in target_countries
             ):
                 continue
+            eligible.append(channel_data)
+        return eligible, drop_counts, redirects
+
+    def _process_channels(self) -> list[RawChannel]:
+        """Process and filter channels.
+
+        Policy and country filters run first, so stream, feed and logo lookups
+        are only built for the channels that can reach the output.
+        """
+        eligible, self.drop_counts, redirects = self._select_eligible(
+            self._channels_data, self._blocklist
+        )
+        for channel_id, replacement in redirects:
+            logger.info(f"Redirecting closed channel {channel_id} to {replacement}")
+
+        # Build lookups in one pass per upstream array, for eligible ids only
+        eligible_ids = {channel_data.get("id", "") for channel_data in eligible}
+        stream_lookup: dict[str, list[dict[str, Any]]] = {}
+        for stream in self._streams_data:
+            channel_id = stream.get("channel", "")
+            if channel_id and channel_id in eligible_ids:
+                stream_lookup.setdefault(channel_id, []).append(stream)
+        feed_lookup: dict[str, list[dict[str, Any]]] = {}
+        for feed in self._feeds_data:
+            channel_id = str(feed["channel"])
+            if channel_id in eligible_ids:
+                feed_lookup.setdefault(channel_id, []).append(feed)
+        logo_lookup: dict[str, list[dict[str, Any]]] = {}
+        for logo in self._logos_data:
+            channel_id = str(logo["channel"])
+            if logo["in_use"] and channel_id in eligible_ids:
+                logo_lookup.setdefault(channel_id, []).append(logo)
+
+        channels: list[RawChannel] = []
+        channel_hashes: dict[str, str] = {}
+        stream_rows: dict[str, list[dict[str, Any]]] = {}
+        for channel_data in eligible:
+            channel_id = channel_data.get("id", "")
+            country = channel_data.get("country", "")
 
             # Get streams for this channel
             feeds = feed_lookup.get(channel_id, [])
@@ -238,10 +580,17 @@ class IptvOrgLoader(BaseLoader):
                 continue  # Skip channels without streams
 
             selected_logo = self._select_logo(logo_lookup.get(channel_id, []))
+            if self.delta is not None:
+                channel_hashes[channel_id] = content_hash(
+                    [channel_data, feeds, logo_lookup.get(channel_id, [])]
+                )
+            channel_record = IptvOrgAttrs.channel_record(channel_data, selected_feed)
             for stream in streams:
                 stream_url = stream.get("url", "")
                 if not stream_url:
                     continue
+                if self.delta is not None:
+                    stream_rows.setdefault(stream_url, []).append(stream)
                 channel = RawChannel(
                     name=channel_data.get("name", ""),
                     stream_url=stream_url,
@@ -260,28 +609,7 @@ class IptvOrgLoader(BaseLoader):
                         if stream.get("user_agent") or stream.get("referrer")
                         else None
                     ),
-                    extra_attrs={
-                        "iptv_org_id": channel_id,
-                        "feed_id": stream.get("feed"),
-                        "is_main_feed": (
-                            main_feed is not None and stream.get("feed") == main_feed.get("id")
-                        ),
-                        "alt_names": channel_data.get("alt_names", []),
-                        "categories": channel_data.get("categories", []),
-                        "is_nsfw": channel_data.get("is_nsfw", False),
-                        "network": channel_data.get("network"),
-                        "owners": channel_data.get("owners", []),
-                        "website": channel_data.get("website"),
-                        "status": stream.get("status"),
-                        "quality": stream.get("quality"),
-                        "format": selected_feed.get("format") if selected_feed else None,
-                        "timezones": (selected_feed.get("timezones", []) if selected_feed else []),
-                        "width": stream.get("width"),
-                        "height": stream.get("height")
-                        or self._quality_height(stream.get("quality")),
-                        "bitrate": stream.get("bitrate"),
-                        "fps": stream.get("fps"),
-                    },
+                    extra_attrs=IptvOrgAttrs(channel_record, stream, main_feed),
                 )
                 channels.append(channel)
 
@@ -289,6 +617,15 @@ class IptvOrgLoader(BaseLoader):
             "IPTV-org policy drops: "
             + ", ".join(f"{reason}={count}" for reason, count in self.drop_counts.items())
         )
+        if self.delta is not None:
+            change_set = self.delta.update_hashes(
+                channel_hashes,
+                {url: content_hash(rows) for url, rows in stream_rows.items()},
+            )
+            logger.info(
+                f"IPTV-org changes since last run: channels {change_set.channels.summary()}; "
+                f"streams {change_set.streams.summary()}"
+            )
         return channels
 
     def _stream_rank(
@@ -297,15 +634,9 @@ class IptvOrgLoader(BaseLoader):
         main_feed_id = main_feed.get("id") if main_feed else None
         return (
             0 if main_feed_id and stream.get("feed") == main_feed_id else 1,
-            -self._quality_height(stream.get("quality")),
+            -_quality_height(stream.get("quality")),
         )
 
-    def _quality_height(self, value: object) -> int:
-        if not isinstance(value, str):
-            return 0
-        digits = "".join(character for character in value if character.isdigit())
-        return int(digits) if digits else (2160 if value.lower() == "4k" else 0)
-
     def _select_logo(self, logos: list[dict[str, Any]]) -> str | None:
         format_rank = {"svg": 0, "png": 1, "webp": 2, "jpeg": 3, "jpg": 3}
         if not logos:
@@ -0,0 +1,173 @@
+"""Local playlist and IPTV-org stream file loader."""
+
+import asyncio
+import codecs
+import functools
+import mmap
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from ..models import ChannelHeaders, RawChannel, SourceType
+from ..utils import get_logger
+from ..utils.config import SourceConfig
+from ..utils.json_stream import iter_json_array
+from .base_loader import LoaderError
+from .m3u_loader import ArrivalQueue, M3ULoader
+
+logger = get_logger(__name__)
+
+PLAYLIST_SUFFIXES = (".m3u", ".m3u8")
+JSON_SUFFIXES = (".json",)
+# Bytes of the mapped file decoded per step.
+WINDOW_SIZE = 1 << 20
+# Read-ahead hint, where the platform has one (WINDOW_SIZE is page aligned).
+_MADV_WILLNEED: int | None = getattr(mmap, "MADV_WILLNEED", None)
+
+
+@contextmanager
+def _mapped(path: Path) -> Iterator[mmap.mmap | bytes]:
+    """Map ``path`` read-only; empty files, which cannot be mapped, are ``b""``."""
+    with open(path, "rb") as f:
+        if f.seek(0, 2) == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+class LocalFileLoader(M3ULoader):
+    """Loader for M3U playlists and IPTV-org ``streams.json``-style files on disk.
+
+    Each configured path is a file or a directory whose playlist and JSON
+    files are loaded in name order. Files are memory-mapped and parsed one
+    window at a time, so neither the file nor its decoded text is ever held
+    whole, and files load concurrently with the same in-order merge as
+    remote playlists.
+    """
+
+    source_type = SourceType.CUSTOM
+
+    def __init__(
+        self,
+        config: SourceConfig,
+        base_dir: str | Path | None = None,
+        fetch_slots: asyncio.Semaphore | None = None,
+    ) -> None:
+        """Initialize loader; relative paths resolve against ``base_dir``."""
+        super().__init__(config, fetch_slots=fetch_slots)
+        self.base_dir = Path(base_dir) if base_dir is not None else Path.cwd()
+        self.paths = [self.base_dir / path for path in config.paths]
+
+    def get_source_name(self) -> str:
+        """Get source name."""
+        return "Local files"
+
+    async def iter_channels(self) -> AsyncIterator[RawChannel]:
+        """Yield channels from every configured file in path order."""
+        if not self.is_enabled:
+            logger.info("Local file loader is disabled")
+            return
+
+        try:
+            files = self._discover()
+        except OSError as e:
+            raise LoaderError(f"Failed to list local sources: {e}", "custom", e) from e
+        producers = [functools.partial(self._load_file, path) for path in files]
+        async for channel in self._merge_in_order(producers):
+            yield channel
+
+    def _discover(self) -> list[Path]:
+        """Expand configured paths into the files to load."""
+        files: list[Path] = []
+        for path in self.paths:
+            if path.is_dir():
+                files.extend(
+                    sorted(
+                        child
+                        for child in path.iterdir()
+                        if child.is_file()
+                        and child.suffix.lower() in (*PLAYLIST_SUFFIXES, *JSON_SUFFIXES)
+                    )
+                )
+            elif path.exists():
+                files.append(path)
+            else:
+                raise FileNotFoundError(f"No such local source: {path}")
+        return files
+
+    async def _load_file(self, path: Path, index: int, arrivals: ArrivalQueue) -> None:
+        """Stream one local file into the shared arrival queue."""
+        count = 0
+        try:
+            async with self.fetch_slot():
+                if path.suffix.lower() in JSON_SUFFIXES:
+                    channels = self._parse_stream_rows(path)
+                else:
+                    channels = self._parse_m3u_chunks(self._read_text(path))
+                async for channel in channels:
+                    await arrivals.put((index, channel))
+                    count += 1
+        except Exception as e:
+            logger.error(f"Failed to load local source {path}: {e}")
+            error = LoaderError(f"Failed to load local source {path}: {e}", "custom", e)
+            error.__cause__ = e
+            arrivals.put_nowait((index, error))
+            return
+        logger.info(f"Loaded {count} channels from {path}")
+        arrivals.put_nowait((index, None))
+
+    async def _read_text(self, path: Path) -> AsyncIterator[str]:
+        """Decode a mapped file as UTF-8 text, one window at a time."""
+        decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        async for window in self._read_windows(path):
+            yield decoder.decode(window)
+        yield decoder.decode(b"", final=True)
+
+    async def _read_windows(self, path: Path) -> AsyncIterator[memoryview]:
+        """Yield successive windows of a mapped file as views, never copies.
+
+        Each view is released once the consumer asks for the next one, so it
+        must be decoded before then. The kernel is asked to read the next
+        window ahead while the current one is parsed, and other files get a
+        turn between windows.
+        """
+        with _mapped(path) as mapped, memoryview(mapped) as view:
+            size = len(view)
+            for start in range(0, size, WINDOW_SIZE):
+                ahead = start + WINDOW_SIZE
+                if isinstance(mapped, mmap.mmap) and ahead < size and _MADV_WILLNEED is not None:
+                    mapped.madvise(_MADV_WILLNEED, ahead, min(WINDOW_SIZE, size - ahead))
+                window = view[start:ahead]
+                try:
+                    yield window
+                finally:
+                    # The mapping cannot close while a view of it is alive.
+                    window.release()
+                await asyncio.sleep(0)
+
+    async def _parse_stream_rows(self, path: Path) -> AsyncIterator[RawChannel]:
+        """Parse a JSON array of IPTV-org stream rows into channels."""
+        async for row in iter_json_array(self._read_windows(path)):
+            if not isinstance(row, dict) or not row.get("url"):
+                continue
+            yield self._create_stream_channel(row)
+
+    def _create_stream_channel(self, row: dict[str, Any]) -> RawChannel:
+        """Create RawChannel from an IPTV-org stream row."""
+        channel_id = row.get("channel") or None
+        user_agent = row.get("user_agent") or row.get("http_user_agent")
+        referrer = row.get("referrer") or row.get("http_referrer")
+        return RawChannel(
+            name=str(row.get("title") or row.get("name") or channel_id or row["url"]),
+            stream_url=str(row["url"]),
+            source=self.source_type,
+            tvg_id=channel_id,
+            headers=(
+                ChannelHeaders(user_agent=user_agent, referrer=referrer)
+                if user_agent or referrer
+                else None
+            ),
+            extra_attrs={"quality": row["quality"]} if row.get("quality") else {},
+        )
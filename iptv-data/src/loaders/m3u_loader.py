@@ -1,6 +1,10 @@
 """M3U playlist loader and parser."""
 
-import re
+import asyncio
+import codecs
+import functools
+import sys
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable, Sequence
 from typing import Any
 
 import aiohttp
@@ -8,26 +12,147 @@ import aiohttp
 from ..models import ChannelHeaders, RawChannel, SourceType
 from ..utils import get_logger
 from ..utils.config import SourceConfig
+from ..utils.http_cache import HttpCache
 from .base_loader import BaseLoader, LoaderError
 
 logger = get_logger(__name__)
 
-# M3U parsing patterns
-EXTINF_PATTERN = re.compile(
-    r'#EXTINF:(-?\d+)\s*'
-    r'(?:([^,]*?))?,\s*'
-    r'(.+?)$',
-    re.MULTILINE
-)
-ATTR_PATTERN = re.compile(r'(\w+[-\w]*)="([^"]*)"')
+# Per-producer channels, then None when done or the LoaderError that ended it.
+ArrivalQueue = asyncio.Queue[tuple[int, RawChannel | LoaderError | None]]
+# Channels a source may buffer ahead of its turn before its producer pauses.
+MAX_PENDING_CHANNELS = 5000
+
+
+class _MergeQueue(ArrivalQueue):
+    """Arrival queue whose ``put`` waits while a producer's buffer is full.
+
+    Channels are admitted against a per-producer budget that the merge hands
+    back as it yields them, so a source loading ahead of its turn holds at
+    most ``limit`` channels. Completion and errors always go straight in.
+    """
+
+    def __init__(self, producers: int, limit: int) -> None:
+        super().__init__()
+        self.budgets = [asyncio.Semaphore(limit) for _ in range(producers)]
+
+    async def put(self, item: tuple[int, RawChannel | LoaderError | None]) -> None:
+        index, value = item
+        if isinstance(value, RawChannel):
+            await self.budgets[index].acquire()
+        self.put_nowait(item)
+
+# Normalized EXTINF attribute names (``tvg-id`` -> ``tvg_id``), interned so
+# every channel's attrs share one key object per name.
+_ATTR_KEYS: dict[str, str] = {}
+_ATTR_KEYS_LIMIT = 1024
+
+
+def _attr_key(raw: str) -> str:
+    key = _ATTR_KEYS.get(raw)
+    if key is None:
+        key = sys.intern(raw.lower().replace("-", "_"))
+        if len(_ATTR_KEYS) < _ATTR_KEYS_LIMIT:
+            _ATTR_KEYS[raw] = key
+    return key
+
+
+def tokenize_extinf(line: str) -> tuple[dict[str, str], str]:
+    """Split an ``#EXTINF:`` line into its attributes and channel name.
+
+    The line is scanned once, left to right: each ``key="value"`` pair is
+    taken up to its closing quote, so quoted values may contain commas, and
+    the name is everything after the first comma outside a quoted value, so
+    names may contain commas too. Text after that comma is never read as
+    attributes. A later duplicate attribute overrides an earlier one.
+    """
+    attrs: dict[str, str] = {}
+    pos = line.find(":") + 1
+    comma = line.find(",", pos)
+    while True:
+        if -1 < comma < pos:
+            # That comma was inside the previous quoted value.
+            comma = line.find(",", pos)
+        assign = line.find('="', pos)
+        if assign == -1 or -1 < comma < assign:
+            break
+        end = line.find('"', assign + 2)
+        if end == -1:
+            # Unterminated value: the name still follows the next comma.
+            comma = line.find(",", assign + 2)
+            break
+        start = max(line.rfind(" ", pos, assign), line.rfind("\t", pos, assign)) + 1
+        raw_key = line[max(start, pos) : assign]
+        if raw_key:
+            attrs[_attr_key(raw_key)] = line[assign + 2 : end]
+        pos = end + 1
+    name = line[comma + 1 :].strip() if comma != -1 else ""
+    return attrs, name
+
+
+class M3UStreamParser:
+    """Incremental M3U parser fed with decoded text in arbitrary chunks.
+
+    A line is only interpreted once its terminating newline has arrived, so an
+    EXTINF/URL pair may straddle any number of chunk boundaries. Only the
+    current partial line is buffered between feeds.
+    """
+
+    def __init__(self, loader: "M3ULoader") -> None:
+        """Initialize parser state for one playlist."""
+        self._loader = loader
+        self._pending = ""
+        self._current_attrs: dict[str, Any] = {}
+        self._current_name = ""
+
+    def feed(self, text: str) -> list[RawChannel]:
+        """Consume a text chunk and return channels completed by it."""
+        if not text:
+            return []
+        *lines, self._pending = (self._pending + text).split("\n")
+        return self._consume(lines)
+
+    def close(self) -> list[RawChannel]:
+        """Flush the trailing unterminated line at end of input."""
+        lines, self._pending = [self._pending], ""
+        return self._consume(lines)
+
+    def _consume(self, lines: list[str]) -> list[RawChannel]:
+        channels: list[RawChannel] = []
+        for line in lines:
+            line = line.strip()
+
+            if line.startswith("#EXTINF:"):
+                # Parse EXTINF line
+                self._current_attrs, self._current_name = self._loader._parse_extinf(line)
+
+            elif line and not line.startswith("#"):
+                # This is the URL line
+                if self._current_name:
+                    channels.append(
+                        self._loader._create_channel(
+                            self._current_name, line, self._current_attrs
+                        )
+                    )
+
+                # Reset for next channel
+                self._current_attrs = {}
+                self._current_name = ""
+        return channels
 
 
 class M3ULoader(BaseLoader):
     """Loader for M3U playlists."""
 
-    def __init__(self, config: SourceConfig) -> None:
+    source_type = SourceType.M3U
+
+    def __init__(
+        self,
+        config: SourceConfig,
+        http_cache: HttpCache | None = None,
+        fetch_slots: asyncio.Semaphore | None = None,
+    ) -> None:
         """Initialize M3U loader."""
-        super().__init__(config)
+        super().__init__(config, http_cache, fetch_slots)
         self.urls = config.urls or []
         self.retry_config = config.retry or {}
 
@@ -37,83 +162,139 @@ class M3ULoader(BaseLoader):
 
     async def load(self) -> list[RawChannel]:
         """Load channels from all configured M3U sources."""
+        return [channel async for channel in self.iter_channels()]
+
+    async def iter_channels(self) -> AsyncIterator[RawChannel]:
+        """Yield channels from all configured M3U sources as they are parsed.
+
+        Every playlist loads concurrently over one session. Channels of the
+        first playlist are yielded as they arrive while later playlists buffer
+        until their turn, so the order always follows the configuration and
+        never depends on timing. The first failing playlist cancels the rest.
+        """
         if not self.is_enabled:
             logger.info("M3U loader is disabled")
-            return []
+            return
 
-        all_channels: list[RawChannel] = []
+        async with aiohttp.ClientSession() as session:
+            producers = [
+                functools.partial(self._load_url, session, url_config) for url_config in self.urls
+            ]
+            async for channel in self._merge_in_order(producers):
+                yield channel
 
-        for url_config in self.urls:
-            url = url_config.get("url", "")
-            name = url_config.get("name", url)
-            timeout = url_config.get("timeout_seconds", 30)
+    async def _merge_in_order(
+        self, producers: Sequence[Callable[[int, ArrivalQueue], Awaitable[None]]]
+    ) -> AsyncIterator[RawChannel]:
+        """Run producers concurrently and yield their channels in list order.
 
-            try:
-                content = await self._fetch_m3u(url, timeout)
-                channels = self._parse_m3u(content)
-                logger.info(f"Loaded {len(channels)} channels from {name}")
-                all_channels.extend(channels)
-            except Exception as e:
-                logger.error(f"Failed to load M3U from {name}: {e}")
-                raise LoaderError(f"Failed to load M3U: {e}", "m3u", e) from e
+        Each producer awaits ``put`` for its ``(index, channel)`` items, then
+        pushes ``(index, None)`` when done or ``(index, LoaderError)`` on
+        failure, which is raised here. A producer ahead of its turn pauses
+        once ``MAX_PENDING_CHANNELS`` of its channels are buffered, so a slow
+        first source never holds the whole merged result in memory. A paused
+        download keeps its connection open against the source's timeout, so
+        only sources larger than the bound can run out of time waiting.
+        """
+        arrivals = _MergeQueue(len(producers), MAX_PENDING_CHANNELS)
+        pending: list[list[RawChannel]] = [[] for _ in producers]
+        finished = [False] * len(producers)
+        cursor = 0
 
-        return all_channels
+        tasks: list[asyncio.Task[None]] = [
+            asyncio.ensure_future(producer(index, arrivals))
+            for index, producer in enumerate(producers)
+        ]
+        try:
+            while cursor < len(producers):
+                index, item = await arrivals.get()
+                if isinstance(item, LoaderError):
+                    raise item
+                if item is None:
+                    finished[index] = True
+                elif index == cursor:
+                    arrivals.budgets[index].release()
+                    yield item
+                else:
+                    pending[index].append(item)
+                while cursor < len(producers) and finished[cursor]:
+                    cursor += 1
+                    if cursor < len(producers):
+                        buffered, pending[cursor] = pending[cursor], []
+                        for channel in buffered:
+                            arrivals.budgets[cursor].release()
+                            yield channel
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
-    async def _fetch_m3u(self, url: str, timeout: int) -> str:
-        """Fetch M3U content from URL."""
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                url,
-                timeout=aiohttp.ClientTimeout(total=timeout),
-                headers={"User-Agent": "IPTV-Sanity-Agent/1.0"},
-            ) as response:
-                response.raise_for_status()
-                return await response.text()
+    async def _load_url(
+        self,
+        session: aiohttp.ClientSession,
+        url_config: dict[str, Any],
+        index: int,
+        arrivals: ArrivalQueue,
+    ) -> None:
+        """Stream one configured playlist into the shared arrival queue."""
+        url = url_config.get("url", "")
+        name = url_config.get("name", url)
+        timeout = url_config.get("timeout_seconds", 30)
 
-    def _parse_m3u(self, content: str) -> list[RawChannel]:
-        """Parse M3U content into RawChannel objects."""
-        channels: list[RawChannel] = []
-        lines = content.strip().split("\n")
+        count = 0
+        try:
+            async with self.fetch_slot():
+                async for channel in self._parse_m3u_chunks(
+                    self._fetch_m3u(session, url, timeout)
+                ):
+                    await arrivals.put((index, channel))
+                    count += 1
+        except Exception as e:
+            logger.error(f"Failed to load M3U from {name}: {e}")
+            error = LoaderError(f"Failed to load M3U: {e}", "m3u", e)
+            error.__cause__ = e
+            arrivals.put_nowait((index, error))
+            return
+        logger.info(f"Loaded {count} channels from {name}")
+        arrivals.put_nowait((index, None))
 
-        current_attrs: dict[str, Any] = {}
-        current_name = ""
+    async def _fetch_m3u(
+        self, session: aiohttp.ClientSession, url: str, timeout: int
+    ) -> AsyncIterator[str]:
+        """Stream M3U content from URL as decoded text chunks.
 
-        for line in lines:
-            line = line.strip()
+        The body is never buffered whole: chunks are decoded incrementally
+        with the response charset, so parsing overlaps the download.
+        """
+        async with self.http_cache.request(
+            session,
+            url,
+            max_age_seconds=self.cache_max_age_seconds,
+            timeout=timeout,
+            headers={"User-Agent": "IPTV-Sanity-Agent/1.0"},
+        ) as body:
+            decoder = codecs.getincrementaldecoder(body.charset or "utf-8")()
+            async for chunk in body.chunks:
+                yield decoder.decode(chunk)
+            yield decoder.decode(b"", final=True)
 
-            if line.startswith("#EXTINF:"):
-                # Parse EXTINF line
-                current_attrs, current_name = self._parse_extinf(line)
-
-            elif line and not line.startswith("#"):
-                # This is the URL line
-                if current_name:
-                    channel = self._create_channel(current_name, line, current_attrs)
-                    channels.append(channel)
-
-                # Reset for next channel
-                current_attrs = {}
-                current_name = ""
+    async def _parse_m3u_chunks(self, chunks: AsyncIterable[str]) -> AsyncIterator[RawChannel]:
+        """Parse streamed M3U text, yielding channels as their URL line lands."""
+        parser = M3UStreamParser(self)
+        async for chunk in chunks:
+            for channel in parser.feed(chunk):
+                yield channel
+        for channel in parser.close():
+            yield channel
 
-        return channels
+    def _parse_m3u(self, content: str) -> list[RawChannel]:
+        """Parse M3U content into RawChannel objects."""
+        parser = M3UStreamParser(self)
+        return parser.feed(content) + parser.close()
 
     def _parse_extinf(self, line: str) -> tuple[dict[str, Any], str]:
         """Parse EXTINF line and extract attributes and name."""
-        attrs: dict[str, Any] = {}
-        name = ""
-
-        # Extract attributes like tvg-id="...", tvg-name="...", etc.
-        for match in ATTR_PATTERN.finditer(line):
-            key = match.group(1).lower().replace("-", "_")
-            value = match.group(2)
-            attrs[key] = value
-
-        # Extract channel name (after the comma)
-        comma_idx = line.rfind(",")
-        if comma_idx != -1:
-            name = line[comma_idx + 1:].strip()
-
-        return attrs, name
+        return tokenize_extinf(line)
 
     def _create_channel(
         self, name: str, url: str, attrs: dict[str, Any]
@@ -129,7 +310,7 @@ class M3ULoader(BaseLoader):
         return RawChannel(
             name=name,
             stream_url=url,
-            source=SourceType.M3U,
+            source=self.source_type,
             tvg_id=attrs.get("tvg_id"),
             tvg_name=attrs.get("tvg_name"),
             tvg_logo=attrs.get("tvg_logo"),
@@ -0,0 +1,72 @@
+"""Versioned on-disk snapshots of the IPTV-org upstream payloads."""
+
+import gzip
+import json
+import os
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+SNAPSHOT_FORMAT = "iptv-org-snapshot"
+SNAPSHOT_VERSION = 1
+
+
+class SnapshotError(ValueError):
+    """Snapshot cannot be written, read, or is in an unsupported format."""
+
+
+def write_snapshot(
+    path: str | Path,
+    payloads: dict[str, list[dict[str, Any]]],
+    base_url: str = "",
+) -> None:
+    """Write upstream payloads as one gzip-compressed JSON document.
+
+    The file is written next to its destination and renamed into place, so a
+    crashed run never leaves a truncated snapshot behind.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "createdAt": datetime.now(UTC).isoformat(),
+        "baseUrl": base_url,
+        "endpoints": payloads,
+    }
+    partial_path = path.with_name(f"{path.name}.{os.getpid()}.partial")
+    try:
+        with gzip.open(partial_path, "wt", encoding="utf-8", compresslevel=6) as f:
+            json.dump(document, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(partial_path, path)
+    finally:
+        partial_path.unlink(missing_ok=True)
+
+
+def read_snapshot(path: str | Path, endpoints: tuple[str, ...]) -> dict[str, list[dict[str, Any]]]:
+    """Read the payloads of ``endpoints`` from a stored snapshot.
+
+    Raises:
+        SnapshotError: If the file is unreadable, has another format or
+            version, or lacks one of the requested endpoints.
+    """
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            document = json.load(f)
+    except (OSError, EOFError, ValueError) as e:
+        raise SnapshotError(f"Unreadable snapshot {path}: {e}") from e
+
+    if not isinstance(document, dict) or document.get("format") != SNAPSHOT_FORMAT:
+        raise SnapshotError(f"{path} is not an IPTV-org snapshot")
+    if document.get("version") != SNAPSHOT_VERSION:
+        raise SnapshotError(
+            f"Unsupported snapshot version {document.get('version')!r} in {path}; "
+            f"expected {SNAPSHOT_VERSION}"
+        )
+    stored = document.get("endpoints")
+    if not isinstance(stored, dict):
+        raise SnapshotError(f"Snapshot {path} has no endpoints")
+    missing = [endpoint for endpoint in endpoints if not isinstance(stored.get(endpoint), list)]
+    if missing:
+        raise SnapshotError(f"Snapshot {path} is missing endpoints {missing}")
+    return {endpoint: stored[endpoint] for endpoint in endpoints}
@@ -2,16 +2,19 @@
 
 import argparse
 import asyncio
+import dataclasses
 import sys
 import time
 from collections import Counter
+from collections.abc import AsyncIterator
 from datetime import UTC, datetime
 from pathlib import Path
 
 from .exporters import JsonExporter, M3UExporter
-from .loaders import IptvOrgLoader, M3ULoader
+from .loaders import BaseLoader, IptvOrgLoader, LocalFileLoader, M3ULoader
 from .loaders.iptv_org_loader import UpstreamSchemaError
-from .models import PipelineMetadata, RawChannel
+from .loaders.snapshot import SnapshotError
+from .models import NormalizedChannel, PipelineMetadata, RawChannel, ValidationStatus
 from .processors import (
     Deduplicator,
     Enricher,
@@ -19,7 +22,11 @@ from .processors import (
     StreamHealthProcessor,
     StreamValidator,
 )
-from .utils import get_logger, load_config, setup_logging
+from .utils import Config, get_logger, load_config, setup_logging
+from .utils.config import SourceConfig
+from .utils.delta import DeltaState
+from .utils.http_cache import HttpCache
+from .utils.validation_cache import ValidationCache
 
 logger = get_logger(__name__)
 
@@ -28,12 +35,21 @@ async def run_pipeline(
     config_path: str,
     skip_validation: bool = False,
     skip_stream_health: bool = False,
+    streaming: bool = False,
+    offline_snapshot: str | Path | None = None,
+    save_snapshot: str | Path | None = None,
 ) -> int:
     """Run the IPTV sanity pipeline.
 
     Args:
         config_path: Path to configuration file.
         skip_validation: Skip stream validation for faster testing.
+        streaming: Normalize and validate channels while sources are still
+            loading instead of after every source has finished.
+        offline_snapshot: Replay a stored IPTV-org snapshot without network
+            access. Network-only sources and stages are skipped.
+        save_snapshot: Write the validated IPTV-org snapshot here after a
+            successful load.
 
     Returns:
         Exit code (0 for success, 1 for failure).
@@ -46,136 +62,343 @@ async def run_pipeline(
 
     base_dir = Path(config_path).parent.parent
     logger.info(f"Starting IPTV Sanity Agent (env: {config.environment})")
+    if offline_snapshot is not None:
+        logger.info(f"Offline mode: replaying {offline_snapshot}")
+        skip_validation = True
+        skip_stream_health = True
 
-    # Step 1: Load from all sources
-    logger.info("Step 1: Loading channels from sources...")
-    all_channels: list[RawChannel] = []
-    taxonomies: dict[str, list[dict[str, object]]] = {}
+    http_cache = (
+        HttpCache(base_dir / config.http_cache.directory) if config.http_cache.enabled else None
+    )
+    # Replayed snapshots never touch the incremental state of live runs.
+    delta = None
+    if config.delta.enabled and offline_snapshot is None:
+        delta = DeltaState(base_dir / config.delta.state_file, config.delta.max_reuse_runs)
+        delta.load()
+    fetch_slots = asyncio.Semaphore(max(1, config.source_concurrency))
+    loaders = _build_loaders(
+        config,
+        http_cache,
+        fetch_slots,
+        offline_snapshot,
+        keep_snapshot=save_snapshot is not None,
+        delta=delta,
+        base_dir=base_dir,
+    )
+    normalizer = Normalizer(config.normalization, config.default_country)
+    validator = None
+    validation_cache = None
+    if not skip_validation and config.validation.enabled:
+        if config.validation_cache.enabled:
+            cache_config = config.validation_cache
+            validation_cache = ValidationCache(
+                base_dir / cache_config.path,
+                positive_ttl_seconds=cache_config.positive_ttl_hours * 3600,
+                negative_ttl_seconds=cache_config.negative_ttl_hours * 3600,
+                jitter=cache_config.jitter,
+            )
+        validator = StreamValidator(
+            config.validation,
+            reuse=delta,
+            target_countries=config.target_countries,
+            cache=validation_cache,
+        )
 
-    # Load M3U sources
-    if config.sources.get("m3u") and config.sources["m3u"].enabled:
-        m3u_loader = M3ULoader(config.sources["m3u"])
-        try:
-            m3u_channels = await m3u_loader.load()
-            all_channels.extend(m3u_channels)
-        except Exception as e:
-            logger.error(f"Failed to load M3U: {e}")
-            if "primary_source_fetch_failed" in config.failure_handling.get("hard_fail", []):
+    # Every exit, early failures included, keeps the checks done so far.
+    try:
+        if streaming:
+            logger.info("Steps 1-3: Streaming channels through normalization and validation...")
+            streamed = await _load_streaming(loaders, normalizer, validator, config)
+            if streamed is None:
+                return 1
+            normalized_channels, dead_streams_detected = streamed
+            if not normalized_channels:
+                logger.error("No channels loaded from any source")
                 return 1
+        else:
+            loaded = await _load_batch(loaders, config)
+            if loaded is None:
+                return 1
+            all_channels = loaded
+            logger.info(f"Loaded {len(all_channels)} channels from all sources")
 
-    # Load IPTV-org sources
-    if config.sources.get("iptv_org") and config.sources["iptv_org"].enabled:
-        iptv_org_loader = IptvOrgLoader(
-            config.sources["iptv_org"],
-            target_countries=config.target_countries,
-            filter_nsfw=bool(config.processing.get("filter_nsfw", True)),
-        )
-        try:
-            iptv_org_channels = await iptv_org_loader.load()
-            all_channels.extend(iptv_org_channels)
-            taxonomies = iptv_org_loader.taxonomies
-        except Exception as e:
-            logger.warning(f"Failed to load IPTV-org: {e}")
-            if "upstream_schema_mismatch" in config.failure_handling.get(
-                "hard_fail", []
-            ) and isinstance(getattr(e, "cause", None), UpstreamSchemaError):
+            if not all_channels:
+                logger.error("No channels loaded from any source")
                 return 1
 
-    logger.info(f"Loaded {len(all_channels)} channels from all sources")
+            # Step 2: Normalize channels
+            logger.info("Step 2: Normalizing channels...")
+            normalized_channels = normalizer.normalize(all_channels)
+            logger.info(f"Normalized {len(normalized_channels)} channels")
 
-    if not all_channels:
-        logger.error("No channels loaded from any source")
-        return 1
+            # Step 3: Validate streams (optional)
+            dead_streams_detected = 0
+            if validator is not None:
+                logger.info("Step 3: Validating streams...")
+                normalized_channels, dead_streams_detected = await validator.validate(
+                    normalized_channels
+                )
+            else:
+                logger.info("Step 3: Skipping stream validation")
 
-    # Step 2: Normalize channels
-    logger.info("Step 2: Normalizing channels...")
-    normalizer = Normalizer(config.normalization, config.default_country)
-    normalized_channels = normalizer.normalize(all_channels)
-    logger.info(f"Normalized {len(normalized_channels)} channels")
+        taxonomies: dict[str, list[dict[str, object]]] = {}
+        for loader in loaders:
+            if isinstance(loader, IptvOrgLoader):
+                taxonomies = loader.taxonomies
+                if save_snapshot is not None:
+                    try:
+                        loader.save_snapshot(save_snapshot)
+                    except (OSError, SnapshotError) as e:
+                        logger.warning(f"Failed to save IPTV-org snapshot: {e}")
 
-    # Step 3: Validate streams (optional)
-    dead_streams_detected = 0
-    if not skip_validation and config.validation.enabled:
-        logger.info("Step 3: Validating streams...")
-        validator = StreamValidator(config.validation)
-        normalized_channels, dead_streams_detected = await validator.validate(normalized_channels)
-    else:
-        logger.info("Step 3: Skipping stream validation")
+        # Step 4: Deduplicate
+        logger.info("Step 4: Deduplicating channels...")
+        deduplicator = Deduplicator(config.deduplication)
+        processed_channels, duplicates_merged = deduplicator.deduplicate(normalized_channels)
 
-    # Step 4: Deduplicate
-    logger.info("Step 4: Deduplicating channels...")
-    deduplicator = Deduplicator(config.deduplication)
-    processed_channels, duplicates_merged = deduplicator.deduplicate(normalized_channels)
-
-    # Step 5: Inspect media facts. This stage is deliberately soft-fail:
-    # individual failures and budget exhaustion remain "unchecked".
-    if config.stream_health.enabled and not skip_stream_health:
-        logger.info("Step 5: Inspecting bounded stream health...")
-        health_started = time.monotonic()
-        health_processor = StreamHealthProcessor(config.stream_health)
-        processed_channels, health_summary = await health_processor.enrich(processed_channels)
-        logger.info(
-            "Stream health completed "
-            f"available={health_summary.available} "
-            f"restricted={health_summary.restricted} "
-            f"unavailable={health_summary.unavailable} "
-            f"unchecked={health_summary.unchecked} "
-            f"duration_seconds={time.monotonic() - health_started:.2f}"
+        # Step 5: Inspect media facts. This stage is deliberately soft-fail:
+        # individual failures and budget exhaustion remain "unchecked".
+        if config.stream_health.enabled and not skip_stream_health:
+            logger.info("Step 5: Inspecting bounded stream health...")
+            health_started = time.monotonic()
+            health_processor = StreamHealthProcessor(config.stream_health, reuse=delta)
+            processed_channels, health_summary = await health_processor.enrich(processed_channels)
+            logger.info(
+                "Stream health completed "
+                f"available={health_summary.available} "
+                f"restricted={health_summary.restricted} "
+                f"unavailable={health_summary.unavailable} "
+                f"unchecked={health_summary.unchecked} "
+                f"duration_seconds={time.monotonic() - health_started:.2f}"
+            )
+        else:
+            logger.info("Step 5: Skipping stream health")
+
+        # Step 6: Enrich
+        logger.info("Step 6: Enriching channels...")
+        enricher = Enricher(
+            base_dir / config.enrichment.get("flavor_rules_file", "rules/flavor_rules.json"),
+            base_dir / config.enrichment.get("category_rules_file", "rules/category_rules.json"),
+            base_dir / config.enrichment.get("language_rules_file", "rules/language_rules.json"),
         )
-    else:
-        logger.info("Step 5: Skipping stream health")
-
-    # Step 6: Enrich
-    logger.info("Step 6: Enriching channels...")
-    enricher = Enricher(
-        base_dir / config.enrichment.get("flavor_rules_file", "rules/flavor_rules.json"),
-        base_dir / config.enrichment.get("category_rules_file", "rules/category_rules.json"),
-        base_dir / config.enrichment.get("language_rules_file", "rules/language_rules.json"),
-    )
-    processed_channels = enricher.enrich(processed_channels)
-
-    # Check thresholds
-    thresholds = config.output.thresholds
-    if len(processed_channels) < thresholds.get("min_channels", 100):
-        logger.error(
-            f"Channel count {len(processed_channels)} below threshold "
-            f"{thresholds.get('min_channels', 100)}"
+        processed_channels = enricher.enrich(processed_channels)
+
+        # Check thresholds
+        thresholds = config.output.thresholds
+        if len(processed_channels) < thresholds.get("min_channels", 100):
+            logger.error(
+                f"Channel count {len(processed_channels)} below threshold "
+                f"{thresholds.get('min_channels', 100)}"
+            )
+            if "threshold_not_met" in config.failure_handling.get("hard_fail", []):
+                return 1
+
+        # Build metadata
+        processing_time = time.time() - start_time
+        version = datetime.now(UTC).strftime("%Y.%m.%d")
+
+        metadata = PipelineMetadata(
+            version=version,
+            generated_at=datetime.now(UTC),
+            checksum="",  # Will be filled by exporter
+            total_channels=len(processed_channels),
+            channels_by_country=dict(Counter(c.country for c in processed_channels)),
+            channels_by_category=dict(Counter(c.category for c in processed_channels)),
+            channels_by_flavor=dict(Counter(c.flavor for c in processed_channels)),
+            sources_used=list({s for c in processed_channels for s in c.sources}),
+            dead_streams_removed=0,
+            dead_streams_detected=dead_streams_detected,
+            duplicates_merged=duplicates_merged,
+            processing_time_seconds=round(processing_time, 2),
         )
-        if "threshold_not_met" in config.failure_handling.get("hard_fail", []):
-            return 1
-
-    # Build metadata
-    processing_time = time.time() - start_time
-    version = datetime.now(UTC).strftime("%Y.%m.%d")
-
-    metadata = PipelineMetadata(
-        version=version,
-        generated_at=datetime.now(UTC),
-        checksum="",  # Will be filled by exporter
-        total_channels=len(processed_channels),
-        channels_by_country=dict(Counter(c.country for c in processed_channels)),
-        channels_by_category=dict(Counter(c.category for c in processed_channels)),
-        channels_by_flavor=dict(Counter(c.flavor for c in processed_channels)),
-        sources_used=list({s for c in processed_channels for s in c.sources}),
-        dead_streams_removed=0,
-        dead_streams_detected=dead_streams_detected,
-        duplicates_merged=duplicates_merged,
-        processing_time_seconds=round(processing_time, 2),
+
+        # Step 7: Export
+        logger.info("Step 7: Exporting results...")
+        json_exporter = JsonExporter(config.output, base_dir)
+        json_exporter.backup_previous()
+        json_exporter.export(processed_channels, metadata, taxonomies=taxonomies)
+
+        if "m3u" in config.output.secondary_formats:
+            m3u_exporter = M3UExporter(config.output, base_dir)
+            m3u_exporter.export(processed_channels)
+
+        logger.info(f"Pipeline completed in {processing_time:.2f}s")
+        logger.info(f"Output: {len(processed_channels)} channels, {duplicates_merged} merged")
+        return 0
+    finally:
+        if delta is not None:
+            try:
+                delta.save()
+            except OSError as e:
+                logger.warning(f"Failed to save delta state: {e}")
+        if validation_cache is not None:
+            validation_cache.close()
+
+
+async def _load_batch(loaders: list[BaseLoader], config: Config) -> list[RawChannel] | None:
+    """Load every source to completion and merge them in configuration order.
+
+    Returns:
+        Merged raw channels, or None when a source failure is fatal.
+    """
+    # Step 1: Load from all sources concurrently. Results are merged in
+    # configuration order, so channel order never depends on fetch timing.
+    logger.info("Step 1: Loading channels from sources...")
+    results = await asyncio.gather(
+        *(loader.load() for loader in loaders), return_exceptions=True
     )
 
-    # Step 7: Export
-    logger.info("Step 7: Exporting results...")
-    json_exporter = JsonExporter(config.output, base_dir)
-    json_exporter.backup_previous()
-    json_exporter.export(processed_channels, metadata, taxonomies=taxonomies)
+    all_channels: list[RawChannel] = []
+    for loader, result in zip(loaders, results, strict=True):
+        if isinstance(result, BaseException):
+            if _is_fatal_source_failure(loader, result, config):
+                return None
+            continue
+        all_channels.extend(result)
+    return all_channels
+
+
+class _FatalSourceError(Exception):
+    """Aborts a streaming load after a hard-fail source failure."""
+
+
+async def _load_streaming(
+    loaders: list[BaseLoader],
+    normalizer: Normalizer,
+    validator: StreamValidator | None,
+    config: Config,
+) -> tuple[list[NormalizedChannel], int] | None:
+    """Normalize and validate channels as the loaders yield them.
+
+    Each channel is normalized on arrival and handed straight to the
+    validator, so checks overlap the remaining downloads. Output keeps the
+    batch order (sources in configuration order), and a source that fails
+    softly contributes nothing, exactly as in batch mode.
+
+    Returns:
+        Tuple of (normalized channels, unavailable count), or None when a
+        source failure is fatal.
+    """
+    per_source: list[list[NormalizedChannel]] = [[] for _ in loaders]
+    queue: asyncio.Queue[NormalizedChannel | None] = asyncio.Queue()
+    running = len(loaders)
+    if not running:
+        # No pump will ever end the validator's input; end it now.
+        queue.put_nowait(None)
 
-    if "m3u" in config.output.secondary_formats:
-        m3u_exporter = M3UExporter(config.output, base_dir)
-        m3u_exporter.export(processed_channels)
+    async def pump(index: int, loader: BaseLoader) -> None:
+        nonlocal running
+        try:
+            async for raw_channel in loader.iter_channels():
+                channel = normalizer.normalize_channel(raw_channel)
+                if channel is None:
+                    continue
+                per_source[index].append(channel)
+                if validator is not None:
+                    queue.put_nowait(channel)
+        except Exception as e:
+            per_source[index] = []
+            if _is_fatal_source_failure(loader, e, config):
+                raise _FatalSourceError from e
+        finally:
+            running -= 1
+            if running == 0:
+                queue.put_nowait(None)
+
+    async def drain() -> AsyncIterator[NormalizedChannel]:
+        while (channel := await queue.get()) is not None:
+            yield channel
 
-    logger.info(f"Pipeline completed in {processing_time:.2f}s")
-    logger.info(f"Output: {len(processed_channels)} channels, {duplicates_merged} merged")
-    return 0
+    aborted = False
+    try:
+        async with asyncio.TaskGroup() as group:
+            for index, loader in enumerate(loaders):
+                group.create_task(pump(index, loader))
+            if validator is not None:
+                group.create_task(validator.validate_stream(drain()))
+    except* _FatalSourceError:
+        aborted = True
+    if aborted:
+        return None
+
+    channels = [channel for channels in per_source for channel in channels]
+    logger.info(f"Loaded and normalized {len(channels)} channels from all sources")
+    if validator is None:
+        logger.info("Step 3: Skipping stream validation")
+        return channels, 0
+    # Channels of a source that failed softly were checked before it failed;
+    # count only what survives into the output.
+    dead_streams_detected = sum(
+        channel.validation_status in (ValidationStatus.INVALID, ValidationStatus.TIMEOUT)
+        for channel in channels
+    )
+    return channels, dead_streams_detected
+
+
+def _build_loaders(
+    config: Config,
+    http_cache: HttpCache | None,
+    fetch_slots: asyncio.Semaphore,
+    offline_snapshot: str | Path | None = None,
+    keep_snapshot: bool = False,
+    delta: DeltaState | None = None,
+    base_dir: Path | None = None,
+) -> list[BaseLoader]:
+    """Create the enabled source loaders in merge order.
+
+    Offline runs use only the IPTV-org loader, replaying ``offline_snapshot``.
+    ``keep_snapshot`` makes the IPTV-org loader keep every upstream row so
+    its snapshot can be saved; ``delta`` receives its record hashes. Local
+    file paths resolve against ``base_dir``.
+    """
+    loaders: list[BaseLoader] = []
+    if offline_snapshot is not None:
+        iptv_org = config.sources.get("iptv_org") or SourceConfig()
+        loaders.append(
+            IptvOrgLoader(
+                dataclasses.replace(iptv_org, enabled=True),
+                target_countries=config.target_countries,
+                filter_nsfw=bool(config.processing.get("filter_nsfw", True)),
+                snapshot_path=offline_snapshot,
+            )
+        )
+        return loaders
+    if config.sources.get("m3u") and config.sources["m3u"].enabled:
+        loaders.append(
+            M3ULoader(config.sources["m3u"], http_cache=http_cache, fetch_slots=fetch_slots)
+        )
+    if config.sources.get("iptv_org") and config.sources["iptv_org"].enabled:
+        loaders.append(
+            IptvOrgLoader(
+                config.sources["iptv_org"],
+                target_countries=config.target_countries,
+                filter_nsfw=bool(config.processing.get("filter_nsfw", True)),
+                http_cache=http_cache,
+                fetch_slots=fetch_slots,
+                keep_snapshot=keep_snapshot,
+                delta=delta,
+            )
+        )
+    if config.sources.get("custom") and config.sources["custom"].enabled:
+        loaders.append(
+            LocalFileLoader(config.sources["custom"], base_dir=base_dir, fetch_slots=fetch_slots)
+        )
+    return loaders
+
+
+def _is_fatal_source_failure(loader: BaseLoader, error: BaseException, config: Config) -> bool:
+    """Apply the per-source hard-fail/soft-fail policy to a loader failure."""
+    hard_fail = config.failure_handling.get("hard_fail", [])
+    if isinstance(loader, LocalFileLoader):
+        logger.warning(f"Failed to load local sources: {error}")
+        return "custom_sources_failed" in hard_fail
+    if isinstance(loader, IptvOrgLoader):
+        logger.warning(f"Failed to load IPTV-org: {error}")
+        return "upstream_schema_mismatch" in hard_fail and isinstance(
+            getattr(error, "cause", None), UpstreamSchemaError
+        )
+    logger.error(f"Failed to load M3U: {error}")
+    return "primary_source_fetch_failed" in hard_fail
 
 
 def main() -> None:
@@ -197,6 +420,21 @@ def main() -> None:
         action="store_true",
         help="Skip bounded ffprobe inspection",
     )
+    parser.add_argument(
+        "--offline-snapshot",
+        metavar="PATH",
+        help="Replay a stored IPTV-org snapshot with no network access",
+    )
+    parser.add_argument(
+        "--save-snapshot",
+        metavar="PATH",
+        help="Store the validated IPTV-org snapshot for later offline runs",
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Normalize and validate channels while sources are still loading",
+    )
     args = parser.parse_args()
 
     exit_code = asyncio.run(
@@ -204,6 +442,9 @@ def main() -> None:
             args.config,
             skip_validation=args.skip_validation,
             skip_stream_health=args.skip_stream_health,
+            streaming=args.streaming,
+            offline_snapshot=args.offline_snapshot,
+            save_snapshot=args.save_snapshot,
         )
     )
     sys.exit(exit_code)
@@ -1,9 +1,18 @@
 """Data models for IPTV channel processing."""
 
+import sys
+from collections.abc import Iterator, MutableMapping
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Any
+from typing import Any, TypeVar
+
+_Text = TypeVar("_Text", str, str | None)
+
+
+def _intern(value: _Text) -> _Text:
+    """Intern a high-repetition string so equal values share one object."""
+    return sys.intern(value) if type(value) is str else value
 
 
 class SourceType(Enum):
@@ -22,15 +31,21 @@ class ValidationStatus(Enum):
     TIMEOUT = "timeout"
     SKIPPED = "skipped"
     UNKNOWN = "unknown"
+    # Not reached before the validation budget ran out.
+    UNCHECKED = "unchecked"
 
 
-@dataclass
+@dataclass(slots=True)
 class ChannelHeaders:
     """HTTP headers for stream access."""
 
     user_agent: str | None = None
     referrer: str | None = None
 
+    def __post_init__(self) -> None:
+        self.user_agent = _intern(self.user_agent)
+        self.referrer = _intern(self.referrer)
+
     def to_dict(self) -> dict[str, str]:
         """Convert to dictionary, excluding None values."""
         result = {}
@@ -41,7 +56,7 @@ class ChannelHeaders:
         return result
 
 
-@dataclass
+@dataclass(slots=True)
 class RawChannel:
     """Raw channel data from source (before normalization)."""
 
@@ -55,10 +70,15 @@ class RawChannel:
     country: str | None = None
     language: str | None = None
     headers: ChannelHeaders | None = None
-    extra_attrs: dict[str, Any] = field(default_factory=dict)
+    extra_attrs: MutableMapping[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self.group_title = _intern(self.group_title)
+        self.country = _intern(self.country)
+        self.language = _intern(self.language)
 
 
-@dataclass
+@dataclass(slots=True)
 class NormalizedChannel:
     """Channel after normalization (before deduplication)."""
 
@@ -77,14 +97,113 @@ class NormalizedChannel:
     alt_names: list[str] = field(default_factory=list)
     headers: ChannelHeaders | None = None
     validation_status: ValidationStatus = ValidationStatus.UNKNOWN
-    extra_attrs: dict[str, Any] = field(default_factory=dict)
+    extra_attrs: MutableMapping[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self.category = _intern(self.category)
+        self.country = _intern(self.country)
+        self.language = _intern(self.language)
+        self.flavor = _intern(self.flavor)
+        self.group = _intern(self.group)
 
     def composite_key(self) -> str:
         """Generate composite key for deduplication."""
         return f"{self.normalized_name}:{self.country}:{self.language}".lower()
 
 
-@dataclass
+class StreamSource(MutableMapping[str, Any]):
+    """One candidate stream of a processed channel, keyed as in the JSON export.
+
+    Known keys live in slots rather than a per-source dict; an unset slot is
+    an absent key. Known keys iterate in ``KEYS`` order, which is the order
+    the deduplicator and the stream health stage add them, so ``dict(source)``
+    matches the dict this record replaces. Any other key is kept in a small
+    overflow dict and iterates last.
+    """
+
+    KEYS = (
+        "url",
+        "health",
+        "feedId",
+        "advertisedQuality",
+        "quality",
+        "userAgent",
+        "referrer",
+        "labelCorrect",
+        "framesPerSecond",
+        "height",
+        "bitrate",
+        "responseMs",
+        "redirects",
+        "resolvedUrl",
+        "videoCodec",
+        "width",
+        "lowFramerate",
+        "mislabeled",
+        "audioCodec",
+        "audioBitrate",
+        "audioChannels",
+        "actualQuality",
+        "healthDetails",
+    )
+    _KEY_SET = frozenset(KEYS)
+    __slots__ = (*KEYS, "_extra")
+
+    def __init__(self, **values: Any) -> None:
+        """Create a source from key/value pairs."""
+        self._extra: dict[str, Any] | None = None
+        for key, value in values.items():
+            self[key] = value
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._KEY_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in self._KEY_SET:
+            setattr(self, key, _intern(value) if key == "health" else value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in self._KEY_SET:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self._extra is None:
+            raise KeyError(key)
+        else:
+            del self._extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self.KEYS:
+            if hasattr(self, key):
+                yield key
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __contains__(self, key: object) -> bool:
+        if key in self._KEY_SET:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def __repr__(self) -> str:
+        return f"StreamSource({dict(self)!r})"
+
+
+@dataclass(slots=True)
 class ProcessedChannel:
     """Final processed channel ready for export."""
 
@@ -102,13 +221,20 @@ class ProcessedChannel:
     headers: ChannelHeaders | None
     sources: list[str]  # Source types that contributed to this channel
     provenance: str = "unknown"
-    stream_sources: list[dict[str, Any]] = field(default_factory=list)
+    stream_sources: list[StreamSource] = field(default_factory=list)
     is_working: bool = True
     categories: list[str] = field(default_factory=list)
     network: str | None = None
     owners: list[str] = field(default_factory=list)
     website: str | None = None
 
+    def __post_init__(self) -> None:
+        self.category = _intern(self.category)
+        self.country = _intern(self.country)
+        self.language = _intern(self.language)
+        self.flavor = _intern(self.flavor)
+        self.group = _intern(self.group)
+
     def to_dict(self) -> dict[str, Any]:
         """Convert to dictionary for JSON export."""
         result = {
@@ -125,7 +251,7 @@ class ProcessedChannel:
             "altNames": self.alt_names,
             "sources": self.sources,
             "provenance": self.provenance,
-            "streamSources": self.stream_sources,
+            "streamSources": [dict(source) for source in self.stream_sources],
             "isWorking": self.is_working,
             "categories": self.categories or [self.category],
         }
@@ -140,7 +266,7 @@ class ProcessedChannel:
         return result
 
 
-@dataclass
+@dataclass(slots=True)
 class PipelineMetadata:
     """Metadata about the pipeline run."""
 
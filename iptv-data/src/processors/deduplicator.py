@@ -1,11 +1,14 @@
 """Channel deduplication logic."""
 
+import math
 import re
+from collections.abc import Callable
 
 from ..models import (
     NormalizedChannel,
     ProcessedChannel,
     SourceType,
+    StreamSource,
     ValidationStatus,
 )
 from ..utils import get_logger
@@ -23,12 +26,34 @@ def canonical_channel_name(value: str) -> str:
 
 
 class Deduplicator:
-    """Deduplicates channels based on composite key matching."""
+    """Deduplicates channels based on composite key matching.
+
+    Within a group, sources are ranked by health, then main feed, then the
+    ``prefer_criteria`` in the order configured, then label correctness,
+    frame rate, resolution, bitrate and source priority. The criteria are
+    ``has_logo``, ``higher_quality`` (height, then bitrate),
+    ``faster_response`` (time to response headers from validation, in
+    ``response_bucket_ms`` steps so near-equal times fall through to the next
+    criterion) and ``fewer_redirects``. A source without a measurement ranks
+    after every measured one.
+    """
 
     def __init__(self, config: DeduplicationConfig) -> None:
         """Initialize deduplicator with configuration."""
         self.config = config
         self.priority_map = {source: idx for idx, source in enumerate(config.priority_order)}
+        criteria: dict[str, Callable[[NormalizedChannel], object]] = {
+            "has_logo": self._logo_rank,
+            "higher_quality": self._quality_rank,
+            "faster_response": self._response_rank,
+            "fewer_redirects": self._redirect_rank,
+        }
+        self.criteria = []
+        for name in config.prefer_criteria:
+            if name in criteria:
+                self.criteria.append(criteria[name])
+            else:
+                logger.warning(f"Ignoring unknown deduplication criterion: {name}")
 
     def deduplicate(self, channels: list[NormalizedChannel]) -> tuple[list[ProcessedChannel], int]:
         """Deduplicate channels and return merged list.
@@ -110,7 +135,7 @@ class Deduplicator:
         network = base.extra_attrs.get("network")
         owners = set(base.extra_attrs.get("owners", []))
         website = base.extra_attrs.get("website")
-        stream_sources: list[dict[str, object]] = []
+        stream_sources: list[StreamSource] = []
         categories = set()
 
         for channel in sorted_group:
@@ -187,6 +212,7 @@ class Deduplicator:
             ValidationStatus.VALID: 0,
             ValidationStatus.SKIPPED: 2,
             ValidationStatus.UNKNOWN: 2,
+            ValidationStatus.UNCHECKED: 2,
             ValidationStatus.TIMEOUT: 3,
             ValidationStatus.INVALID: 3,
         }
@@ -203,6 +229,7 @@ class Deduplicator:
         return (
             explicit_rank,
             0 if attrs.get("is_main_feed") is True else 1,
+            *(criterion(channel) for criterion in self.criteria),
             0 if attrs.get("label_correct") is True else 1,
             -float(attrs.get("fps") or -1),
             -int(attrs.get("height") or -1),
@@ -211,26 +238,53 @@ class Deduplicator:
             channel.stream_url,
         )
 
-    def _stream_source(self, channel: NormalizedChannel) -> dict[str, object]:
+    @staticmethod
+    def _logo_rank(channel: NormalizedChannel) -> int:
+        return 0 if channel.logo_url else 1
+
+    @staticmethod
+    def _quality_rank(channel: NormalizedChannel) -> tuple[int, int]:
+        attrs = channel.extra_attrs
+        return -int(attrs.get("height") or -1), -int(attrs.get("bitrate") or -1)
+
+    def _response_rank(self, channel: NormalizedChannel) -> float:
+        response_ms = channel.extra_attrs.get("response_ms")
+        if not isinstance(response_ms, (int, float)):
+            return math.inf
+        return float(response_ms) // max(1, self.config.response_bucket_ms)
+
+    @staticmethod
+    def _redirect_rank(channel: NormalizedChannel) -> float:
+        redirects = channel.extra_attrs.get("redirects")
+        return float(redirects) if isinstance(redirects, (int, float)) else math.inf
+
+    def _stream_source(self, channel: NormalizedChannel) -> StreamSource:
         rank = int(self._source_rank(channel)[0])
         health = {0: "available", 1: "restricted", 3: "unavailable"}.get(rank, "unchecked")
         attrs = channel.extra_attrs
-        return {
-            "url": channel.stream_url,
-            "health": health,
-            "feedId": attrs.get("feed_id"),
-            "advertisedQuality": attrs.get("quality"),
-            "quality": attrs.get("quality"),
-            "userAgent": channel.headers.user_agent if channel.headers else None,
-            "referrer": channel.headers.referrer if channel.headers else None,
-            "labelCorrect": attrs.get("label_correct") is True,
-            "framesPerSecond": attrs.get("fps"),
-            "height": attrs.get("height"),
-            "bitrate": attrs.get("bitrate"),
-        }
-
-    def _unique_stream_sources(self, sources: list[dict[str, object]]) -> list[dict[str, object]]:
-        by_url: dict[str, dict[str, object]] = {}
+        source = StreamSource(
+            url=channel.stream_url,
+            health=health,
+            feedId=attrs.get("feed_id"),
+            advertisedQuality=attrs.get("quality"),
+            quality=attrs.get("quality"),
+            userAgent=channel.headers.user_agent if channel.headers else None,
+            referrer=channel.headers.referrer if channel.headers else None,
+            labelCorrect=attrs.get("label_correct") is True,
+            framesPerSecond=attrs.get("fps"),
+            height=attrs.get("height"),
+            bitrate=attrs.get("bitrate"),
+        )
+        # Only validated sources carry timings; others keep their export unchanged.
+        if attrs.get("response_ms") is not None:
+            source["responseMs"] = attrs["response_ms"]
+            source["redirects"] = attrs.get("redirects")
+        if attrs.get("redirect_stable") is True:
+            source["resolvedUrl"] = attrs["resolved_url"]
+        return source
+
+    def _unique_stream_sources(self, sources: list[StreamSource]) -> list[StreamSource]:
+        by_url: dict[str, StreamSource] = {}
         for source in sources:
             by_url.setdefault(str(source["url"]), source)
         return list(by_url.values())
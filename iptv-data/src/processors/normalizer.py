@@ -1,5 +1,6 @@
 """Channel name normalization."""
 
+import functools
 import hashlib
 import re
 
@@ -9,6 +10,82 @@ from ..utils.config import NormalizationConfig
 
 logger = get_logger(__name__)
 
+# Normalized names memoised per Normalizer; names repeat across streams and sources.
+NAME_CACHE_SIZE = 65536
+_SYMBOLS = re.compile(r"[^\w\s]")
+_WHITESPACE_RUN = re.compile(r"\s+")
+
+
+class SuffixStripper:
+    """Removes configured name suffixes in one backward scan.
+
+    The result is exactly that of applying, in list order, one
+    case-insensitive substitution per suffix that removes it at the end of
+    the name together with the whitespace, underscore or dash before it:
+    after a strip, only suffixes later in the list are considered. Candidate tails are looked up
+    in a table keyed by suffix length and lowercased text, so the cost
+    depends on the number of distinct suffix lengths, not of suffixes.
+    Inputs the table cannot decide exactly (a trailing newline, which ``$``
+    treats specially, or non-ASCII suffixes) use the substitutions
+    themselves.
+    """
+
+    def __init__(self, suffixes: list[str]) -> None:
+        """Index ``suffixes`` by length and lowercased text."""
+        self._patterns = [
+            re.compile(rf"(?:^|[\s_-]){re.escape(suffix)}$", re.IGNORECASE)
+            for suffix in suffixes
+        ]
+        self._exact = all(suffix and suffix.isascii() for suffix in suffixes)
+        tables: dict[int, dict[str, list[int]]] = {}
+        for index, suffix in enumerate(suffixes):
+            tables.setdefault(len(suffix), {}).setdefault(suffix.lower(), []).append(index)
+        self._tables = sorted(tables.items())
+        self._matchers = {
+            index: re.compile(re.escape(suffix), re.IGNORECASE)
+            for index, suffix in enumerate(suffixes)
+        }
+
+    def strip(self, text: str) -> str:
+        """Return ``text`` with its trailing suffixes removed."""
+        if not self._exact or text.endswith("\n"):
+            for pattern in self._patterns:
+                text = pattern.sub("", text)
+            return text
+
+        end = len(text)
+        next_index = 0
+        while True:
+            best_index = -1
+            best_begin = 0
+            for length, table in self._tables:
+                begin = end - length
+                if begin < 0:
+                    break
+                if begin and not (text[begin - 1].isspace() or text[begin - 1] in "_-"):
+                    continue
+                tail = text[begin:end]
+                if tail.isascii():
+                    indices = table.get(tail.lower(), ())
+                else:
+                    # Case-insensitive matching folds some non-ASCII letters
+                    # (e.g. the Kelvin sign) onto ASCII ones.
+                    indices = sorted(
+                        index
+                        for indices in table.values()
+                        for index in indices
+                        if self._matchers[index].fullmatch(tail)
+                    )
+                for index in indices:
+                    if index >= next_index:
+                        if best_index == -1 or index < best_index:
+                            best_index, best_begin = index, begin
+                        break
+            if best_index == -1:
+                return text[:end]
+            end = best_begin - 1 if best_begin else 0
+            next_index = best_index + 1
+
 
 class Normalizer:
     """Normalizes channel names and generates stable IDs."""
@@ -17,30 +94,32 @@ class Normalizer:
         """Initialize normalizer with configuration."""
         self.config = config
         self.default_country = default_country
-        self._suffix_patterns: list[re.Pattern[str]] = self._build_suffix_patterns()
-
-    def _build_suffix_patterns(self) -> list[re.Pattern[str]]:
-        """Build regex patterns for suffix removal."""
-        patterns = []
-        for suffix_list in self.config.remove_suffixes.values():
-            for suffix in suffix_list:
-                # Match suffix at end of string, must be preceded by space/underscore/dash
-                # (not just any character to avoid matching partial words like "Plus" -> "Pl")
-                pattern = re.compile(rf"(?:^|[\s_-]){re.escape(suffix)}$", re.IGNORECASE)
-                patterns.append(pattern)
-        return patterns
+        # A suffix must follow a space/underscore/dash (or start the name), so
+        # partial words are kept ("Plus" does not lose "us").
+        self._suffixes = SuffixStripper(
+            [suffix for suffix_list in config.remove_suffixes.values() for suffix in suffix_list]
+        )
+        self._cached_name = functools.lru_cache(maxsize=NAME_CACHE_SIZE)(
+            self._compute_normalized_name
+        )
 
     def normalize(self, channels: list[RawChannel]) -> list[NormalizedChannel]:
         """Normalize a list of raw channels."""
         normalized = []
         for channel in channels:
-            try:
-                normalized_channel = self._normalize_channel(channel)
+            normalized_channel = self.normalize_channel(channel)
+            if normalized_channel is not None:
                 normalized.append(normalized_channel)
-            except Exception as e:
-                logger.warning(f"Failed to normalize channel {channel.name}: {e}")
         return normalized
 
+    def normalize_channel(self, channel: RawChannel) -> NormalizedChannel | None:
+        """Normalize one channel, logging and dropping it on failure."""
+        try:
+            return self._normalize_channel(channel)
+        except Exception as e:
+            logger.warning(f"Failed to normalize channel {channel.name}: {e}")
+            return None
+
     def _normalize_channel(self, channel: RawChannel) -> NormalizedChannel:
         """Normalize a single channel."""
         # Normalize the name
@@ -78,6 +157,10 @@ class Normalizer:
 
     def _normalize_name(self, name: str) -> str:
         """Normalize a channel name for comparison."""
+        return self._cached_name(name)
+
+    def _compute_normalized_name(self, name: str) -> str:
+        """Normalize a channel name, bypassing the cache."""
         result = name
 
         # Lowercase
@@ -86,17 +169,14 @@ class Normalizer:
 
         # Strip symbols (keep alphanumeric and spaces)
         if self.config.strip_symbols:
-            result = re.sub(r"[^\w\s]", "", result)
+            result = _SYMBOLS.sub("", result)
 
         # Collapse whitespace
         if self.config.collapse_whitespace:
-            result = re.sub(r"\s+", " ", result).strip()
+            result = _WHITESPACE_RUN.sub(" ", result).strip()
 
         # Remove suffixes
-        for pattern in self._suffix_patterns:
-            result = pattern.sub("", result)
-
-        return result.strip()
+        return self._suffixes.strip(result).strip()
 
     def _generate_id(
         self,
@@ -135,7 +215,7 @@ class Normalizer:
         # Try to extract from extra attrs
         languages = channel.extra_attrs.get("languages", [])
         if languages and isinstance(languages, list) and languages[0]:
-            return languages[0][:2].lower()
+            return str(languages[0])[:2].lower()
 
         return "en"
 
@@ -1,17 +1,51 @@
 """Bounded ffprobe-backed stream health enrichment."""
 
 import asyncio
+import contextlib
 import json
+import math
 import re
-from collections.abc import Awaitable, Callable
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, MutableMapping
 from dataclasses import dataclass
 from typing import Any
+from urllib.parse import urlsplit
 
-from ..models import ProcessedChannel
+import aiohttp
+
+from ..models import ChannelHeaders, ProcessedChannel
+from ..utils import get_logger
+from ..utils.concurrency import AdaptiveConcurrency
 from ..utils.config import StreamHealthConfig
+from ..utils.delta import DeltaState
+from ..utils.hls import codec_names, parse_master_playlist
+from ..utils.host_health import HostHealth
+from ..utils.host_scheduler import HostScheduler
+
+logger = get_logger(__name__)
 
 ProbeRunner = Callable[[str, dict[str, str], float], Awaitable[dict[str, Any]]]
 
+# ffprobe error output meaning the host, not the stream, is unreachable.
+# Matched after the input URL is removed, since ffprobe prefixes its error
+# lines with it and a host such as ssl.cdn.example must not match.
+UNREACHABLE_MARKERS = (
+    "connection refused",
+    "connection timed out",
+    "failed to resolve",
+    "name or service not known",
+    "no route to host",
+    "network is unreachable",
+    "ssl handshake",
+    "certificate verify failed",
+    "tls:",
+    "tls handshake",
+)
+
+# Master playlists are small; reading stops here so a mislabeled media
+# stream is not downloaded.
+MAX_PLAYLIST_BYTES = 256 * 1024
+
 
 @dataclass(frozen=True)
 class StreamHealthSummary:
@@ -24,21 +58,54 @@ class StreamHealthSummary:
 
 
 class StreamHealthProcessor:
-    """Adds authoritative media facts without dropping any source."""
+    """Adds authoritative media facts without dropping any source.
+
+    With ``hls_probe``, each source's HLS master playlist is fetched
+    in-process first (up to ``hls_max_concurrent`` at a time) and its best
+    variant's RESOLUTION, FRAME-RATE, CODECS and BANDWIDTH stand in for the
+    ffprobe facts. Only sources that are not HLS, or whose playlist lacks
+    a resolution or frame rate, wait for an ffprobe slot.
+    """
 
     def __init__(
         self,
         config: StreamHealthConfig,
         runner: ProbeRunner | None = None,
+        reuse: DeltaState | None = None,
     ) -> None:
         self.config = config
+        self.reuse = reuse
         self._runner = runner or self._run_ffprobe
+        self._session: aiohttp.ClientSession | None = None
+        self.playlist_probes = 0
 
     async def enrich(
         self, channels: list[ProcessedChannel]
     ) -> tuple[list[ProcessedChannel], StreamHealthSummary]:
-        """Probe sources within concurrency and global time budgets."""
-        semaphore = asyncio.Semaphore(max(1, self.config.max_concurrent))
+        """Probe sources within concurrency and global time budgets.
+
+        With ``adaptive_concurrency`` the number of probes in flight follows
+        an AIMD controller fed by probe latencies and timeouts, between
+        ``min_concurrent`` and ``max_adaptive_concurrent``. Sources on a host
+        whose probes keep timing out or failing to connect are left
+        unchecked without a probe (see ``HostHealth``).
+        """
+        concurrency = (
+            AdaptiveConcurrency(
+                self.config.max_concurrent,
+                minimum=self.config.min_concurrent,
+                maximum=self.config.max_adaptive_concurrent,
+            )
+            if self.config.adaptive_concurrency
+            else None
+        )
+        slots = HostScheduler(concurrency or self.config.max_concurrent)
+        playlist_slots = (
+            HostScheduler(self.config.hls_max_concurrent) if self.config.hls_probe else None
+        )
+        host_health = HostHealth(
+            self.config.host_failure_threshold, self.config.host_recovery_sample
+        )
         sources = [
             (channel, source)
             for channel in channels
@@ -46,23 +113,43 @@ class StreamHealthProcessor:
         ]
 
         async def inspect(
-            channel: ProcessedChannel, source: dict[str, Any]
+            channel: ProcessedChannel, source: MutableMapping[str, Any]
         ) -> None:
-            async with semaphore:
-                await self._inspect(channel, source)
+            if playlist_slots is not None:
+                async with playlist_slots.slot(str(source["url"])):
+                    if await self._inspect_playlist(channel, source, host_health):
+                        return
+            async with slots.slot(str(source["url"])):
+                started = time.monotonic()
+                timed_out = await self._inspect(channel, source, host_health)
+                if concurrency is not None:
+                    concurrency.record(time.monotonic() - started, timed_out=timed_out)
 
         tasks = [
             asyncio.create_task(inspect(channel, source))
             for channel, source in sources
         ]
-        try:
-            async with asyncio.timeout(self.config.global_budget_seconds):
-                await asyncio.gather(*tasks)
-        except TimeoutError:
-            for task in tasks:
-                if not task.done():
-                    task.cancel()
-            await asyncio.gather(*tasks, return_exceptions=True)
+        async with self._open_session():
+            try:
+                async with asyncio.timeout(self.config.global_budget_seconds):
+                    await asyncio.gather(*tasks)
+            except TimeoutError:
+                for task in tasks:
+                    if not task.done():
+                        task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+        if self.playlist_probes:
+            logger.info(
+                f"Stream health read {self.playlist_probes} sources from HLS playlists "
+                "without ffprobe"
+            )
+        if concurrency is not None:
+            logger.info(f"Stream health concurrency: {concurrency.summary()}")
+        if host_health.short_circuited:
+            logger.info(
+                f"Stream health skipped {host_health.short_circuited} probes "
+                f"to unreachable hosts: {', '.join(host_health.down_hosts)}"
+            )
 
         for channel in channels:
             channel.stream_sources.sort(key=self._rank)
@@ -80,32 +167,178 @@ class StreamHealthProcessor:
         return channels, StreamHealthSummary(**counts)
 
     async def _inspect(
-        self, channel: ProcessedChannel, source: dict[str, Any]
-    ) -> None:
+        self,
+        channel: ProcessedChannel,
+        source: MutableMapping[str, Any],
+        host_health: HostHealth | None = None,
+    ) -> bool:
+        """Probe one source; return whether the probe timed out."""
         status = str(source.get("health", "unchecked"))
         if status in {"restricted", "unavailable"}:
             source.setdefault("healthDetails", {"status": status})
+            return False
+        url = str(source["url"])
+        facts = self.reuse.reusable("health", url) if self.reuse is not None else None
+        if facts is None:
+            if host_health is not None and host_health.short_circuit(url) is not None:
+                source["health"] = "unchecked"
+                source["healthDetails"] = {"status": "unchecked"}
+                return False
+            headers = channel.headers.to_dict() if channel.headers else {}
+            try:
+                payload = await asyncio.wait_for(
+                    self._runner(url, headers, self.config.timeout_seconds),
+                    timeout=self.config.timeout_seconds,
+                )
+                facts = self._media_facts(payload)
+            except TimeoutError:
+                # The whole probe ran out of time; the host may well have answered.
+                source["health"] = "unchecked"
+                source["healthDetails"] = {"status": "unchecked"}
+                return True
+            except ConnectionError:
+                if host_health is not None:
+                    host_health.failure(url, "unchecked")
+                source["health"] = "unchecked"
+                source["healthDetails"] = {"status": "unchecked"}
+                return False
+            except (OSError, ValueError, json.JSONDecodeError):
+                source["health"] = "unchecked"
+                source["healthDetails"] = {"status": "unchecked"}
+                return False
+            if host_health is not None:
+                host_health.success(url)
+
+            if facts["width"] is None or facts["height"] is None:
+                source["health"] = "unchecked"
+                source["healthDetails"] = {"status": "unchecked"}
+                return False
+            # Only successful probes are kept: a failed one is retried next run.
+            if self.reuse is not None:
+                self.reuse.record("health", url, facts)
+        self._apply_facts(source, facts)
+        return False
+
+    @contextlib.asynccontextmanager
+    async def _open_session(self) -> AsyncIterator[None]:
+        """Hold one pooled session for the stage's playlist fetches."""
+        if not self.config.hls_probe:
+            yield
             return
-        headers = channel.headers.to_dict() if channel.headers else {}
-        try:
-            payload = await asyncio.wait_for(
-                self._runner(
-                    str(source["url"]),
-                    headers,
-                    self.config.timeout_seconds,
-                ),
-                timeout=self.config.timeout_seconds,
+        async with aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(
+                total=self.config.hls_timeout_seconds,
+                sock_connect=self.config.hls_timeout_seconds,
             )
-            facts = self._media_facts(payload)
-        except (TimeoutError, OSError, ValueError, json.JSONDecodeError):
-            source["health"] = "unchecked"
-            source["healthDetails"] = {"status": "unchecked"}
-            return
+        ) as session:
+            self._session = session
+            try:
+                yield
+            finally:
+                self._session = None
 
-        if facts["width"] is None or facts["height"] is None:
-            source["health"] = "unchecked"
-            source["healthDetails"] = {"status": "unchecked"}
-            return
+    async def _inspect_playlist(
+        self,
+        channel: ProcessedChannel,
+        source: MutableMapping[str, Any],
+        host_health: HostHealth | None = None,
+    ) -> bool:
+        """Take media facts from the source's HLS master playlist.
+
+        Returns whether the source is settled; if not, ffprobe inspects it.
+        """
+        if str(source.get("health", "unchecked")) in {"restricted", "unavailable"}:
+            return False
+        url = str(source["url"])
+        if self.reuse is not None and self.reuse.reusable("health", url) is not None:
+            return False
+        if host_health is not None and host_health.is_down(url):
+            return False
+        try:
+            text = await self._fetch_playlist(url, channel.headers)
+        except (aiohttp.ConnectionTimeoutError, aiohttp.ClientConnectorError):
+            if host_health is not None:
+                host_health.failure(url, "unchecked")
+            return False
+        except (TimeoutError, aiohttp.ClientError, UnicodeDecodeError):
+            return False
+        if host_health is not None:
+            host_health.success(url)
+        facts = self._playlist_facts(text) if text is not None else None
+        if facts is None:
+            return False
+        if self.reuse is not None:
+            self.reuse.record("health", url, facts)
+        self.playlist_probes += 1
+        self._apply_facts(source, facts)
+        return True
+
+    async def _fetch_playlist(self, url: str, headers: ChannelHeaders | None) -> str | None:
+        """Body of ``url`` if it is served as an HLS playlist, else None."""
+        if self._session is None:
+            return None
+        request_headers = {}
+        if headers is not None and headers.user_agent:
+            request_headers["User-Agent"] = headers.user_agent
+        if headers is not None and headers.referrer:
+            request_headers["Referer"] = headers.referrer
+        async with self._session.get(url, headers=request_headers) as response:
+            if response.status != 200:
+                return None
+            content_type = response.headers.get("Content-Type", "").lower()
+            path = urlsplit(str(response.url)).path.lower()
+            if "mpegurl" not in content_type and not path.endswith((".m3u8", ".m3u")):
+                return None
+            body = bytearray()
+            while len(body) < MAX_PLAYLIST_BYTES:
+                chunk = await response.content.read(MAX_PLAYLIST_BYTES - len(body))
+                if not chunk:
+                    break
+                body += chunk
+        return body.decode("utf-8")
+
+    @staticmethod
+    def _playlist_facts(text: str) -> dict[str, Any] | None:
+        """Media facts of the best variant of a master playlist, if it has them."""
+        try:
+            playlist = parse_master_playlist(text)
+        except ValueError:
+            return None
+        variants = [
+            variant
+            for variant in playlist.variants
+            if variant.width is not None and variant.height is not None
+        ]
+        if not variants:
+            return None
+        best = max(
+            variants,
+            key=lambda variant: (
+                variant.height,
+                variant.frame_rate or 0,
+                variant.bandwidth or 0,
+            ),
+        )
+        if best.frame_rate is None:
+            return None
+        video_codec, audio_codec = codec_names(best.codecs)
+        return {
+            "video_codec": video_codec,
+            "width": best.width,
+            "height": best.height,
+            "fps": best.frame_rate,
+            "audio_codec": audio_codec,
+            "audio_bitrate": None,
+            "audio_channels": (
+                playlist.audio_channels.get(best.audio_group)
+                if best.audio_group is not None
+                else None
+            ),
+            "bitrate": best.average_bandwidth or best.bandwidth,
+        }
+
+    def _apply_facts(self, source: MutableMapping[str, Any], facts: dict[str, Any]) -> None:
+        """Record probed media facts on ``source``."""
         advertised = self._advertised_height(source)
         actual_height = int(facts["height"])
         mislabeled = advertised is not None and advertised != actual_height
@@ -153,7 +386,7 @@ class StreamHealthProcessor:
         }
 
     @staticmethod
-    def _rank(source: dict[str, Any]) -> tuple[Any, ...]:
+    def _rank(source: MutableMapping[str, Any]) -> tuple[Any, ...]:
         status_rank = {
             "available": 0,
             "restricted": 2,
@@ -166,11 +399,15 @@ class StreamHealthProcessor:
             source.get("lowFramerate") is True,
             -float(source.get("framesPerSecond") or -1),
             -int(source.get("height") or -1),
+            # Then the deduplicator's timing criteria, so the fastest stays
+            # primary, and the URL so the order never depends on input order.
+            _measured(source.get("responseMs")),
+            _measured(source.get("redirects")),
             str(source.get("url", "")),
         )
 
     @staticmethod
-    def _advertised_height(source: dict[str, Any]) -> int | None:
+    def _advertised_height(source: MutableMapping[str, Any]) -> int | None:
         for value in (source.get("quality"), source.get("advertisedQuality")):
             match = re.search(r"(\d{3,4})p?", str(value or ""), re.IGNORECASE)
             if match:
@@ -224,10 +461,10 @@ class StreamHealthProcessor:
         process = await asyncio.create_subprocess_exec(
             *command,
             stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
         )
         try:
-            stdout, _ = await asyncio.wait_for(
+            stdout, stderr = await asyncio.wait_for(
                 process.communicate(), timeout=timeout
             )
         except BaseException:
@@ -236,6 +473,9 @@ class StreamHealthProcessor:
                 await process.wait()
             raise
         if process.returncode:
+            error = stderr.decode("utf-8", "replace").replace(url, "").lower()
+            if any(marker in error for marker in UNREACHABLE_MARKERS):
+                raise ConnectionError("ffprobe_unreachable")
             raise OSError("ffprobe_failed")
         decoded = json.loads(stdout)
         if not isinstance(decoded, dict):
@@ -252,3 +492,8 @@ def _optional_int(value: object) -> int | None:
         return None
     except (TypeError, ValueError):
         return None
+
+
+def _measured(value: object) -> float:
+    """Sort key of an optional measurement; unmeasured sources rank last."""
+    return float(value) if isinstance(value, (int, float)) else math.inf
@@ -1,26 +1,173 @@
 """Stream URL validation."""
 
 import asyncio
+import contextlib
 import fnmatch
-from typing import Any
+import time
+from collections import Counter
+from collections.abc import AsyncIterable, AsyncIterator, Collection, Sequence
+from urllib.parse import urlsplit, urlunsplit
 
 import aiohttp
 
 from ..models import NormalizedChannel, ValidationStatus
 from ..utils import get_logger
+from ..utils.concurrency import AdaptiveConcurrency
 from ..utils.config import ValidationConfig
+from ..utils.delta import DeltaState
+from ..utils.host_health import HostHealth
+from ..utils.host_scheduler import HostScheduler, parse_retry_after
+from ..utils.validation_cache import CachedRedirect, ValidationCache
 
 logger = get_logger(__name__)
 
+# Statuses that mean "slow down" rather than "gone" (503 only with Retry-After).
+THROTTLE_STATUSES = frozenset({429, 503})
+
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+# Failures that say the host, not the stream, is unreachable. A timeout
+# only counts while connecting: a host that accepted the connection answers.
+CONNECTION_ERRORS = (aiohttp.ClientConnectorError, aiohttp.ClientSSLError)
+
+# Response attributes a check stores in ``extra_attrs``.
+RESPONSE_ATTRS = ("response_ms", "redirects", "resolved_url", "redirect_chain", "redirect_stable")
+
+RequestKey = tuple[str, tuple[tuple[str, str], ...]]
+
+
+class HostThrottledError(Exception):
+    """A host asked for a back-off the validator is willing to wait out."""
+
+
+def canonical_url(url: str) -> str:
+    """Spelling of ``url`` shared by every equivalent way of writing it.
+
+    Scheme and host are lowercased, a default port and the fragment are
+    dropped, and an empty path becomes ``/``. Path and query are kept as
+    written, since servers may treat their case and order as significant.
+    """
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    netloc = (parts.hostname or "").lower()
+    if ":" in netloc:
+        netloc = f"[{netloc}]"
+    if port is not None and DEFAULT_PORTS.get(scheme) != port:
+        netloc = f"{netloc}:{port}"
+    if parts.username is not None or parts.password is not None:
+        userinfo = parts.netloc.rpartition("@")[0]
+        netloc = f"{userinfo}@{netloc}"
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
+
 
 class StreamValidator:
-    """Validates stream URLs by making HTTP HEAD requests."""
+    """Validates stream URLs by making HTTP HEAD requests.
+
+    Checks are scheduled per host: each host gets at most ``max_per_host``
+    requests in flight and ``host_requests_per_second`` new ones, and hosts
+    take turns for the ``max_concurrent`` global slots. A throttled response
+    backs its host off for the Retry-After it asked for, and the stream is
+    checked again instead of being reported unavailable. With
+    ``adaptive_concurrency`` the global limit is an AIMD controller fed by
+    check latencies and timeouts instead of a fixed ``max_concurrent``.
+
+    The most valuable channels are checked first: main feeds, then channels
+    of the target countries, then channels with the fewest alternative
+    sources. Checks still pending when ``global_budget_seconds`` runs out
+    are cancelled and their channels marked ``UNCHECKED``, not unavailable.
+
+    Each unique request (canonical URL plus the headers sent with it) is
+    checked once per run; every other channel carrying it takes the shared
+    outcome, and ``saved_requests`` counts those channels. With a
+    ``cache``, a request checked within its TTL on an earlier run takes the
+    stored outcome instead of being sent again. Requests to a host that
+    keeps failing to connect are short-circuited for the rest of the run
+    (see ``HostHealth``), so a dead origin costs a few timeouts, not one
+    per stream.
+
+    Every answered check records the time to response headers
+    (``response_ms``) and the redirects followed (``redirects``) in the
+    channel's ``extra_attrs``, for the deduplicator's ``faster_response``
+    and ``fewer_redirects`` criteria. A redirected check also records the
+    final URL (``resolved_url``) and the URLs that redirected
+    (``redirect_chain``). With a ``cache``, ``redirect_stable`` marks a
+    target reached on ``stable_redirect_checks`` live runs in a row, a run
+    served from the cache counting for the target of the check it reuses;
+    a target that changes between checks starts counting again, so
+    rotating or tokenized redirects are never pinned.
+    """
+
+    def __init__(
+        self,
+        config: ValidationConfig,
+        reuse: DeltaState | None = None,
+        target_countries: Collection[str] = (),
+        cache: ValidationCache | None = None,
+    ) -> None:
+        """Initialize validator with configuration.
 
-    def __init__(self, config: ValidationConfig) -> None:
-        """Initialize validator with configuration."""
+        With ``reuse`` set, streams unchanged since the previous run take
+        their stored status instead of being checked again, within the
+        state's reuse bound, and fresh statuses are recorded for next time.
+        """
         self.config = config
-        self.timeout = aiohttp.ClientTimeout(total=config.timeout_seconds)
-        self.semaphore = asyncio.Semaphore(config.max_concurrent)
+        self.reuse = reuse
+        self.target_countries = frozenset(target_countries)
+        self.cache = cache
+        self.timeout = aiohttp.ClientTimeout(
+            total=config.timeout_seconds, sock_connect=config.timeout_seconds
+        )
+        self.concurrency = (
+            AdaptiveConcurrency(
+                config.max_concurrent,
+                minimum=config.min_concurrent,
+                maximum=config.max_adaptive_concurrent,
+            )
+            if config.adaptive_concurrency
+            else None
+        )
+        self.scheduler = HostScheduler(
+            self.concurrency or config.max_concurrent,
+            max_per_host=config.max_per_host,
+            rate_per_second=config.host_requests_per_second,
+            burst=config.host_burst,
+        )
+        self._session: aiohttp.ClientSession | None = None
+        self._checks: dict[RequestKey, tuple[NormalizedChannel, asyncio.Future[bool]]] = {}
+        self.unique_requests = 0
+        self.saved_requests = 0
+        self.cached_results = 0
+        self.stable_redirects = 0
+        self.changed_redirects = 0
+        self.host_health = self._new_host_health()
+
+    @contextlib.asynccontextmanager
+    async def _open_session(self) -> AsyncIterator[aiohttp.ClientSession]:
+        """Share one pooled session across every check of a run.
+
+        Keep-alive connections, TLS sessions and resolved hosts are reused
+        between checks. Nested use (a check made while a run holds the
+        session) gets the run's session.
+        """
+        if self._session is not None:
+            yield self._session
+            return
+        connector = aiohttp.TCPConnector(
+            limit=self.config.connection_limit,
+            limit_per_host=self.config.connection_limit_per_host,
+            ttl_dns_cache=self.config.dns_cache_ttl_seconds,
+            keepalive_timeout=self.config.keepalive_timeout_seconds,
+        )
+        async with aiohttp.ClientSession(connector=connector) as session:
+            self._session = session
+            try:
+                yield session
+            finally:
+                self._session = None
 
     async def validate(
         self, channels: list[NormalizedChannel]
@@ -39,15 +186,136 @@ class StreamValidator:
 
         logger.info(f"Validating {len(channels)} streams...")
 
-        # Validate all channels concurrently
-        tasks = [self._validate_channel(channel) for channel in channels]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        self._reset_run()
+        deadline = self._deadline()
+        alternatives = Counter(channel.composite_key() for channel in channels)
+        priorities = [
+            self._priority(channel, alternatives[channel.composite_key()] - 1)
+            for channel in channels
+        ]
+        # Tasks queue for their slots in creation order, so create them by priority.
+        tasks: list[asyncio.Task[bool]] = [None] * len(channels)  # type: ignore[list-item]
+        async with self._open_session():
+            for index in sorted(range(len(channels)), key=priorities.__getitem__):
+                tasks[index] = asyncio.create_task(
+                    self._validate_channel(channels[index], priorities[index])
+                )
+            results = await self._within_budget(tasks, deadline)
+        if self.cache is not None:
+            self.cache.flush()
+        return self._collect(channels, results)
+
+    async def validate_stream(
+        self, channels: AsyncIterable[NormalizedChannel]
+    ) -> tuple[list[NormalizedChannel], int]:
+        """Validate channels as an upstream stage produces them.
+
+        A check starts as soon as each channel arrives, under the same
+        concurrency limit as ``validate``; the call returns once the input is
+        exhausted and every check has finished. The budget runs from the
+        call, so channels arriving after it has run out stay ``UNCHECKED``,
+        and alternatives are counted among the channels received so far.
 
+        Returns:
+            Tuple of (all channels in arrival order, count detected unavailable).
+        """
+        if not self.config.enabled:
+            logger.info("Stream validation is disabled")
+            return [channel async for channel in channels], 0
+
+        self._reset_run()
+        deadline = self._deadline()
+        loop = asyncio.get_running_loop()
+        seen: Counter[str] = Counter()
+        received: list[NormalizedChannel] = []
+        tasks: list[asyncio.Task[bool]] = []
+        expired = False
+        async with self._open_session():
+            try:
+                async for channel in channels:
+                    received.append(channel)
+                    if expired:
+                        continue
+                    if deadline is not None and loop.time() >= deadline:
+                        expired = True
+                        for task in tasks:
+                            task.cancel()
+                        continue
+                    key = channel.composite_key()
+                    priority = self._priority(channel, seen[key])
+                    seen[key] += 1
+                    tasks.append(
+                        asyncio.create_task(self._validate_channel(channel, priority))
+                    )
+                logger.info(f"Validating {len(received)} streamed streams...")
+                results = await self._within_budget(tasks, deadline)
+                # Channels that arrived after the budget ran out were never checked.
+                results.extend(
+                    asyncio.CancelledError() for _ in range(len(received) - len(tasks))
+                )
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+        if self.cache is not None:
+            self.cache.flush()
+        return self._collect(received, results)
+
+    def _reset_run(self) -> None:
+        """Forget the previous run's shared checks and counters."""
+        self._checks = {}
+        self.unique_requests = 0
+        self.saved_requests = 0
+        self.cached_results = 0
+        self.stable_redirects = 0
+        self.changed_redirects = 0
+        self.host_health = self._new_host_health()
+
+    def _new_host_health(self) -> HostHealth:
+        return HostHealth(self.config.host_failure_threshold, self.config.host_recovery_sample)
+
+    def _deadline(self) -> float | None:
+        """Event-loop time at which the validation budget runs out."""
+        if self.config.global_budget_seconds <= 0:
+            return None
+        return asyncio.get_running_loop().time() + self.config.global_budget_seconds
+
+    @staticmethod
+    async def _within_budget(
+        tasks: Sequence[asyncio.Task[bool]], deadline: float | None
+    ) -> list[bool | BaseException]:
+        """Wait for ``tasks``, cancelling those still running at ``deadline``."""
+        try:
+            async with asyncio.timeout_at(deadline):
+                return await asyncio.gather(*tasks, return_exceptions=True)
+        except TimeoutError:
+            for task in tasks:
+                task.cancel()
+            return await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _priority(self, channel: NormalizedChannel, alternatives: int) -> tuple[int, int, int]:
+        """Check order of ``channel``; lower values are checked first."""
+        return (
+            0 if channel.extra_attrs.get("is_main_feed") is True else 1,
+            0 if channel.country in self.target_countries else 1,
+            alternatives,
+        )
+
+    def _collect(
+        self, channels: list[NormalizedChannel], results: list[bool | BaseException]
+    ) -> tuple[list[NormalizedChannel], int]:
+        """Apply check outcomes and count unavailable channels."""
         preserved_channels = []
         dead_count = 0
+        unchecked_count = 0
 
         for channel, result in zip(channels, results, strict=True):
-            if isinstance(result, Exception):
+            if isinstance(result, asyncio.CancelledError):
+                # Cut off by the validation budget.
+                channel.validation_status = ValidationStatus.UNCHECKED
+                unchecked_count += 1
+            elif isinstance(result, Exception):
                 logger.warning(f"Validation error for {channel.name}: {result}")
                 channel.validation_status = ValidationStatus.INVALID
                 dead_count += 1
@@ -58,20 +326,159 @@ class StreamValidator:
             preserved_channels.append(channel)
 
         logger.info(
-            f"Validation complete: {len(channels) - dead_count} live, "
+            f"Validation complete: {len(channels) - dead_count - unchecked_count} live, "
             f"{dead_count} unavailable but preserved"
         )
+        if self.host_health.short_circuited:
+            logger.info(
+                f"Validation short-circuited {self.host_health.short_circuited} requests "
+                f"to unreachable hosts: {', '.join(self.host_health.down_hosts)}"
+            )
+        if self.cached_results:
+            logger.info(f"Validation took {self.cached_results} results from the cache")
+        if self.stable_redirects or self.changed_redirects:
+            logger.info(
+                f"Validation found {self.stable_redirects} stable redirects; "
+                f"{self.changed_redirects} redirect targets changed since their last check"
+            )
+        if self.saved_requests:
+            logger.info(
+                f"Validation sent {self.unique_requests} unique requests; "
+                f"{self.saved_requests} duplicate streams shared a result"
+            )
+        if unchecked_count:
+            logger.warning(
+                f"Validation budget of {self.config.global_budget_seconds:g}s ran out: "
+                f"{unchecked_count} streams left unchecked"
+            )
+        if self.concurrency is not None:
+            logger.info(f"Validation concurrency: {self.concurrency.summary()}")
         return preserved_channels, dead_count
 
-    async def _validate_channel(self, channel: NormalizedChannel) -> bool:
-        """Validate a single channel."""
+    async def _validate_channel(
+        self, channel: NormalizedChannel, priority: tuple[int, int, int] = (1, 1, 0)
+    ) -> bool:
+        """Validate a single channel, sharing the check of an identical request."""
+        key = (canonical_url(channel.stream_url), tuple(sorted(self._headers(channel).items())))
+        shared = self._checks.get(key)
+        if shared is not None:
+            self.saved_requests += 1
+            owner, outcome = shared
+            # Shielded: one sharer being cancelled must not cancel the check.
+            live = await asyncio.shield(outcome)
+            channel.validation_status = owner.validation_status
+            for name in RESPONSE_ATTRS:
+                if owner.extra_attrs.get(name) is not None:
+                    channel.extra_attrs[name] = owner.extra_attrs[name]
+            return live
+
+        outcome = asyncio.get_running_loop().create_future()
+        self._checks[key] = (channel, outcome)
+        self.unique_requests += 1
+        try:
+            live = await self._check_channel(channel, priority, key)
+        except asyncio.CancelledError:
+            outcome.cancel()
+            raise
+        except Exception as e:
+            outcome.set_exception(e)
+            outcome.exception()  # Sharers re-raise it; none may be waiting.
+            raise
+        outcome.set_result(live)
+        return live
+
+    async def _check_channel(
+        self, channel: NormalizedChannel, priority: tuple[int, int, int], key: RequestKey
+    ) -> bool:
+        """Check one unique request of ``channel``."""
         # Check skip patterns
         if self._should_skip(channel.stream_url):
             channel.validation_status = ValidationStatus.SKIPPED
             return True
 
-        async with self.semaphore:
-            return await self._check_stream(channel)
+        if self.reuse is not None:
+            stored = self.reuse.reusable("validation", channel.stream_url)
+            if stored is not None:
+                channel.validation_status = ValidationStatus(stored)
+                return channel.validation_status == ValidationStatus.VALID
+
+        url, headers = key[0], "\n".join(f"{name}: {value}" for name, value in key[1])
+        if self.cache is not None:
+            cached = self.cache.get(url, headers)
+            if cached is not None:
+                self.cached_results += 1
+                channel.validation_status = ValidationStatus(cached.status)
+                if cached.latency_ms is not None:
+                    channel.extra_attrs["response_ms"] = cached.latency_ms
+                if cached.redirects is not None:
+                    channel.extra_attrs["redirects"] = cached.redirects
+                if cached.redirects and channel.validation_status == ValidationStatus.VALID:
+                    seen = self.cache.redirect(url, headers)
+                    if seen is not None:
+                        # No request was made, so nothing new was observed.
+                        self._apply_redirect(channel, seen)
+                return channel.validation_status == ValidationStatus.VALID
+
+        http_code: int | None = None
+        throttled = False
+        for attempt in range(self.config.throttle_retries + 1):
+            try:
+                async with self.scheduler.slot(channel.stream_url, priority):
+                    # Decided once the slot is held, after earlier checks have reported.
+                    outcome = self.host_health.short_circuit(channel.stream_url)
+                    if outcome is not None:
+                        channel.validation_status = outcome
+                        return False
+                    started = time.monotonic()
+                    live, http_code = await self._check_stream(channel)
+                    if self.concurrency is not None:
+                        self.concurrency.record(
+                            time.monotonic() - started,
+                            timed_out=channel.validation_status == ValidationStatus.TIMEOUT,
+                        )
+                throttled = False
+                break
+            except HostThrottledError:
+                channel.validation_status = ValidationStatus.INVALID
+                live = False
+                throttled = True
+                if attempt == self.config.throttle_retries:
+                    logger.debug(f"Still throttled validating {channel.name}")
+        if self.reuse is not None:
+            self.reuse.record("validation", channel.stream_url, channel.validation_status.value)
+        # A throttled answer says nothing about the stream; check it next run.
+        if self.cache is not None and not throttled:
+            self.cache.put(
+                url,
+                headers,
+                channel.validation_status.value,
+                live,
+                http_code=http_code,
+                latency_ms=channel.extra_attrs.get("response_ms"),
+                redirects=channel.extra_attrs.get("redirects"),
+            )
+            resolved_url = channel.extra_attrs.get("resolved_url")
+            if live and resolved_url is not None:
+                previous = self.cache.redirect(url, headers)
+                seen = self.cache.observe_redirect(
+                    url, headers, resolved_url, channel.extra_attrs["redirect_chain"]
+                )
+                if previous is not None and previous.target != seen.target:
+                    self.changed_redirects += 1
+                    logger.debug(
+                        f"Redirect of {channel.name} moved from {previous.target} to {seen.target}"
+                    )
+                self._apply_redirect(channel, seen)
+        return live
+
+    def _apply_redirect(self, channel: NormalizedChannel, seen: CachedRedirect) -> None:
+        """Store a recorded redirect on ``channel`` and whether it is stable."""
+        threshold = self.config.stable_redirect_checks
+        stable = 0 < threshold <= seen.observations
+        channel.extra_attrs["resolved_url"] = seen.target
+        channel.extra_attrs["redirect_chain"] = list(seen.chain)
+        channel.extra_attrs["redirect_stable"] = stable
+        self.stable_redirects += stable
 
     def _should_skip(self, url: str) -> bool:
         """Check if URL matches skip patterns."""
@@ -80,66 +487,117 @@ class StreamValidator:
                 return True
         return False
 
-    async def _check_stream(self, channel: NormalizedChannel) -> bool:
-        """Make HTTP HEAD request to check stream."""
-        try:
-            async with aiohttp.ClientSession() as session:
-                headers: dict[str, Any] = {"User-Agent": "IPTV-Sanity-Agent/1.0"}
+    @staticmethod
+    def _headers(channel: NormalizedChannel) -> dict[str, str]:
+        """Request headers of a check of ``channel``."""
+        headers = {"User-Agent": "IPTV-Sanity-Agent/1.0"}
 
-                # Add custom headers if present
-                if channel.headers:
-                    if channel.headers.user_agent:
-                        headers["User-Agent"] = channel.headers.user_agent
-                    if channel.headers.referrer:
-                        headers["Referer"] = channel.headers.referrer
+        # Add custom headers if present
+        if channel.headers:
+            if channel.headers.user_agent:
+                headers["User-Agent"] = channel.headers.user_agent
+            if channel.headers.referrer:
+                headers["Referer"] = channel.headers.referrer
+        return headers
 
+    async def _check_stream(self, channel: NormalizedChannel) -> tuple[bool, int | None]:
+        """Make HTTP HEAD request to check stream; return liveness and HTTP status."""
+        try:
+            async with self._open_session() as session:
+                started = time.monotonic()
                 async with session.head(
                     channel.stream_url,
                     timeout=self.timeout,
-                    headers=headers,
+                    headers=self._headers(channel),
                     allow_redirects=True,
                 ) as response:
                     status = response.status
+                    self.host_health.success(channel.stream_url)
+                    self._check_throttle(channel.stream_url, response)
+                    self._record_response(channel, started, response)
 
                     if status in self.config.accept_status_codes:
                         channel.validation_status = ValidationStatus.VALID
-                        return True
+                        return True, status
 
                     if status in self.config.conditional_accept:
                         # 403 might be blocked for HEAD but work for GET
                         channel.validation_status = ValidationStatus.VALID
-                        return True
+                        return True, status
 
                     channel.validation_status = ValidationStatus.INVALID
-                    return False
+                    return False, status
 
-        except TimeoutError:
+        except HostThrottledError:
+            raise
+
+        except TimeoutError as e:
             channel.validation_status = ValidationStatus.TIMEOUT
             logger.debug(f"Timeout validating {channel.name}")
+            if isinstance(e, aiohttp.ConnectionTimeoutError):
+                self.host_health.failure(channel.stream_url, ValidationStatus.TIMEOUT)
 
-            # Retry once if configured
-            if self.config.retry_once:
+            # Retry once if configured, unless the host has stopped answering
+            if self.config.retry_once and not self.host_health.is_down(channel.stream_url):
                 return await self._retry_check(channel)
-            return False
+            return False, None
+
+        except CONNECTION_ERRORS as e:
+            channel.validation_status = ValidationStatus.INVALID
+            logger.debug(f"Cannot reach host of {channel.name}: {e}")
+            self.host_health.failure(channel.stream_url, ValidationStatus.INVALID)
+            return False, None
 
         except Exception as e:
             channel.validation_status = ValidationStatus.INVALID
             logger.debug(f"Error validating {channel.name}: {e}")
-            return False
+            return False, None
+
+    def _check_throttle(self, url: str, response: aiohttp.ClientResponse) -> None:
+        """Back the host off and raise ``HostThrottledError`` for a waitable throttle."""
+        if (
+            response.status not in THROTTLE_STATUSES
+            or response.status in self.config.accept_status_codes
+            or not self.config.throttle_retries
+        ):
+            return
+        delay = parse_retry_after(response.headers.get("Retry-After"))
+        if delay is None:
+            if response.status != 429:
+                return
+            delay = 1.0
+        if delay > self.config.max_retry_after_seconds:
+            return
+        self.scheduler.defer(url, delay)
+        raise HostThrottledError(f"{response.status}, retry after {delay:g}s")
+
+    @staticmethod
+    def _record_response(
+        channel: NormalizedChannel, started: float, response: aiohttp.ClientResponse
+    ) -> None:
+        """Store time to headers and redirects followed for ``channel``."""
+        channel.extra_attrs["response_ms"] = round((time.monotonic() - started) * 1000, 1)
+        channel.extra_attrs["redirects"] = len(response.history)
+        if response.history:
+            channel.extra_attrs["resolved_url"] = str(response.url)
+            channel.extra_attrs["redirect_chain"] = [str(hop.url) for hop in response.history]
 
-    async def _retry_check(self, channel: NormalizedChannel) -> bool:
+    async def _retry_check(self, channel: NormalizedChannel) -> tuple[bool, int | None]:
         """Retry validation once."""
         try:
-            async with aiohttp.ClientSession() as session:
+            async with self._open_session() as session:
+                started = time.monotonic()
                 async with session.head(
                     channel.stream_url,
                     timeout=self.timeout,
                     headers={"User-Agent": "IPTV-Sanity-Agent/1.0"},
                     allow_redirects=True,
                 ) as response:
+                    self.host_health.success(channel.stream_url)
+                    self._record_response(channel, started, response)
                     if response.status in self.config.accept_status_codes:
                         channel.validation_status = ValidationStatus.VALID
-                        return True
-                    return False
+                        return True, response.status
+                    return False, response.status
         except Exception:
-            return False
+            return False, None
@@ -0,0 +1,87 @@
+"""Adaptive (AIMD) concurrency limit for network probing stages."""
+
+import time
+from collections.abc import Callable
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class AdaptiveConcurrency:
+    """Additive-increase, multiplicative-decrease limit on work in flight.
+
+    Callers report every finished request with ``record``. Until the first
+    overload the limit grows by one per healthy completion (doubling every
+    round of ``value`` requests); afterwards it grows by one per round. A
+    request is unhealthy when it timed out, which halves the limit at most
+    once per round, or when the recent latency average runs above
+    ``latency_tolerance`` times the long-run average, which holds the limit
+    where it is. ``history`` keeps each change as (seconds since start,
+    limit), so a run reports the ceiling it found.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int = 1,
+        maximum: int | None = None,
+        latency_tolerance: float = 2.0,
+        backoff: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the limit at ``initial`` within [minimum, maximum]."""
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum if maximum is not None else initial)
+        self.latency_tolerance = latency_tolerance
+        self.backoff = backoff
+        self._clock = clock
+        self._started = clock()
+        self._limit = float(min(self.maximum, max(self.minimum, initial)))
+        self._slow_start = True
+        self._since_backoff = self.maximum
+        self._recent_latency: float | None = None
+        self._baseline_latency: float | None = None
+        self.history: list[tuple[float, int]] = [(0.0, self.value)]
+
+    @property
+    def value(self) -> int:
+        """Requests allowed in flight now."""
+        return int(self._limit)
+
+    def record(self, latency: float, timed_out: bool = False) -> None:
+        """Adjust the limit for one finished request."""
+        self._since_backoff += 1
+        if timed_out:
+            # Every request already in flight saw the same congestion; one
+            # decrease per round keeps a burst of timeouts from collapsing it.
+            if self._since_backoff >= self.value:
+                self._slow_start = False
+                self._since_backoff = 0
+                self._set(self._limit * self.backoff)
+            return
+
+        if self._recent_latency is None or self._baseline_latency is None:
+            self._recent_latency = self._baseline_latency = latency
+        else:
+            self._recent_latency += 0.1 * (latency - self._recent_latency)
+            self._baseline_latency += 0.01 * (latency - self._baseline_latency)
+        if self._recent_latency > self.latency_tolerance * self._baseline_latency:
+            return
+        self._set(self._limit + (1 if self._slow_start else 1 / self._limit))
+
+    def summary(self) -> str:
+        """One-line account of the limits chosen, for stage logs."""
+        values = [value for _, value in self.history]
+        return (
+            f"start={values[0]} final={values[-1]} low={min(values)} "
+            f"high={max(values)} changes={len(values) - 1}"
+        )
+
+    def _set(self, limit: float) -> None:
+        before = self.value
+        self._limit = min(float(self.maximum), max(float(self.minimum), limit))
+        if self.value != before:
+            elapsed = self._clock() - self._started
+            self.history.append((elapsed, self.value))
+            logger.debug(f"Concurrency limit {before} -> {self.value} at {elapsed:.1f}s")
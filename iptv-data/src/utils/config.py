@@ -14,6 +14,7 @@ class SourceConfig:
     enabled: bool = True
     priority: int = 1
     urls: list[dict[str, Any]] = field(default_factory=list)
+    paths: list[str] = field(default_factory=list)
     base_url: str = ""
     endpoints: dict[str, str] = field(default_factory=dict)
     cache_hours: int = 24
@@ -31,6 +32,31 @@ class ValidationConfig:
     accept_status_codes: list[int] = field(default_factory=lambda: [200, 302, 303, 307, 308])
     conditional_accept: list[int] = field(default_factory=lambda: [403])
     skip_patterns: list[str] = field(default_factory=list)
+    # Checks still pending after this many seconds end as "unchecked"; 0 is unbounded.
+    global_budget_seconds: float = 600
+    # Connection pool of the run-wide session; 0 leaves a limit off.
+    connection_limit: int = 100
+    connection_limit_per_host: int = 0
+    dns_cache_ttl_seconds: int = 300
+    keepalive_timeout_seconds: float = 15
+    # Per-host scheduling; 0 leaves a cap or rate off.
+    max_per_host: int = 8
+    host_requests_per_second: float = 0
+    host_burst: int = 0
+    # A 429 (or 503 with Retry-After) backs the host off, then re-checks.
+    throttle_retries: int = 2
+    max_retry_after_seconds: float = 30
+    # After this many consecutive connection failures a host's remaining
+    # requests fail at once, bar every host_recovery_sample-th; 0 is off.
+    host_failure_threshold: int = 3
+    host_recovery_sample: int = 10
+    # AIMD limit starting at max_concurrent; timeouts back it off.
+    adaptive_concurrency: bool = False
+    min_concurrent: int = 4
+    max_adaptive_concurrent: int = 100
+    # Live checks in a row reaching one redirect target before it is exported
+    # as resolvedUrl; needs validation_cache. 0 never exports one.
+    stable_redirect_checks: int = 2
 
 
 @dataclass
@@ -44,16 +70,76 @@ class StreamHealthConfig:
     max_concurrent: int = 4
     low_framerate_threshold: float = 29
     sample_bitrate: bool = False
+    # Consecutive unreachable probes before a host's sources are skipped; 0 is off.
+    host_failure_threshold: int = 3
+    host_recovery_sample: int = 10
+    # AIMD limit starting at max_concurrent; probe timeouts back it off.
+    adaptive_concurrency: bool = False
+    min_concurrent: int = 1
+    max_adaptive_concurrent: int = 16
+    # Read media facts from HLS master playlists first; ffprobe runs only
+    # for sources whose playlist lacks them.
+    hls_probe: bool = False
+    hls_timeout_seconds: float = 5
+    hls_max_concurrent: int = 16
+
+
+@dataclass
+class HttpCacheConfig:
+    """On-disk upstream HTTP cache configuration."""
+
+    enabled: bool = False
+    directory: str = "cache/http"
+
+
+@dataclass
+class ValidationCacheConfig:
+    """Persistent stream check cache configuration.
+
+    Live results are reused for up to ``positive_ttl_hours`` and dead ones
+    for up to ``negative_ttl_hours``; ``jitter`` is the largest share of a
+    TTL randomly cut from each entry so re-checks spread across runs. A
+    redirected live result is kept for the negative TTL, so its redirect
+    target is checked again on the next run. The defaults suit the weekly scheduled run: a live result lives 5 to 10 days,
+    so about 40% of them serve the next run, while a dead stream is checked
+    again every run in case it came back.
+    """
+
+    enabled: bool = False
+    path: str = "cache/validation.sqlite3"
+    positive_ttl_hours: float = 240
+    negative_ttl_hours: float = 6
+    jitter: float = 0.5
+
+
+@dataclass
+class DeltaConfig:
+    """Incremental run state configuration.
+
+    ``max_reuse_runs`` bounds how many consecutive runs may reuse a stored
+    validation or health result for an unchanged stream; 0 re-checks every
+    stream, keeping output identical to a full run.
+    """
+
+    enabled: bool = False
+    state_file: str = "cache/delta/state.json.gz"
+    max_reuse_runs: int = 0
 
 
 @dataclass
 class DeduplicationConfig:
-    """Deduplication configuration."""
+    """Deduplication configuration.
+
+    ``prefer_criteria`` ranks the sources of a merged channel; see
+    ``Deduplicator`` for the names it accepts.
+    """
 
     enabled: bool = True
     strategy: str = "composite_key"
     priority_order: list[str] = field(default_factory=lambda: ["m3u", "iptv_org", "custom"])
     prefer_criteria: list[str] = field(default_factory=list)
+    # Response times within one step count as equally fast.
+    response_bucket_ms: int = 250
 
 
 @dataclass
@@ -110,6 +196,24 @@ class Config:
         health_config = self.processing.get("stream_health", {})
         return StreamHealthConfig(**health_config) if health_config else StreamHealthConfig()
 
+    @property
+    def http_cache(self) -> HttpCacheConfig:
+        """Get upstream HTTP cache configuration."""
+        cache_config = self.processing.get("http_cache", {})
+        return HttpCacheConfig(**cache_config) if cache_config else HttpCacheConfig()
+
+    @property
+    def validation_cache(self) -> ValidationCacheConfig:
+        """Get persistent stream check cache configuration."""
+        cache_config = self.processing.get("validation_cache", {})
+        return ValidationCacheConfig(**cache_config) if cache_config else ValidationCacheConfig()
+
+    @property
+    def delta(self) -> DeltaConfig:
+        """Get incremental run state configuration."""
+        delta_config = self.processing.get("delta", {})
+        return DeltaConfig(**delta_config) if delta_config else DeltaConfig()
+
     @property
     def normalization(self) -> NormalizationConfig:
         """Get normalization configuration."""
@@ -121,6 +225,11 @@ class Config:
         """Get target countries."""
         return self.processing.get("target_countries", ["IN", "US", "GB"])
 
+    @property
+    def source_concurrency(self) -> int:
+        """Get the cap on concurrently loading source URLs."""
+        return int(self.processing.get("source_concurrency", 4))
+
     @property
     def default_country(self) -> str:
         """Get default country."""
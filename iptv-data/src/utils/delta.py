@@ -0,0 +1,160 @@
+"""Per-record content hashes and reusable stage results across runs."""
+
+import gzip
+import hashlib
+import json
+import os
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+DELTA_STATE_VERSION = 1
+
+
+def content_hash(value: Any) -> str:
+    """Stable digest of a JSON-compatible value, independent of key order."""
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(encoded.encode("utf-8"), digest_size=16).hexdigest()
+
+
+@dataclass(frozen=True)
+class RecordChanges:
+    """Keys of one record kind, classified against the previous run."""
+
+    added: frozenset[str] = frozenset()
+    removed: frozenset[str] = frozenset()
+    modified: frozenset[str] = frozenset()
+    unchanged: frozenset[str] = frozenset()
+
+    @classmethod
+    def between(cls, previous: Mapping[str, str], current: Mapping[str, str]) -> "RecordChanges":
+        """Classify ``current`` hashes against ``previous`` ones."""
+        return cls(
+            added=frozenset(key for key in current if key not in previous),
+            removed=frozenset(key for key in previous if key not in current),
+            modified=frozenset(
+                key for key, digest in current.items() if previous.get(key, digest) != digest
+            ),
+            unchanged=frozenset(
+                key for key, digest in current.items() if previous.get(key) == digest
+            ),
+        )
+
+    def summary(self) -> str:
+        """One-line count summary for logs."""
+        return (
+            f"added={len(self.added)} removed={len(self.removed)} "
+            f"modified={len(self.modified)} unchanged={len(self.unchanged)}"
+        )
+
+
+@dataclass(frozen=True)
+class ChangeSet:
+    """Upstream channels and streams that changed since the previous run."""
+
+    channels: RecordChanges = field(default_factory=RecordChanges)
+    streams: RecordChanges = field(default_factory=RecordChanges)
+
+
+class DeltaState:
+    """Record hashes and stage results carried from one run to the next.
+
+    The loader stores a hash per upstream channel and per stream URL, and
+    ``update_hashes`` returns what changed. Network-bound stages record their
+    results per stream URL; a result is offered again (``reusable``) only
+    while the stream is unchanged and the result has been reused fewer than
+    ``max_reuse_runs`` times, after which the stream is checked afresh. With
+    ``max_reuse_runs`` at 0 nothing is reused.
+    """
+
+    def __init__(self, path: str | Path | None, max_reuse_runs: int = 0) -> None:
+        """Initialize state persisted at ``path`` (in-memory when None)."""
+        self.path = Path(path) if path is not None else None
+        self.max_reuse_runs = max(0, max_reuse_runs)
+        self.change_set: ChangeSet | None = None
+        self._hashes: dict[str, dict[str, str]] = {"channels": {}, "streams": {}}
+        self._previous_results: dict[str, dict[str, list[Any]]] = {}
+        self._results: dict[str, dict[str, list[Any]]] = {}
+
+    def load(self) -> None:
+        """Read the previous run's state; a missing or unreadable file is empty."""
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                document = json.load(f)
+        except (OSError, EOFError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable delta state {self.path}: {e}")
+            return
+        if not isinstance(document, dict) or document.get("version") != DELTA_STATE_VERSION:
+            logger.warning(f"Ignoring delta state {self.path} of another version")
+            return
+        self._hashes = {
+            kind: dict(document.get("hashes", {}).get(kind, {})) for kind in self._hashes
+        }
+        self._previous_results = {
+            stage: dict(results) for stage, results in document.get("results", {}).items()
+        }
+
+    def update_hashes(
+        self, channel_hashes: Mapping[str, str], stream_hashes: Mapping[str, str]
+    ) -> ChangeSet:
+        """Replace stored hashes with this run's and return the change set."""
+        self.change_set = ChangeSet(
+            channels=RecordChanges.between(self._hashes["channels"], channel_hashes),
+            streams=RecordChanges.between(self._hashes["streams"], stream_hashes),
+        )
+        self._hashes = {"channels": dict(channel_hashes), "streams": dict(stream_hashes)}
+        return self.change_set
+
+    def reusable(self, stage: str, url: str) -> Any | None:
+        """Return the stored ``stage`` result for an unchanged stream, if reusable."""
+        if self.change_set is None or url not in self.change_set.streams.unchanged:
+            return None
+        stored = self._previous_results.get(stage, {}).get(url)
+        if stored is None or stored[1] >= self.max_reuse_runs:
+            return None
+        self._results.setdefault(stage, {})[url] = [stored[0], stored[1] + 1]
+        return stored[0]
+
+    def record(self, stage: str, url: str, result: Any) -> None:
+        """Store a freshly computed ``stage`` result for ``url``."""
+        if self.max_reuse_runs:
+            self._results.setdefault(stage, {})[url] = [result, 0]
+
+    def save(self) -> None:
+        """Write hashes and this run's results for the next run.
+
+        Stages that did not run this time (``--skip-validation``,
+        ``--skip-stream-health``) keep their stored results for streams that
+        are still unchanged; results of changed or removed streams are dropped
+        so they are never offered against the new content.
+        """
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        results = dict(self._results)
+        for stage, stored in self._previous_results.items():
+            if stage in results:
+                continue
+            if self.change_set is not None:
+                unchanged = self.change_set.streams.unchanged
+                stored = {url: result for url, result in stored.items() if url in unchanged}
+            results[stage] = stored
+        document = {
+            "version": DELTA_STATE_VERSION,
+            "hashes": self._hashes,
+            "results": results,
+        }
+        partial_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.partial")
+        try:
+            with gzip.open(partial_path, "wt", encoding="utf-8", compresslevel=6) as f:
+                json.dump(document, f, separators=(",", ":"))
+            os.replace(partial_path, self.path)
+        finally:
+            partial_path.unlink(missing_ok=True)
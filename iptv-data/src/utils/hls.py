@@ -0,0 +1,125 @@
+"""HLS master playlist parsing for media facts without a decoder."""
+
+import re
+from dataclasses import dataclass, field
+
+# Attribute lists (RFC 8216 section 4.2): NAME=value or NAME="quoted value".
+_ATTRIBUTE = re.compile(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)')
+
+# Sample entry of a CODECS value -> codec_name ffprobe reports for it.
+_VIDEO_CODECS = {
+    "avc1": "h264",
+    "avc3": "h264",
+    "hvc1": "hevc",
+    "hev1": "hevc",
+    "dvh1": "hevc",
+    "dvhe": "hevc",
+    "av01": "av1",
+    "vp09": "vp9",
+    "vp08": "vp8",
+}
+_AUDIO_CODECS = {
+    "mp4a": "aac",
+    "ac-3": "ac3",
+    "ec-3": "eac3",
+    "ac-4": "ac4",
+    "opus": "opus",
+    "flac": "flac",
+}
+# MPEG audio object types carried as mp4a.<oti> instead of AAC.
+_MP3_OBJECT_TYPES = frozenset({"mp4a.40.34", "mp4a.69", "mp4a.6b"})
+
+
+@dataclass(frozen=True, slots=True)
+class HlsVariant:
+    """One ``#EXT-X-STREAM-INF`` rendition of a master playlist."""
+
+    bandwidth: int | None
+    average_bandwidth: int | None
+    width: int | None
+    height: int | None
+    frame_rate: float | None
+    codecs: tuple[str, ...]
+    audio_group: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class MasterPlaylist:
+    """Variants of a master playlist and the channel count of its audio groups."""
+
+    variants: tuple[HlsVariant, ...]
+    audio_channels: dict[str, int | None] = field(default_factory=dict)
+
+
+def parse_attributes(value: str) -> dict[str, str]:
+    """Parse an HLS attribute list, unquoting quoted values."""
+    return {name: raw.strip('"') for name, raw in _ATTRIBUTE.findall(value)}
+
+
+def parse_master_playlist(text: str) -> MasterPlaylist:
+    """Parse the variants of a master playlist.
+
+    Raises:
+        ValueError: If ``text`` is not an HLS playlist. A media playlist
+            parses to a ``MasterPlaylist`` without variants.
+    """
+    lines = [line.strip() for line in text.lstrip("\ufeff").splitlines()]
+    if not lines or not lines[0].startswith("#EXTM3U"):
+        raise ValueError("not an HLS playlist")
+    variants = []
+    audio_channels: dict[str, int | None] = {}
+    for line in lines:
+        tag, _, value = line.partition(":")
+        if tag == "#EXT-X-STREAM-INF":
+            variants.append(_variant(parse_attributes(value)))
+        elif tag == "#EXT-X-MEDIA":
+            attributes = parse_attributes(value)
+            group = attributes.get("GROUP-ID")
+            if attributes.get("TYPE") == "AUDIO" and group is not None:
+                # The group's default rendition speaks for it, else its first.
+                if group not in audio_channels or attributes.get("DEFAULT") == "YES":
+                    audio_channels[group] = _int(attributes.get("CHANNELS", "").split("/")[0])
+    return MasterPlaylist(tuple(variants), audio_channels)
+
+
+def codec_names(codecs: tuple[str, ...]) -> tuple[str | None, str | None]:
+    """Video and audio codec names of a CODECS list, in ffprobe's spelling."""
+    video = audio = None
+    for codec in codecs:
+        entry = codec.strip().lower()
+        sample = entry.split(".")[0]
+        if video is None and sample in _VIDEO_CODECS:
+            video = _VIDEO_CODECS[sample]
+        elif audio is None and entry in _MP3_OBJECT_TYPES:
+            audio = "mp3"
+        elif audio is None and sample in _AUDIO_CODECS:
+            audio = _AUDIO_CODECS[sample]
+    return video, audio
+
+
+def _variant(attributes: dict[str, str]) -> HlsVariant:
+    width = height = None
+    resolution = attributes.get("RESOLUTION", "").lower().split("x")
+    if len(resolution) == 2:
+        width, height = _int(resolution[0]), _int(resolution[1])
+    try:
+        frame_rate = float(attributes["FRAME-RATE"])
+    except (KeyError, ValueError):
+        frame_rate = None
+    codecs = tuple(codec for codec in attributes.get("CODECS", "").split(",") if codec)
+    return HlsVariant(
+        bandwidth=_int(attributes.get("BANDWIDTH")),
+        average_bandwidth=_int(attributes.get("AVERAGE-BANDWIDTH")),
+        width=width,
+        height=height,
+        frame_rate=frame_rate,
+        codecs=codecs,
+        audio_group=attributes.get("AUDIO"),
+    )
+
+
+def _int(value: str | None) -> int | None:
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
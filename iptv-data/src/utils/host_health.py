@@ -0,0 +1,80 @@
+"""Per-run tracking of hosts that fail at the connection level."""
+
+from typing import Any
+
+from .host_scheduler import host_key
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class _HostRecord:
+    """Consecutive failures and short-circuit state of one host."""
+
+    __slots__ = ("failures", "outcome", "skipped")
+
+    def __init__(self) -> None:
+        self.failures = 0
+        self.outcome: Any = None
+        self.skipped = 0
+
+
+class HostHealth:
+    """Short-circuit requests to hosts that keep failing to connect.
+
+    After ``failure_threshold`` consecutive connection-level failures
+    (DNS, refused, TLS, no connection before the timeout) a host is down: each
+    later request to it takes the outcome of the last failure without being
+    sent, except every ``recovery_sample``-th one, which still runs so a
+    host that comes back is noticed. Any answer from the host clears it. A
+    threshold of 0 never short-circuits.
+    """
+
+    def __init__(self, failure_threshold: int = 3, recovery_sample: int = 10) -> None:
+        """Initialize tracker thresholds."""
+        self.failure_threshold = failure_threshold
+        self.recovery_sample = max(1, recovery_sample)
+        self.short_circuited = 0
+        self._hosts: dict[str, _HostRecord] = {}
+
+    def short_circuit(self, url: str) -> Any | None:
+        """Return the outcome to apply instead of requesting ``url``, if any."""
+        record = self._hosts.get(host_key(url))
+        if record is None or not self._is_down(record):
+            return None
+        record.skipped += 1
+        if record.skipped % self.recovery_sample == 0:
+            return None
+        self.short_circuited += 1
+        return record.outcome
+
+    def failure(self, url: str, outcome: Any) -> None:
+        """Record a connection-level failure whose result was ``outcome``."""
+        key = host_key(url)
+        record = self._hosts.get(key)
+        if record is None:
+            record = self._hosts[key] = _HostRecord()
+        record.failures += 1
+        record.outcome = outcome
+        if record.failures == self.failure_threshold:
+            logger.warning(f"Host {key} is unreachable; short-circuiting its remaining requests")
+
+    def success(self, url: str) -> None:
+        """Record that the host of ``url`` answered."""
+        key = host_key(url)
+        record = self._hosts.pop(key, None)
+        if record is not None and self._is_down(record):
+            logger.info(f"Host {key} answered again after {record.failures} failures")
+
+    def is_down(self, url: str) -> bool:
+        """Check if the host of ``url`` is short-circuited."""
+        record = self._hosts.get(host_key(url))
+        return record is not None and self._is_down(record)
+
+    @property
+    def down_hosts(self) -> list[str]:
+        """Hosts currently short-circuited."""
+        return sorted(key for key, record in self._hosts.items() if self._is_down(record))
+
+    def _is_down(self, record: _HostRecord) -> bool:
+        return 0 < self.failure_threshold <= record.failures
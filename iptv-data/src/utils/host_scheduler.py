@@ -0,0 +1,212 @@
+"""Host-aware request scheduling: fair slots, rate limits and back-off."""
+
+import asyncio
+import email.utils
+import heapq
+import itertools
+import math
+import time
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from typing import Any
+from urllib.parse import urlsplit
+
+from .concurrency import AdaptiveConcurrency
+
+
+def host_key(url: str) -> str:
+    """Scheduling key of ``url``: its lowercased host and explicit port."""
+    parts = urlsplit(url)
+    host = parts.hostname or ""
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    return f"{host}:{port}" if port is not None else host
+
+
+def parse_retry_after(value: str | None, now: float | None = None) -> float | None:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=UTC)
+    current = now if now is not None else datetime.now(UTC).timestamp()
+    return max(0.0, when.timestamp() - current)
+
+
+class _HostState:
+    """Waiters, in-flight count, token bucket and back-off of one host."""
+
+    __slots__ = ("waiters", "active", "tokens", "refilled_at", "blocked_until", "entry")
+
+    def __init__(self, burst: float, now: float) -> None:
+        # Heap of (priority, arrival, future): lowest priority value first.
+        self.waiters: list[tuple[Any, int, asyncio.Future[None]]] = []
+        self.active = 0
+        self.tokens = burst
+        self.refilled_at = now
+        self.blocked_until = 0.0
+        # The host's current (head priority, turn, key) entry in the host heap.
+        self.entry: tuple[Any, int, str] | None = None
+
+
+class HostScheduler:
+    """Grant request slots across hosts fairly and within per-host limits.
+
+    A slot needs a free place under the global ``max_concurrent`` limit and
+    under the host's ``max_per_host`` cap, a token from the host's bucket
+    (``rate_per_second`` refilled, ``burst`` deep) and no pending Retry-After
+    back-off for the host. The next slot goes to the host whose most urgent
+    waiter has the lowest ``priority``, so valuable requests go first across
+    hosts too; hosts tied on priority take turns round-robin, so a playlist
+    clustered on one CDN cannot hold every slot while other hosts sit idle.
+    Within a host, the lowest ``priority`` goes first, then the earliest
+    arrival. A cap or rate of 0 leaves that limit off. The global limit may
+    be an ``AdaptiveConcurrency``, read afresh at every grant.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int | AdaptiveConcurrency,
+        max_per_host: int = 0,
+        rate_per_second: float = 0,
+        burst: float = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize scheduler limits."""
+        self.max_concurrent = (
+            max_concurrent
+            if isinstance(max_concurrent, AdaptiveConcurrency)
+            else max(1, max_concurrent)
+        )
+        self.max_per_host = max_per_host if max_per_host > 0 else math.inf
+        self.rate_per_second = max(0.0, rate_per_second)
+        self.burst = max(1.0, burst or self.rate_per_second)
+        self._clock = clock
+        self._hosts: dict[str, _HostState] = {}
+        # Hosts with waiters by (head priority, turn); a host's turn is renewed
+        # each time it is served, which breaks priority ties round-robin.
+        self._queue: list[tuple[Any, int, str]] = []
+        self._active = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._arrivals = itertools.count()
+        self._turns = itertools.count()
+
+    @asynccontextmanager
+    async def slot(self, url: str, priority: Any = 0) -> AsyncIterator[None]:
+        """Hold a request slot for the host of ``url``."""
+        key = host_key(url)
+        await self._acquire(key, priority)
+        try:
+            yield
+        finally:
+            self._release(key)
+
+    def defer(self, url: str, seconds: float) -> None:
+        """Hold back new requests to the host of ``url`` for ``seconds``."""
+        state = self._state(host_key(url))
+        state.blocked_until = max(state.blocked_until, self._clock() + max(0.0, seconds))
+
+    async def _acquire(self, key: str, priority: Any) -> None:
+        state = self._state(key)
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(state.waiters, (priority, next(self._arrivals), waiter))
+        if state.entry is None:
+            self._enqueue(key, state, next(self._turns))
+        elif priority < state.entry[0]:
+            # Moves the host up; its older entry is now stale.
+            self._enqueue(key, state, state.entry[1])
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just as it was cancelled: hand the slot on.
+                self._release(key)
+            raise
+
+    def _release(self, key: str) -> None:
+        state = self._hosts[key]
+        state.active -= 1
+        self._active -= 1
+        self._dispatch()
+
+    def _capacity(self) -> int:
+        limit = self.max_concurrent
+        return limit.value if isinstance(limit, AdaptiveConcurrency) else limit
+
+    def _state(self, key: str) -> _HostState:
+        state = self._hosts.get(key)
+        if state is None:
+            state = self._hosts[key] = _HostState(self.burst, self._clock())
+        return state
+
+    def _wait_for(self, state: _HostState, now: float) -> float:
+        """Seconds until ``state`` may start a request (inf: until a release)."""
+        if state.active >= self.max_per_host:
+            return math.inf
+        wait = state.blocked_until - now
+        if self.rate_per_second:
+            state.tokens = min(
+                self.burst, state.tokens + (now - state.refilled_at) * self.rate_per_second
+            )
+            state.refilled_at = now
+            wait = max(wait, (1 - state.tokens) / self.rate_per_second)
+        return wait
+
+    def _enqueue(self, key: str, state: _HostState, turn: int) -> None:
+        state.entry = (state.waiters[0][0], turn, key)
+        heapq.heappush(self._queue, state.entry)
+
+    def _dispatch(self) -> None:
+        """Grant free slots to waiting hosts, most urgent head waiter first."""
+        now = self._clock()
+        wake = math.inf
+        queue = self._queue
+        held: list[tuple[Any, int, str]] = []
+        capacity = self._capacity()
+        while queue and self._active < capacity:
+            entry = heapq.heappop(queue)
+            key = entry[2]
+            state = self._hosts[key]
+            if entry is not state.entry:
+                continue
+            while state.waiters and state.waiters[0][2].done():
+                heapq.heappop(state.waiters)
+            if not state.waiters:
+                state.entry = None
+                continue
+            if state.waiters[0][0] != entry[0]:
+                # The head waiter was cancelled: requeue at the new head.
+                self._enqueue(key, state, entry[1])
+                continue
+            wait = self._wait_for(state, now)
+            if wait > 0:
+                held.append(entry)
+                wake = min(wake, wait)
+                continue
+            heapq.heappop(state.waiters)[2].set_result(None)
+            state.active += 1
+            self._active += 1
+            if self.rate_per_second:
+                state.tokens -= 1
+            if state.waiters:
+                self._enqueue(key, state, next(self._turns))
+            else:
+                state.entry = None
+        for entry in held:
+            heapq.heappush(queue, entry)
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if held and wake != math.inf and self._active < capacity:
+            self._timer = asyncio.get_running_loop().call_later(wake, self._dispatch)
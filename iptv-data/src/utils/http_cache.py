@@ -0,0 +1,179 @@
+"""On-disk conditional-GET cache shared by upstream source loaders."""
+
+import gzip
+import hashlib
+import json
+import os
+import time
+from collections.abc import AsyncGenerator, AsyncIterator, Callable
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+CHUNK_BYTES = 64 * 1024
+
+
+@dataclass
+class CachedBody:
+    """Response body handle yielded by ``HttpCache.request``."""
+
+    chunks: AsyncGenerator[bytes, None]
+    charset: str | None
+    from_cache: bool
+
+
+class HttpCache:
+    """Stores upstream bodies gzip-compressed with their validators.
+
+    Entries younger than the caller's ``max_age_seconds`` are served without a
+    request. Older entries are revalidated with If-None-Match/If-Modified-Since
+    and a 304 refreshes them in place. When the upstream is unreachable or
+    errors, a stale entry is served instead of failing the run. A cache
+    without a directory is a pass-through that never touches disk.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path | None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Initialize cache rooted at ``directory``."""
+        self.directory = Path(directory) if directory is not None else None
+        self._clock = clock
+
+    @property
+    def enabled(self) -> bool:
+        """Check if responses are persisted."""
+        return self.directory is not None
+
+    @asynccontextmanager
+    async def request(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        *,
+        max_age_seconds: float,
+        timeout: float,
+        headers: dict[str, str] | None = None,
+    ) -> AsyncIterator[CachedBody]:
+        """GET ``url`` through the cache and yield its body as a chunk stream.
+
+        A fresh download is committed to disk only once the caller has
+        consumed every chunk, so an aborted parse never leaves a truncated
+        entry behind.
+        """
+        key = hashlib.sha256(url.encode()).hexdigest()
+        entry = self._read_entry(key)
+        if entry is not None and self._clock() - entry["fetchedAt"] < max_age_seconds:
+            logger.debug(f"HTTP cache hit for {url}")
+            body = CachedBody(self._iter_cached(key), entry.get("charset"), True)
+            try:
+                yield body
+            finally:
+                await body.chunks.aclose()
+            return
+
+        request_headers = dict(headers or {})
+        if entry is not None:
+            if entry.get("etag"):
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry.get("lastModified"):
+                request_headers["If-Modified-Since"] = entry["lastModified"]
+
+        async with AsyncExitStack() as stack:
+            try:
+                response = await stack.enter_async_context(
+                    session.get(
+                        url,
+                        timeout=aiohttp.ClientTimeout(total=timeout),
+                        headers=request_headers,
+                    )
+                )
+                if response.status == 304 and entry is not None:
+                    logger.debug(f"HTTP cache revalidated {url}")
+                    self._write_entry(key, {**entry, **self._validators(response, entry)})
+                    body = CachedBody(self._iter_cached(key), entry.get("charset"), True)
+                else:
+                    response.raise_for_status()
+                    body = CachedBody(
+                        self._iter_response(key, url, response), response.charset, False
+                    )
+            except (aiohttp.ClientError, TimeoutError) as e:
+                if entry is None:
+                    raise
+                logger.warning(f"Serving stale cached copy of {url}: {e}")
+                body = CachedBody(self._iter_cached(key), entry.get("charset"), True)
+            try:
+                yield body
+            finally:
+                await body.chunks.aclose()
+
+    def _validators(
+        self, response: aiohttp.ClientResponse, previous: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        previous = previous or {}
+        return {
+            "etag": response.headers.get("ETag") or previous.get("etag"),
+            "lastModified": (
+                response.headers.get("Last-Modified") or previous.get("lastModified")
+            ),
+            "fetchedAt": self._clock(),
+        }
+
+    async def _iter_response(
+        self, key: str, url: str, response: aiohttp.ClientResponse
+    ) -> AsyncGenerator[bytes, None]:
+        if self.directory is None:
+            async for chunk in response.content.iter_chunked(CHUNK_BYTES):
+                yield chunk
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        body_path = self._body_path(key)
+        partial_path = body_path.with_name(f"{body_path.name}.{os.getpid()}.partial")
+        try:
+            with gzip.open(partial_path, "wb", compresslevel=5) as f:
+                async for chunk in response.content.iter_chunked(CHUNK_BYTES):
+                    f.write(chunk)
+                    yield chunk
+            os.replace(partial_path, body_path)
+        finally:
+            partial_path.unlink(missing_ok=True)
+        self._write_entry(
+            key, {"url": url, "charset": response.charset, **self._validators(response)}
+        )
+
+    async def _iter_cached(self, key: str) -> AsyncGenerator[bytes, None]:
+        with gzip.open(self._body_path(key), "rb") as f:
+            while chunk := f.read(CHUNK_BYTES):
+                yield chunk
+
+    def _read_entry(self, key: str) -> dict[str, Any] | None:
+        if self.directory is None:
+            return None
+        meta_path = self.directory / f"{key}.json"
+        if not meta_path.exists() or not self._body_path(key).exists():
+            return None
+        try:
+            entry = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return entry if isinstance(entry, dict) and "fetchedAt" in entry else None
+
+    def _write_entry(self, key: str, entry: dict[str, Any]) -> None:
+        if self.directory is None:
+            return
+        meta_path = self.directory / f"{key}.json"
+        partial_path = meta_path.with_name(f"{meta_path.name}.{os.getpid()}.partial")
+        partial_path.write_text(json.dumps(entry, sort_keys=True), encoding="utf-8")
+        os.replace(partial_path, meta_path)
+
+    def _body_path(self, key: str) -> Path:
+        assert self.directory is not None
+        return self.directory / f"{key}.body.gz"
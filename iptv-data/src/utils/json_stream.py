@@ -0,0 +1,107 @@
+"""Incremental decoding of large top-level JSON arrays."""
+
+import codecs
+import json
+from collections.abc import AsyncIterable, AsyncIterator
+from typing import Any
+
+_WHITESPACE = " \t\n\r"
+
+
+async def iter_json_array(
+    chunks: AsyncIterable[bytes | memoryview], encoding: str = "utf-8"
+) -> AsyncIterator[Any]:
+    """Yield the elements of a JSON array as its body arrives.
+
+    Only the undecoded tail of the body is buffered, so the raw document and
+    the fully decoded list are never held at the same time.
+
+    Raises:
+        ValueError: If the body is not a well-formed JSON array.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder(encoding)()
+    iterator = aiter(chunks)
+    buffer = ""
+    position = 0
+    eof = False
+    started = False
+    expect_value = True
+    count = 0
+
+    async def fill() -> bool:
+        nonlocal buffer, position, eof
+        if eof:
+            return False
+        try:
+            chunk = await anext(iterator)
+        except StopAsyncIteration:
+            buffer = buffer[position:] + text_decoder.decode(b"", final=True)
+            position = 0
+            eof = True
+            return True
+        buffer = buffer[position:] + text_decoder.decode(chunk)
+        position = 0
+        return True
+
+    while True:
+        while position < len(buffer) and buffer[position] in _WHITESPACE:
+            position += 1
+        if position == len(buffer):
+            if not await fill():
+                raise ValueError("Truncated JSON array")
+            continue
+
+        if not started:
+            if buffer[position] == "\ufeff":
+                position += 1
+                continue
+            if buffer[position] != "[":
+                raise ValueError("Expected a JSON array")
+            started = True
+            position += 1
+            continue
+
+        character = buffer[position]
+        if character == "]":
+            if expect_value and count:
+                raise ValueError(f"Trailing ',' in JSON array at offset {position}")
+            position += 1
+            break
+        if character == ",":
+            if expect_value:
+                raise ValueError(f"Unexpected ',' in JSON array at offset {position}")
+            expect_value = True
+            position += 1
+            continue
+        if not expect_value:
+            raise ValueError(f"Expected ',' or ']' in JSON array at offset {position}")
+
+        try:
+            value, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if await fill():
+                continue
+            raise
+        # A number cut at the chunk edge ("12" of "125", "1.5" of "1.5e3")
+        # still decodes, so scalars are only accepted once their delimiter
+        # has arrived.
+        if not eof and not isinstance(value, dict | list | str):
+            delimiter = end
+            while delimiter < len(buffer) and buffer[delimiter] in _WHITESPACE:
+                delimiter += 1
+            if delimiter == len(buffer) or buffer[delimiter] not in ",]":
+                await fill()
+                continue
+        position = end
+        expect_value = False
+        count += 1
+        yield value
+
+    while True:
+        while position < len(buffer) and buffer[position] in _WHITESPACE:
+            position += 1
+        if position < len(buffer):
+            raise ValueError(f"Unexpected data after JSON array at offset {position}")
+        if not await fill():
+            return
@@ -0,0 +1,248 @@
+"""Persistent SQLite cache of stream check results and redirects across runs."""
+
+import random
+import sqlite3
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+# Pending results are written in batches of this many rows.
+FLUSH_ROWS = 500
+# Redirect observations not renewed for this long are dropped.
+REDIRECT_RETENTION_SECONDS = 30 * 24 * 3600
+
+# Bumped when a table changes; older tables are dropped, not migrated.
+SCHEMA_VERSION = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checks (
+    url TEXT NOT NULL,
+    headers TEXT NOT NULL,
+    status TEXT NOT NULL,
+    http_code INTEGER,
+    latency_ms REAL,
+    redirects INTEGER,
+    checked_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (url, headers)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS redirects (
+    url TEXT NOT NULL,
+    headers TEXT NOT NULL,
+    target TEXT NOT NULL,
+    chain TEXT NOT NULL,
+    observations INTEGER NOT NULL,
+    seen_at REAL NOT NULL,
+    PRIMARY KEY (url, headers)
+) WITHOUT ROWID;
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class CachedCheck:
+    """Stored outcome of one stream check; ``latency_ms`` is the time to headers."""
+
+    status: str
+    http_code: int | None
+    latency_ms: float | None
+    redirects: int | None
+    checked_at: float
+
+
+@dataclass(frozen=True, slots=True)
+class CachedRedirect:
+    """Where a request last redirected to, and on how many checks in a row."""
+
+    target: str
+    chain: tuple[str, ...]
+    observations: int
+
+
+class ValidationCache:
+    """Stream check results keyed by URL and request headers, with TTLs.
+
+    A live result is served for ``positive_ttl_seconds`` and a dead one for
+    ``negative_ttl_seconds``. Each entry's lifetime is shortened by a random
+    share of up to ``jitter`` of its TTL, so a catalog checked in one run
+    comes due over a spread of later runs instead of all at once. A cache
+    without a path keeps results in memory for the life of the process, and
+    an unusable database file is logged and then left alone for the run.
+
+    Redirects are kept apart from check results and outlive them: each live
+    check that was redirected is recorded with ``observe_redirect``, which
+    counts the checks in a row that reached the same target, so a stable
+    redirect can be told from one whose target keeps changing. Serving a
+    cached result observes nothing, so a redirected live result is kept only
+    for ``negative_ttl_seconds`` and the next run checks its target again.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None,
+        positive_ttl_seconds: float,
+        negative_ttl_seconds: float,
+        jitter: float = 0.0,
+        clock: Callable[[], float] = time.time,
+        rng: Callable[[], float] = random.random,
+    ) -> None:
+        """Initialize cache stored at ``path``."""
+        self.path = Path(path) if path is not None else None
+        self.positive_ttl_seconds = positive_ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.jitter = min(1.0, max(0.0, jitter))
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._rng = rng
+        self._connection: sqlite3.Connection | None = None
+        self._pending: list[tuple[object, ...]] = []
+        self._pending_redirects: dict[tuple[str, str], tuple[CachedRedirect, float]] = {}
+        self._failed = False
+
+    def get(self, url: str, headers: str) -> CachedCheck | None:
+        """Return the unexpired result for a request, if any."""
+        if self._failed:
+            return None
+        try:
+            row = self._connect().execute(
+                "SELECT status, http_code, latency_ms, redirects, checked_at FROM checks "
+                "WHERE url = ? AND headers = ? AND expires_at > ?",
+                (url, headers, self._clock()),
+            ).fetchone()
+        except (sqlite3.Error, OSError) as e:
+            self._fail(e)
+            return None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return CachedCheck(*row)
+
+    def put(
+        self,
+        url: str,
+        headers: str,
+        status: str,
+        live: bool,
+        http_code: int | None = None,
+        latency_ms: float | None = None,
+        redirects: int | None = None,
+    ) -> None:
+        """Store a fresh result; it is written with the next flush."""
+        now = self._clock()
+        ttl = self.positive_ttl_seconds if live and not redirects else self.negative_ttl_seconds
+        if ttl <= 0 or self._failed:
+            return
+        expires_at = now + ttl * (1 - self.jitter * self._rng())
+        self._pending.append(
+            (url, headers, status, http_code, latency_ms, redirects, now, expires_at)
+        )
+        if len(self._pending) >= FLUSH_ROWS:
+            self.flush()
+
+    def redirect(self, url: str, headers: str) -> CachedRedirect | None:
+        """Return the last redirect recorded for a request, if any."""
+        if self._failed:
+            return None
+        pending = self._pending_redirects.get((url, headers))
+        if pending is not None:
+            return pending[0]
+        try:
+            row = self._connect().execute(
+                "SELECT target, chain, observations FROM redirects WHERE url = ? AND headers = ?",
+                (url, headers),
+            ).fetchone()
+        except (sqlite3.Error, OSError) as e:
+            self._fail(e)
+            return None
+        if row is None:
+            return None
+        target, chain, observations = row
+        return CachedRedirect(target, tuple(chain.split("\n")), observations)
+
+    def observe_redirect(
+        self, url: str, headers: str, target: str, chain: Sequence[str]
+    ) -> CachedRedirect:
+        """Record that a request redirected through ``chain`` to ``target``.
+
+        Returns the updated record: its count grows while the target stays
+        the same and restarts at 1 when it changes.
+        """
+        previous = self.redirect(url, headers)
+        observations = 1
+        if previous is not None and previous.target == target:
+            observations = previous.observations + 1
+        observed = CachedRedirect(target, tuple(chain), observations)
+        if not self._failed:
+            self._pending_redirects[(url, headers)] = (observed, self._clock())
+            if len(self._pending_redirects) >= FLUSH_ROWS:
+                self.flush()
+        return observed
+
+    def flush(self) -> None:
+        """Write pending results and drop expired ones."""
+        if self._failed:
+            return
+        try:
+            connection = self._connect()
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO checks VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    self._pending,
+                )
+                connection.execute("DELETE FROM checks WHERE expires_at <= ?", (self._clock(),))
+                connection.executemany(
+                    "INSERT OR REPLACE INTO redirects VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        (*key, seen.target, "\n".join(seen.chain), seen.observations, seen_at)
+                        for key, (seen, seen_at) in self._pending_redirects.items()
+                    ),
+                )
+                connection.execute(
+                    "DELETE FROM redirects WHERE seen_at <= ?",
+                    (self._clock() - REDIRECT_RETENTION_SECONDS,),
+                )
+        except (sqlite3.Error, OSError) as e:
+            self._fail(e)
+        self._pending.clear()
+        self._pending_redirects.clear()
+
+    def close(self) -> None:
+        """Flush and close the database."""
+        try:
+            if self._pending or self._pending_redirects:
+                self.flush()
+        finally:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _fail(self, error: sqlite3.Error | OSError) -> None:
+        logger.warning(f"Ignoring validation cache {self.path}: {error}")
+        self._failed = True
+        self._pending.clear()
+        self._pending_redirects.clear()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            if self.path is not None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path if self.path is not None else ":memory:")
+            try:
+                connection.execute("PRAGMA journal_mode=WAL")
+                (version,) = connection.execute("PRAGMA user_version").fetchone()
+                if version != SCHEMA_VERSION:
+                    connection.execute("DROP TABLE IF EXISTS checks")
+                    connection.execute("DROP TABLE IF EXISTS redirects")
+                    connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+                connection.executescript(_SCHEMA)
+            except sqlite3.DatabaseError:
+                connection.close()
+                raise
+            self._connection = connection
+        return self._connection
@@ -0,0 +1,56 @@
+"""Tests for the adaptive concurrency limit."""
+
+from src.utils.concurrency import AdaptiveConcurrency
+
+
+def test_slow_start_doubles_until_the_ceiling() -> None:
+    limit = AdaptiveConcurrency(2, maximum=10)
+
+    for _ in range(2):
+        limit.record(0.05)
+    assert limit.value == 4
+    for _ in range(20):
+        limit.record(0.05)
+
+    assert limit.value == 10
+
+
+def test_timeouts_halve_the_limit_once_per_round() -> None:
+    limit = AdaptiveConcurrency(16, minimum=2, maximum=32)
+
+    for _ in range(8):
+        limit.record(5.0, timed_out=True)
+    assert limit.value == 8
+    limit.record(5.0, timed_out=True)
+    for _ in range(3):
+        limit.record(5.0, timed_out=True)
+    assert limit.value == 4
+    for _ in range(100):
+        limit.record(5.0, timed_out=True)
+
+    assert limit.value == 2
+    assert limit.summary() == "start=16 final=2 low=2 high=16 changes=3"
+
+
+def test_after_a_backoff_the_limit_grows_by_one_per_round() -> None:
+    limit = AdaptiveConcurrency(20, maximum=40)
+    limit.record(5.0, timed_out=True)
+    assert limit.value == 10
+
+    for _ in range(12):
+        limit.record(0.05)
+
+    assert limit.value == 11
+
+
+def test_rising_latency_holds_the_limit() -> None:
+    limit = AdaptiveConcurrency(4, maximum=100)
+    for _ in range(50):
+        limit.record(0.05)
+    grown = limit.value
+
+    for _ in range(20):
+        limit.record(1.0)
+
+    assert limit.value <= grown + 2
+    assert [value for _, value in limit.history] == sorted(v for _, v in limit.history)
@@ -255,6 +255,62 @@ class TestDeduplicator:
         assert result[0].provenance == "unmatched"
         assert result[0].stream_sources[0]["url"] == unknown.stream_url
 
+    def test_faster_response_source_becomes_primary(self) -> None:
+        deduplicator = Deduplicator(
+            DeduplicationConfig(
+                prefer_criteria=["faster_response", "fewer_redirects", "no_such_criterion"],
+                response_bucket_ms=100,
+            )
+        )
+        slow = self._make_channel("Star Plus", SourceType.M3U)
+        slow.stream_url = "http://a.example/star.m3u8"
+        slow.extra_attrs.update(response_ms=950.0, redirects=0)
+        redirected = self._make_channel("Star Plus", SourceType.M3U)
+        redirected.stream_url = "http://b.example/star.m3u8"
+        redirected.extra_attrs.update(response_ms=120.0, redirects=2)
+        fast = self._make_channel("Star Plus", SourceType.M3U)
+        fast.stream_url = "http://c.example/star.m3u8"
+        fast.extra_attrs.update(response_ms=180.0, redirects=0)
+        unmeasured = self._make_channel("Star Plus", SourceType.M3U)
+        unmeasured.stream_url = "http://d.example/star.m3u8"
+
+        result, _ = deduplicator.deduplicate([unmeasured, slow, redirected, fast])
+
+        # 120 and 180 ms share a bucket, so fewer redirects decides between them.
+        assert [source["url"] for source in result[0].stream_sources] == [
+            fast.stream_url,
+            redirected.stream_url,
+            slow.stream_url,
+            unmeasured.stream_url,
+        ]
+        assert result[0].stream_url == fast.stream_url
+        assert result[0].stream_sources[0]["responseMs"] == 180.0
+        assert "responseMs" not in result[0].stream_sources[-1]
+
+    def test_only_stable_redirects_export_a_resolved_url(
+        self, deduplicator: Deduplicator
+    ) -> None:
+        stable = self._make_channel("Star Plus", SourceType.M3U)
+        stable.extra_attrs.update(
+            response_ms=40.0,
+            redirects=1,
+            resolved_url="https://cdn.example/star.m3u8",
+            redirect_stable=True,
+        )
+        rotating = self._make_channel("News", SourceType.M3U)
+        rotating.extra_attrs.update(
+            response_ms=40.0,
+            redirects=1,
+            resolved_url="https://cdn.example/news.m3u8?token=1",
+            redirect_stable=False,
+        )
+
+        result, _ = deduplicator.deduplicate([stable, rotating])
+
+        sources = {channel.name: channel.stream_sources[0] for channel in result}
+        assert sources["Star Plus"]["resolvedUrl"] == "https://cdn.example/star.m3u8"
+        assert "resolvedUrl" not in sources["News"]
+
     def test_disabled_deduplication(self) -> None:
         """Test that disabled deduplication returns all channels."""
         config = DeduplicationConfig(enabled=False)
@@ -0,0 +1,153 @@
+"""Tests for incremental run state."""
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+from aioresponses import aioresponses
+
+from src.loaders.iptv_org_loader import IptvOrgLoader
+from src.models import NormalizedChannel, SourceType, ValidationStatus
+from src.processors.stream_health import StreamHealthProcessor
+from src.processors.validator import StreamValidator
+from src.utils.config import SourceConfig, StreamHealthConfig, ValidationConfig
+from src.utils.delta import DeltaState, RecordChanges
+from tests.test_loaders import IPTV_ORG_API, _upstream_payloads
+from tests.test_stream_health import _channel as _processed_channel
+from tests.test_stream_health import _probe
+
+STREAM_URL = "https://news.example/live.m3u8"
+
+
+def _normalized_channel() -> NormalizedChannel:
+    return NormalizedChannel(
+        id="News.in",
+        name="News",
+        normalized_name="news",
+        stream_url=STREAM_URL,
+        source=SourceType.IPTV_ORG,
+    )
+
+
+async def _load(state: DeltaState, payloads: dict[str, list[dict[str, Any]]]) -> None:
+    loader = IptvOrgLoader(SourceConfig(enabled=True, base_url=IPTV_ORG_API), ["IN"], delta=state)
+    with aioresponses() as mocked:
+        for endpoint, rows in payloads.items():
+            mocked.get(f"{IPTV_ORG_API}/{endpoint}.json", payload=rows)
+        await loader.load()
+
+
+def test_record_changes_classify_keys_against_previous_run() -> None:
+    changes = RecordChanges.between({"a": "1", "b": "2", "c": "3"}, {"a": "1", "b": "9", "d": "4"})
+
+    assert changes == RecordChanges(
+        added=frozenset({"d"}),
+        removed=frozenset({"c"}),
+        modified=frozenset({"b"}),
+        unchanged=frozenset({"a"}),
+    )
+    assert changes.summary() == "added=1 removed=1 modified=1 unchanged=1"
+
+
+async def test_loader_change_set_follows_upstream_records(tmp_path: Path) -> None:
+    path = tmp_path / "delta" / "state.json.gz"
+    first = DeltaState(path)
+    await _load(first, _upstream_payloads())
+    assert first.change_set is not None
+    assert first.change_set.streams.added == {STREAM_URL}
+    first.save()
+
+    payloads = _upstream_payloads()
+    payloads["streams"][0]["user_agent"] = "Player/2.0"
+    second = DeltaState(path)
+    second.load()
+    await _load(second, payloads)
+
+    assert second.change_set is not None
+    assert second.change_set.channels.unchanged == {"News.in"}
+    assert second.change_set.streams.modified == {STREAM_URL}
+
+
+async def test_validation_is_reused_for_unchanged_streams_within_bound(tmp_path: Path) -> None:
+    path = tmp_path / "state.json.gz"
+    config = ValidationConfig(retry_once=False)
+    requests_per_run = []
+    for _ in range(3):
+        state = DeltaState(path, max_reuse_runs=1)
+        state.load()
+        await _load(state, _upstream_payloads())
+        channel = _normalized_channel()
+        with aioresponses() as mocked:
+            mocked.head(STREAM_URL, status=404)
+            await StreamValidator(config, reuse=state).validate([channel])
+            requests_per_run.append(len(mocked.requests))
+        state.save()
+        assert channel.validation_status == ValidationStatus.INVALID
+
+    # Checked, reused once, then checked again once the bound is reached.
+    assert requests_per_run == [1, 0, 1]
+
+
+async def test_skipped_stage_keeps_stored_results(tmp_path: Path) -> None:
+    path = tmp_path / "state.json.gz"
+    config = ValidationConfig(retry_once=False)
+    requests_per_run = []
+    for validate in (True, False, True):
+        state = DeltaState(path, max_reuse_runs=1)
+        state.load()
+        await _load(state, _upstream_payloads())
+        if validate:
+            with aioresponses() as mocked:
+                mocked.head(STREAM_URL, status=404)
+                await StreamValidator(config, reuse=state).validate([_normalized_channel()])
+                requests_per_run.append(len(mocked.requests))
+        state.save()
+
+    # The run without validation neither checks nor forgets the stored result.
+    assert requests_per_run == [1, 0]
+
+
+async def test_skipped_stage_drops_results_of_changed_streams(tmp_path: Path) -> None:
+    path = tmp_path / "state.json.gz"
+    state = DeltaState(path, max_reuse_runs=1)
+    state.update_hashes({}, {STREAM_URL: "a", "https://other.example/live": "b"})
+    state.record("validation", STREAM_URL, "invalid")
+    state.record("validation", "https://other.example/live", "valid")
+    state.save()
+
+    skipped = DeltaState(path, max_reuse_runs=1)
+    skipped.load()
+    skipped.update_hashes({}, {STREAM_URL: "a", "https://other.example/live": "changed"})
+    skipped.save()
+
+    state = DeltaState(path, max_reuse_runs=1)
+    state.load()
+    state.update_hashes({}, {STREAM_URL: "a", "https://other.example/live": "changed"})
+    assert state.reusable("validation", STREAM_URL) == "invalid"
+    assert state.reusable("validation", "https://other.example/live") is None
+
+
+@pytest.mark.parametrize(("max_reuse_runs", "probes"), [(0, 2), (1, 1)])
+async def test_reused_health_facts_match_a_fresh_probe(
+    tmp_path: Path, max_reuse_runs: int, probes: int
+) -> None:
+    path = tmp_path / "state.json.gz"
+    probed: list[str] = []
+
+    async def runner(url: str, _headers: dict[str, str], _timeout: float) -> dict[str, object]:
+        probed.append(url)
+        return _probe(720)
+
+    outputs = []
+    for _ in range(2):
+        state = DeltaState(path, max_reuse_runs)
+        state.load()
+        await _load(state, _upstream_payloads())
+        channel = _processed_channel([{"url": STREAM_URL, "health": "unchecked"}])
+        processor = StreamHealthProcessor(StreamHealthConfig(enabled=True), runner, reuse=state)
+        channels, _ = await processor.enrich([channel])
+        outputs.append(channels[0].stream_sources)
+        state.save()
+
+    assert probed == [STREAM_URL] * probes
+    assert outputs[0] == outputs[1]
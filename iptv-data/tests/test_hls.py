@@ -0,0 +1,60 @@
+"""Tests for HLS master playlist parsing."""
+
+import pytest
+
+from src.utils.hls import HlsVariant, codec_names, parse_attributes, parse_master_playlist
+
+MASTER = """#EXTM3U
+#EXT-X-MEDIA:TYPE=AUDIO,GROUP-ID="aud",NAME="Stereo",CHANNELS="2"
+#EXT-X-MEDIA:TYPE=AUDIO,GROUP-ID="aud",NAME="Surround",DEFAULT=YES,CHANNELS="6/JOC"
+#EXT-X-STREAM-INF:BANDWIDTH=800000,RESOLUTION=640x360,CODECS="avc1.4d401e,mp4a.40.2"
+360.m3u8
+#EXT-X-STREAM-INF:BANDWIDTH=5000000,AVERAGE-BANDWIDTH=4200000,RESOLUTION=1920x1080,\
+FRAME-RATE=50.000,CODECS="hvc1.2.4.L123.B0,ec-3",AUDIO="aud"
+1080.m3u8
+"""
+
+
+def test_attribute_lists_keep_commas_inside_quotes() -> None:
+    assert parse_attributes('BANDWIDTH=1,CODECS="avc1.4d401e,mp4a.40.2",NAME=x') == {
+        "BANDWIDTH": "1",
+        "CODECS": "avc1.4d401e,mp4a.40.2",
+        "NAME": "x",
+    }
+
+
+def test_master_playlist_variants_and_audio_groups() -> None:
+    playlist = parse_master_playlist(MASTER)
+
+    assert playlist.variants[1] == HlsVariant(
+        bandwidth=5000000,
+        average_bandwidth=4200000,
+        width=1920,
+        height=1080,
+        frame_rate=50.0,
+        codecs=("hvc1.2.4.L123.B0", "ec-3"),
+        audio_group="aud",
+    )
+    assert playlist.variants[0].frame_rate is None
+    assert playlist.audio_channels == {"aud": 6}
+
+
+def test_media_and_foreign_playlists() -> None:
+    assert parse_master_playlist("#EXTM3U\n#EXTINF:6.0,\nseg1.ts\n").variants == ()
+    with pytest.raises(ValueError):
+        parse_master_playlist("<html>Not found</html>")
+
+
+@pytest.mark.parametrize(
+    ("codecs", "names"),
+    [
+        (("avc1.64001f", "mp4a.40.2"), ("h264", "aac")),
+        (("mp4a.40.34", "av01.0.08M.08"), ("av1", "mp3")),
+        (("ac-3",), (None, "ac3")),
+        (("stpp.ttml.im1t",), (None, None)),
+    ],
+)
+def test_codec_names_follow_ffprobe(
+    codecs: tuple[str, ...], names: tuple[str | None, str | None]
+) -> None:
+    assert codec_names(codecs) == names
@@ -0,0 +1,40 @@
+"""Tests for per-run host failure tracking."""
+
+from src.utils.host_health import HostHealth
+
+URL = "https://down.example/live.m3u8"
+
+
+def test_host_is_short_circuited_after_consecutive_failures() -> None:
+    health = HostHealth(failure_threshold=2, recovery_sample=3)
+    health.failure(URL, "timeout")
+    assert health.short_circuit(URL) is None
+    health.failure("https://down.example/other.m3u8", "invalid")
+
+    outcomes = [health.short_circuit(URL) for _ in range(6)]
+
+    # Every third request still runs, to notice a recovery.
+    assert outcomes == ["invalid", "invalid", None, "invalid", "invalid", None]
+    assert health.short_circuited == 4
+    assert health.down_hosts == ["down.example"]
+    assert health.short_circuit("https://up.example/live.m3u8") is None
+
+
+def test_an_answer_clears_the_host() -> None:
+    health = HostHealth(failure_threshold=1)
+    health.failure(URL, "timeout")
+    assert health.is_down(URL)
+
+    health.success(URL)
+
+    assert not health.is_down(URL)
+    assert health.short_circuit(URL) is None
+
+
+def test_zero_threshold_never_short_circuits() -> None:
+    health = HostHealth(failure_threshold=0)
+    for _ in range(5):
+        health.failure(URL, "timeout")
+
+    assert health.short_circuit(URL) is None
+    assert health.down_hosts == []
@@ -0,0 +1,149 @@
+"""Tests for host-aware request scheduling."""
+
+import asyncio
+import time
+
+import pytest
+
+from src.utils.host_scheduler import HostScheduler, host_key, parse_retry_after
+
+
+@pytest.mark.parametrize(
+    ("url", "key"),
+    [
+        ("https://CDN.example/live.m3u8", "cdn.example"),
+        ("http://cdn.example:8080/a.m3u8", "cdn.example:8080"),
+        ("not a url", ""),
+    ],
+)
+def test_host_key(url: str, key: str) -> None:
+    assert host_key(url) == key
+
+
+def test_parse_retry_after_accepts_seconds_and_dates() -> None:
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:30 GMT", now=1445412480) == 30
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT", now=1445412480) == 0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+async def _run(scheduler: HostScheduler, urls: list[str], hold: float = 0) -> list[str]:
+    order: list[str] = []
+
+    async def request(url: str) -> None:
+        async with scheduler.slot(url):
+            order.append(host_key(url))
+            await asyncio.sleep(hold)
+
+    await asyncio.gather(*(request(url) for url in urls))
+    return order
+
+
+async def test_hosts_take_turns_for_global_slots() -> None:
+    scheduler = HostScheduler(max_concurrent=1)
+    urls = [f"https://busy.example/{index}" for index in range(4)] + ["https://quiet.example/"]
+
+    order = await _run(scheduler, urls)
+
+    # The first busy request is granted on arrival; quiet then waits one turn, not three.
+    assert order == ["busy.example", "busy.example", "quiet.example", "busy.example", "busy.example"]
+
+
+async def test_per_host_cap_leaves_slots_to_other_hosts() -> None:
+    scheduler = HostScheduler(max_concurrent=4, max_per_host=2)
+    in_flight: dict[str, int] = {}
+    peaks: dict[str, int] = {}
+
+    async def request(url: str) -> None:
+        async with scheduler.slot(url):
+            key = host_key(url)
+            in_flight[key] = in_flight.get(key, 0) + 1
+            peaks[key] = max(peaks.get(key, 0), in_flight[key])
+            await asyncio.sleep(0.01)
+            in_flight[key] -= 1
+
+    urls = [f"https://a.example/{i}" for i in range(6)] + [f"https://b.example/{i}" for i in range(6)]
+    await asyncio.gather(*(request(url) for url in urls))
+
+    assert peaks == {"a.example": 2, "b.example": 2}
+
+
+async def test_rate_limit_spaces_requests_per_host() -> None:
+    scheduler = HostScheduler(max_concurrent=10, rate_per_second=50, burst=1)
+
+    started = time.monotonic()
+    await _run(scheduler, ["https://a.example/1", "https://a.example/2", "https://a.example/3"])
+
+    assert time.monotonic() - started >= 0.035
+
+
+async def test_deferred_host_does_not_block_others() -> None:
+    scheduler = HostScheduler(max_concurrent=2)
+    scheduler.defer("https://slow.example/", 0.05)
+
+    order = await _run(scheduler, ["https://slow.example/1", "https://fast.example/1"])
+
+    assert order == ["fast.example", "slow.example"]
+
+
+async def test_cancelled_waiter_frees_its_turn() -> None:
+    scheduler = HostScheduler(max_concurrent=1)
+    release = asyncio.Event()
+
+    async def holder() -> None:
+        async with scheduler.slot("https://a.example/"):
+            await release.wait()
+
+    first = asyncio.create_task(holder())
+    await asyncio.sleep(0)
+    waiting = asyncio.create_task(_run(scheduler, ["https://b.example/"]))
+    await asyncio.sleep(0)
+    waiting.cancel()
+    release.set()
+    await first
+
+    assert await _run(scheduler, ["https://c.example/"]) == ["c.example"]
+
+
+async def test_lower_priority_values_go_first_within_a_host() -> None:
+    scheduler = HostScheduler(max_concurrent=1)
+    order: list[int] = []
+
+    async def request(priority: int) -> None:
+        async with scheduler.slot("https://a.example/", priority):
+            order.append(priority)
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*(request(priority) for priority in (5, 3, 4, 1)))
+
+    # The first arrival is granted before the others queue.
+    assert order == [5, 1, 3, 4]
+
+
+async def test_most_urgent_host_goes_first_and_ties_take_turns() -> None:
+    scheduler = HostScheduler(max_concurrent=1)
+    order: list[str] = []
+
+    async def request(url: str, priority: int) -> None:
+        async with scheduler.slot(url, priority):
+            order.append(f"{host_key(url)}:{priority}")
+            await asyncio.sleep(0)
+
+    requests = [(f"https://bulk.example/{index}", 1) for index in range(4)]
+    requests += [("https://main.example/1", 0), ("https://target.example/1", 0)]
+    requests += [("https://main.example/2", 0), ("https://other.example/1", 1)]
+    await asyncio.gather(*(request(url, priority) for url, priority in requests))
+
+    # After the first arrival, priority 0 waiters on any host go before the
+    # bulk host's backlog; hosts tied on priority alternate.
+    assert order == [
+        "bulk.example:1",
+        "main.example:0",
+        "target.example:0",
+        "main.example:0",
+        "bulk.example:1",
+        "other.example:1",
+        "bulk.example:1",
+        "bulk.example:1",
+    ]
@@ -0,0 +1,125 @@
+"""Tests for the upstream HTTP cache."""
+
+import gzip
+from pathlib import Path
+
+import aiohttp
+import pytest
+from aioresponses import aioresponses
+from yarl import URL
+
+from src.utils.http_cache import HttpCache
+
+CHANNELS_URL = "https://iptv-org.example/api/channels.json"
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def _get(cache: HttpCache, max_age_seconds: float = 3600) -> tuple[bytes, bool]:
+    async with aiohttp.ClientSession() as session:
+        async with cache.request(
+            session, CHANNELS_URL, max_age_seconds=max_age_seconds, timeout=5
+        ) as body:
+            content = b"".join([chunk async for chunk in body.chunks])
+            return content, body.from_cache
+
+
+@pytest.mark.asyncio
+async def test_fresh_entry_is_served_without_request_and_stored_compressed(
+    tmp_path: Path,
+) -> None:
+    clock = _Clock()
+    cache = HttpCache(tmp_path, clock=clock)
+
+    with aioresponses() as mocked:
+        mocked.get(CHANNELS_URL, body=b'[{"id": "a"}]', headers={"ETag": '"v1"'})
+        assert await _get(cache) == (b'[{"id": "a"}]', False)
+
+        clock.now += 60
+        assert await _get(cache) == (b'[{"id": "a"}]', True)
+        assert len(mocked.requests[("GET", URL(CHANNELS_URL))]) == 1
+
+    (body_path,) = tmp_path.glob("*.body.gz")
+    assert gzip.decompress(body_path.read_bytes()) == b'[{"id": "a"}]'
+
+
+@pytest.mark.asyncio
+async def test_expired_entry_is_revalidated_with_validators(tmp_path: Path) -> None:
+    clock = _Clock()
+    cache = HttpCache(tmp_path, clock=clock)
+
+    with aioresponses() as mocked:
+        mocked.get(
+            CHANNELS_URL,
+            body=b"[]",
+            headers={"ETag": '"v1"', "Last-Modified": "Wed, 15 Jul 2026 00:23:54 GMT"},
+        )
+        await _get(cache)
+        clock.now += 7200
+        mocked.get(CHANNELS_URL, status=304)
+        assert await _get(cache) == (b"[]", True)
+
+        revalidation = mocked.requests[("GET", URL(CHANNELS_URL))][1]
+        assert revalidation.kwargs["headers"]["If-None-Match"] == '"v1"'
+        assert (
+            revalidation.kwargs["headers"]["If-Modified-Since"]
+            == "Wed, 15 Jul 2026 00:23:54 GMT"
+        )
+
+        # The 304 restarted the freshness window.
+        clock.now += 60
+        assert await _get(cache) == (b"[]", True)
+        assert len(mocked.requests[("GET", URL(CHANNELS_URL))]) == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_copy_is_served_when_upstream_is_unreachable(tmp_path: Path) -> None:
+    clock = _Clock()
+    cache = HttpCache(tmp_path, clock=clock)
+
+    with aioresponses() as mocked:
+        mocked.get(CHANNELS_URL, body=b"[1]")
+        await _get(cache)
+        clock.now += 7200
+        mocked.get(CHANNELS_URL, exception=aiohttp.ClientConnectionError("offline"))
+        assert await _get(cache) == (b"[1]", True)
+
+        mocked.get(CHANNELS_URL, status=503)
+        assert await _get(cache) == (b"[1]", True)
+
+
+@pytest.mark.asyncio
+async def test_unconsumed_download_is_not_committed(tmp_path: Path) -> None:
+    cache = HttpCache(tmp_path)
+
+    with aioresponses() as mocked:
+        mocked.get(CHANNELS_URL, body=b"[1, 2, 3]")
+        async with aiohttp.ClientSession() as session:
+            with pytest.raises(RuntimeError):
+                async with cache.request(session, CHANNELS_URL, max_age_seconds=3600, timeout=5):
+                    raise RuntimeError("parser failed")
+
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache_passes_through(tmp_path: Path) -> None:
+    cache = HttpCache(None)
+
+    with aioresponses() as mocked:
+        mocked.get(CHANNELS_URL, body=b"[]")
+        mocked.get(CHANNELS_URL, body=b"[]")
+        assert await _get(cache) == (b"[]", False)
+        assert await _get(cache) == (b"[]", False)
+        assert len(mocked.requests[("GET", URL(CHANNELS_URL))]) == 2
+
+    with aioresponses() as mocked:
+        mocked.get(CHANNELS_URL, exception=aiohttp.ClientConnectionError("offline"))
+        with pytest.raises(aiohttp.ClientConnectionError):
+            await _get(cache)
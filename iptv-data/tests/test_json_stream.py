@@ -0,0 +1,47 @@
+"""Tests for incremental JSON array decoding."""
+
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+import pytest
+
+from src.utils.json_stream import iter_json_array
+
+DOCUMENT = [
+    {"id": "Ä.in", "alt_names": ["x,]"], "nested": {"a": [1, {"b": None}]}},
+    125,
+    -1.5e3,
+    True,
+    None,
+    "tail",
+]
+
+
+async def _decode(body: bytes, chunk_size: int) -> list[Any]:
+    async def chunks() -> AsyncIterator[bytes]:
+        for start in range(0, len(body), chunk_size):
+            yield body[start : start + chunk_size]
+
+    return [row async for row in iter_json_array(chunks())]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 5, 64, 65536])
+@pytest.mark.parametrize("indent", [None, 2])
+async def test_rows_match_json_loads_for_any_chunking(chunk_size: int, indent: int | None) -> None:
+    body = json.dumps(DOCUMENT, indent=indent, ensure_ascii=False).encode()
+
+    assert await _decode(body, chunk_size) == DOCUMENT
+
+
+async def test_empty_array_and_byte_order_mark() -> None:
+    assert await _decode(b" [ ] \n", 1) == []
+    assert await _decode(b"\xef\xbb\xbf[1]", 1) == [1]
+
+
+@pytest.mark.parametrize(
+    "body", [b"", b"{}", b"[1", b"[1,]", b"[,1]", b"[1 2]", b"[1]x", b'[{"a": }]']
+)
+async def test_malformed_arrays_are_rejected(body: bytes) -> None:
+    with pytest.raises(ValueError):
+        await _decode(body, 3)
@@ -1,14 +1,61 @@
 """Tests for source loaders."""
 
+import asyncio
+import codecs
+import json
+from collections.abc import AsyncIterator
 from pathlib import Path
+from typing import Any
 
+import aiohttp
 import pytest
-
-from src.loaders.iptv_org_loader import IptvOrgLoader, UpstreamSchemaError
-from src.loaders.m3u_loader import M3ULoader
-from src.models import SourceType
+from aioresponses import CallbackResult, aioresponses
+
+from src.loaders import local_loader, m3u_loader
+from src.loaders.base_loader import LoaderError
+from src.loaders.iptv_org_loader import IptvOrgAttrs, IptvOrgLoader, UpstreamSchemaError
+from src.loaders.local_loader import LocalFileLoader
+from src.loaders.m3u_loader import ArrivalQueue, M3ULoader, tokenize_extinf
+from src.models import RawChannel, SourceType
 from src.utils.config import SourceConfig
 
+IPTV_ORG_INDEX = Path(__file__).parents[1] / "fixtures" / "iptv-org" / "index.m3u"
+IPTV_ORG_API = "https://iptv-org.example/api"
+
+
+def _upstream_payloads() -> dict[str, list[dict[str, Any]]]:
+    """One schema-valid row per IPTV-org endpoint."""
+    return {
+        "channels": [
+            {
+                "id": "News.in",
+                "name": "News",
+                "country": "IN",
+                "categories": ["news"],
+                "is_nsfw": False,
+                "closed": None,
+                "replaced_by": None,
+            }
+        ],
+        "streams": [
+            {
+                "channel": "News.in",
+                "feed": None,
+                "url": "https://news.example/live.m3u8",
+                "quality": "720p",
+                "user_agent": None,
+                "referrer": None,
+            }
+        ],
+        "blocklist": [{"channel": "Blocked.in", "reason": "dmca"}],
+        "logos": [],
+        "feeds": [],
+        "categories": [{"id": "news", "name": "News"}],
+        "countries": [{"code": "IN", "name": "India"}],
+        "regions": [],
+        "languages": [{"code": "hin", "name": "Hindi"}],
+    }
+
 
 class TestM3ULoader:
     """Tests for M3U loader."""
@@ -111,6 +158,175 @@ http://example.com/secure.m3u8
         assert attrs["tvg_name"] == "Test"
         assert attrs["group_title"] == "Group"
 
+    @pytest.mark.parametrize(
+        ("line", "expected_attrs", "expected_name"),
+        [
+            (
+                '#EXTINF:-1 tvg-id="a" group-title="News, Local",Channel, One',
+                {"tvg_id": "a", "group_title": "News, Local"},
+                "Channel, One",
+            ),
+            ('#EXTINF:-1 tvg-id="a",Name tvg-id="b"', {"tvg_id": "a"}, 'Name tvg-id="b"'),
+            ('#EXTINF:-1 TVG-ID="a" tvg-id="b",Name', {"tvg_id": "b"}, "Name"),
+            ('#EXTINF:-1 tvg-id="a, b,Name', {}, "b,Name"),
+            ("#EXTINF:-1 Name", {}, ""),
+        ],
+    )
+    def test_tokenize_extinf_quoting(
+        self, line: str, expected_attrs: dict[str, str], expected_name: str
+    ) -> None:
+        """Quoted commas stay in values; the name starts at the first bare comma."""
+        attrs, name = tokenize_extinf(line)
+
+        assert attrs == expected_attrs
+        assert name == expected_name
+
+    def test_tokenize_extinf_shares_attribute_keys(self) -> None:
+        """Normalized attribute names are one interned object across lines."""
+        first, _ = tokenize_extinf('#EXTINF:-1 tvg-logo="x",A')
+        second, _ = tokenize_extinf('#EXTINF:-1 tvg-logo="y",B')
+
+        assert next(iter(first)) is next(iter(second))
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 4096, 65536])
+    async def test_streaming_parse_matches_buffered_parse(self, chunk_size: int) -> None:
+        """Streaming parse over byte chunks matches the buffered parser exactly."""
+        loader = M3ULoader(SourceConfig(enabled=True))
+        body = IPTV_ORG_INDEX.read_bytes()
+        if chunk_size == 1:
+            body = body[:20_000]
+        text = body.decode("utf-8")
+
+        async def chunks() -> AsyncIterator[str]:
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            for start in range(0, len(body), chunk_size):
+                yield decoder.decode(body[start : start + chunk_size])
+            yield decoder.decode(b"", final=True)
+
+        streamed = [channel async for channel in loader._parse_m3u_chunks(chunks())]
+
+        # Reference: the original whole-body strip/split parse.
+        expected = []
+        attrs: dict[str, object] = {}
+        name = ""
+        for line in text.strip().split("\n"):
+            line = line.strip()
+            if line.startswith("#EXTINF:"):
+                attrs, name = loader._parse_extinf(line)
+            elif line and not line.startswith("#"):
+                if name:
+                    expected.append(loader._create_channel(name, line, attrs))
+                attrs, name = {}, ""
+
+        assert streamed == expected
+        assert loader._parse_m3u(text) == expected
+        if chunk_size != 1:
+            assert len(streamed) == 13469
+
+    async def test_load_streams_playlist_from_response(self) -> None:
+        """Loader parses a fetched playlist without a trailing newline."""
+        url = "https://playlists.example/index.m3u"
+        loader = M3ULoader(SourceConfig(enabled=True, urls=[{"url": url, "name": "fixture"}]))
+        body = '#EXTM3U\n#EXTINF:-1 tvg-id="a",Ä Channel\r\nhttp://a.example/live'
+
+        with aioresponses() as mocked:
+            mocked.get(url, body=body.encode("utf-8"))
+            channels = await loader.load()
+
+        assert [(channel.name, channel.stream_url) for channel in channels] == [
+            ("Ä Channel", "http://a.example/live")
+        ]
+
+    @pytest.mark.parametrize("slots", [1, 4])
+    async def test_urls_load_concurrently_in_configured_order(self, slots: int) -> None:
+        """Playlists merge in config order regardless of completion order."""
+        urls = [f"https://playlists.example/{index}.m3u" for index in range(3)]
+        loader = M3ULoader(
+            SourceConfig(enabled=True, urls=[{"url": url} for url in urls]),
+            fetch_slots=asyncio.Semaphore(slots),
+        )
+        in_flight = 0
+        peak_in_flight = 0
+
+        def respond(index: int) -> Any:
+            async def callback(_url: Any, **_kwargs: Any) -> CallbackResult:
+                nonlocal in_flight, peak_in_flight
+                in_flight += 1
+                peak_in_flight = max(peak_in_flight, in_flight)
+                # Later playlists finish first.
+                await asyncio.sleep(0.03 - index * 0.01)
+                in_flight -= 1
+                return CallbackResult(
+                    body=f"#EXTINF:-1,Channel {index}\nhttp://{index}.example/live\n"
+                )
+
+            return callback
+
+        with aioresponses() as mocked:
+            for index, url in enumerate(urls):
+                mocked.get(url, callback=respond(index))
+            channels = await loader.load()
+
+        assert [channel.name for channel in channels] == [
+            "Channel 0",
+            "Channel 1",
+            "Channel 2",
+        ]
+        assert peak_in_flight == min(slots, 3)
+
+    async def test_iter_channels_yields_before_later_playlists_finish(self) -> None:
+        """The first playlist is consumable while a later one is still loading."""
+        urls = ["https://playlists.example/fast.m3u", "https://playlists.example/slow.m3u"]
+        loader = M3ULoader(SourceConfig(enabled=True, urls=[{"url": url} for url in urls]))
+        release = asyncio.Event()
+
+        async def slow(_url: Any, **_kwargs: Any) -> CallbackResult:
+            await release.wait()
+            return CallbackResult(body="#EXTINF:-1,Slow\nhttp://slow.example/live\n")
+
+        with aioresponses() as mocked:
+            mocked.get(urls[0], body="#EXTINF:-1,Fast\nhttp://fast.example/live\n")
+            mocked.get(urls[1], callback=slow)
+            channels = loader.iter_channels()
+            first = await asyncio.wait_for(anext(channels), timeout=1)
+            release.set()
+            rest = [channel async for channel in channels]
+
+        assert [channel.name for channel in [first, *rest]] == ["Fast", "Slow"]
+
+    async def test_later_playlist_pauses_once_its_buffer_is_full(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A playlist ahead of its turn buffers at most MAX_PENDING_CHANNELS."""
+        monkeypatch.setattr(m3u_loader, "MAX_PENDING_CHANNELS", 2)
+        loader = M3ULoader(SourceConfig(enabled=True))
+        release = asyncio.Event()
+        produced = [0, 0]
+
+        def producer(slow: bool) -> Any:
+            async def produce(index: int, arrivals: ArrivalQueue) -> None:
+                if slow:
+                    await release.wait()
+                for number in range(5):
+                    channel = RawChannel(
+                        name=f"{index}-{number}", stream_url="http://x", source=SourceType.M3U
+                    )
+                    await arrivals.put((index, channel))
+                    produced[index] += 1
+                arrivals.put_nowait((index, None))
+
+            return produce
+
+        merged = loader._merge_in_order([producer(True), producer(False)])
+        first = asyncio.ensure_future(anext(merged))
+        for _ in range(20):
+            await asyncio.sleep(0)
+        assert produced == [0, 2]
+
+        release.set()
+        names = [(await first).name, *[channel.name async for channel in merged]]
+        assert names == [f"{index}-{number}" for index in range(2) for number in range(5)]
+
     def test_loader_disabled(self) -> None:
         """Test that disabled loader returns empty list."""
         loader = M3ULoader(SourceConfig(enabled=False))
@@ -122,6 +338,71 @@ http://example.com/secure.m3u8
         assert loader.priority == 5
 
 
+class TestLocalFileLoader:
+    """Tests for the memory-mapped local file loader."""
+
+    async def test_directory_loads_playlists_and_stream_rows_in_name_order(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Windowed parsing of mapped files matches the in-memory parser."""
+        # Small windows split lines, attributes and UTF-8 sequences.
+        monkeypatch.setattr(local_loader, "WINDOW_SIZE", 4096)
+        playlist = IPTV_ORG_INDEX.read_bytes()[:200_000]
+        (tmp_path / "b.m3u").write_bytes(b"\xef\xbb\xbf" + playlist)
+        rows = [{"channel": "News.in", "url": "https://news.example/1.m3u8", "user_agent": "UA"}]
+        (tmp_path / "a.json").write_text(json.dumps(rows))
+        (tmp_path / "c.m3u8").write_bytes(b"")
+        (tmp_path / "notes.txt").write_text("not a playlist")
+
+        loader = LocalFileLoader(SourceConfig(enabled=True, paths=[tmp_path.name]), tmp_path.parent)
+        channels = await loader.load()
+
+        expected = M3ULoader(SourceConfig(enabled=True))._parse_m3u(playlist.decode("utf-8"))
+        assert channels[0].name == "News.in"
+        assert channels[0].headers is not None and channels[0].headers.user_agent == "UA"
+        assert [(c.name, c.stream_url, c.extra_attrs) for c in channels[1:]] == [
+            (c.name, c.stream_url, c.extra_attrs) for c in expected
+        ]
+        assert {c.source for c in channels} == {SourceType.CUSTOM}
+
+    async def test_windows_are_views_released_before_the_file_is_unmapped(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Windows view the mapping without copying and never keep it open."""
+        monkeypatch.setattr(local_loader, "WINDOW_SIZE", 4096)
+        path = tmp_path / "index.m3u"
+        path.write_bytes(IPTV_ORG_INDEX.read_bytes()[:20_000])
+        loader = LocalFileLoader(SourceConfig(enabled=True, paths=[path.name]), tmp_path)
+
+        windows = loader._read_windows(path)
+        window = await anext(windows)
+        assert isinstance(window, memoryview) and len(window) == 4096
+        await anext(windows)
+        with pytest.raises(ValueError):
+            bytes(window)
+        # Closing mid-file unmaps the file without a BufferError.
+        await windows.aclose()
+
+    async def test_relative_paths_resolve_against_base_dir(self, tmp_path: Path) -> None:
+        """Configured paths are relative to the given base directory."""
+        (tmp_path / "mirror").mkdir()
+        (tmp_path / "mirror" / "one.m3u").write_text("#EXTM3U\n#EXTINF:-1,One\nhttp://one\n")
+
+        loader = LocalFileLoader(SourceConfig(enabled=True, paths=["mirror/one.m3u"]), tmp_path)
+
+        assert [c.name for c in await loader.load()] == ["One"]
+
+    async def test_missing_path_is_a_loader_error(self, tmp_path: Path) -> None:
+        """A configured path that does not exist fails the source."""
+        loader = LocalFileLoader(SourceConfig(enabled=True, paths=["missing.m3u"]), tmp_path)
+
+        with pytest.raises(LoaderError) as error:
+            await loader.load()
+
+        assert error.value.source == "custom"
+        assert isinstance(error.value.cause, FileNotFoundError)
+
+
 class TestIptvOrgLoader:
     def test_preserves_aliases_categories_and_organization_metadata(self) -> None:
         loader = IptvOrgLoader(
@@ -261,6 +542,31 @@ class TestIptvOrgLoader:
         assert channels[0].headers.user_agent == "HD-Agent"
         assert channels[0].headers.referrer == "https://news.example"
 
+    def test_extra_attrs_share_channel_rows_and_copy_on_write(self) -> None:
+        loader = IptvOrgLoader(SourceConfig(enabled=True), target_countries=["IN"])
+        loader._apply_payloads(_upstream_payloads())
+        loader._streams_data.append({**loader._streams_data[0], "url": "https://news.example/2"})
+
+        first, second = loader._process_channels()
+
+        assert isinstance(first.extra_attrs, IptvOrgAttrs)
+        assert first.extra_attrs["categories"] is second.extra_attrs["categories"]
+        assert list(first.extra_attrs) == list(IptvOrgAttrs.KEYS)
+        assert first.extra_attrs.get("height") == 720
+        assert first.extra_attrs.get("label_correct") is None
+        assert dict(first.extra_attrs) == dict(second.extra_attrs)
+
+        first.extra_attrs["quality"] = "1080p"
+        first.extra_attrs["label_correct"] = False
+        del first.extra_attrs["website"]
+
+        assert first.extra_attrs["quality"] == "1080p"
+        assert "website" not in first.extra_attrs
+        assert list(first.extra_attrs)[-1] == "label_correct"
+        assert second.extra_attrs["quality"] == "720p"
+        assert "website" in second.extra_attrs
+        assert loader._streams_data[0]["quality"] == "720p"
+
     @pytest.mark.parametrize(
         ("filter_nsfw", "reason", "is_nsfw", "expected"),
         [
@@ -339,6 +645,180 @@ class TestIptvOrgLoader:
         assert loader.drop_counts["closed"] == 1
         assert loader.drop_counts["replaced"] == 1
 
+    def test_country_filter_keeps_replacements_and_counts_all_policy_drops(self) -> None:
+        def channel(channel_id: str, country: str, **overrides: Any) -> dict[str, Any]:
+            return {
+                "id": channel_id,
+                "name": channel_id,
+                "country": country,
+                "categories": [],
+                "is_nsfw": False,
+                "closed": None,
+                "replaced_by": None,
+                **overrides,
+            }
+
+        loader = IptvOrgLoader(SourceConfig(enabled=True), target_countries=["IN"])
+        loader._channels_data = [
+            channel("Old.in", "IN", replaced_by="New.fr"),
+            channel("New.fr", "FR"),
+            channel("Other.fr", "FR"),
+            channel("Closed.fr", "FR", closed="2025-01-01"),
+        ]
+        loader._streams_data = [
+            {"channel": row["id"], "url": f"https://{row['id']}"} for row in loader._channels_data
+        ]
+        loader._feeds_data = [
+            {"channel": "Other.fr", "id": "SD", "is_main": True, "languages": ["fra"]}
+        ]
+
+        channels = loader._process_channels()
+
+        assert [channel.tvg_id for channel in channels] == ["New.fr"]
+        assert loader.drop_counts == {"dmca": 0, "nsfw": 0, "closed": 1, "replaced": 1}
+
+    async def test_fetches_all_endpoints_concurrently_into_one_snapshot(self) -> None:
+        loader = IptvOrgLoader(
+            SourceConfig(enabled=True, base_url=IPTV_ORG_API),
+            target_countries=["IN"],
+            keep_snapshot=True,
+        )
+        in_flight = 0
+        peak_in_flight = 0
+
+        def respond(rows: list[dict[str, Any]]) -> Any:
+            async def callback(_url: Any, **_kwargs: Any) -> CallbackResult:
+                nonlocal in_flight, peak_in_flight
+                in_flight += 1
+                peak_in_flight = max(peak_in_flight, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+                return CallbackResult(payload=rows)
+
+            return callback
+
+        with aioresponses() as mocked:
+            for endpoint, rows in _upstream_payloads().items():
+                mocked.get(f"{IPTV_ORG_API}/{endpoint}.json", callback=respond(rows))
+            channels = await loader.load()
+
+        assert peak_in_flight == 9
+        assert [channel.tvg_id for channel in channels] == ["News.in"]
+        assert loader._blocklist == {"Blocked.in": "dmca"}
+        assert loader.taxonomies["countries"] == [{"code": "IN", "name": "India"}]
+
+    async def test_rows_of_filtered_out_channels_are_not_kept(self) -> None:
+        payloads = _upstream_payloads()
+        template = payloads["channels"][0]
+        payloads["channels"] = [
+            {**template, "id": "New.fr", "country": "FR", "website": "https://new.fr"},
+            {**template, "id": "Other.fr", "country": "FR"},
+            {**template, "id": "Old.in", "replaced_by": "New.fr"},
+            template,
+        ]
+        payloads["streams"] = [
+            {**payloads["streams"][0], "channel": row["id"], "url": f"https://{row['id']}"}
+            for row in payloads["channels"]
+        ]
+        requests: list[str] = []
+
+        def respond(endpoint: str, rows: list[dict[str, Any]]) -> Any:
+            async def callback(_url: Any, **_kwargs: Any) -> CallbackResult:
+                requests.append(endpoint)
+                await asyncio.sleep(0.01)
+                return CallbackResult(payload=rows)
+
+            return callback
+
+        async def load(keep_snapshot: bool) -> tuple[IptvOrgLoader, list[Any]]:
+            loader = IptvOrgLoader(
+                SourceConfig(enabled=True, base_url=IPTV_ORG_API),
+                target_countries=["IN"],
+                keep_snapshot=keep_snapshot,
+            )
+            with aioresponses() as mocked:
+                for endpoint, rows in payloads.items():
+                    mocked.get(
+                        f"{IPTV_ORG_API}/{endpoint}.json",
+                        callback=respond(endpoint, rows),
+                        repeat=True,
+                    )
+                channels = await loader.load()
+            return loader, channels
+
+        full, expected = await load(keep_snapshot=True)
+        requests.clear()
+        pushed_down, channels = await load(keep_snapshot=False)
+
+        assert channels == expected
+        assert [channel.tvg_id for channel in channels] == ["New.fr", "News.in"]
+        assert pushed_down.drop_counts == full.drop_counts
+        # New.fr was reduced before Old.in named it as replacement: re-read.
+        assert requests.count("channels") == 2
+        # Streams do not wait for channel eligibility to be requested.
+        last_channels_request = max(i for i, name in enumerate(requests) if name == "channels")
+        assert requests.index("streams") < last_channels_request
+        assert pushed_down._channels_data[1] == {
+            "id": "Other.fr",
+            "country": "FR",
+            "is_nsfw": False,
+            "closed": None,
+            "replaced_by": None,
+        }
+        assert [row["channel"] for row in pushed_down._streams_data] == ["New.fr", "News.in"]
+
+    async def test_failed_endpoint_cancels_siblings_and_keeps_previous_snapshot(
+        self,
+    ) -> None:
+        loader = IptvOrgLoader(SourceConfig(enabled=True, base_url=IPTV_ORG_API))
+        loader._channels_data = [{"id": "Previous.in"}]
+        loader.taxonomies = {"categories": [{"id": "previous"}]}
+        cancelled: list[str] = []
+
+        def slow(endpoint: str, rows: list[dict[str, Any]]) -> Any:
+            async def callback(_url: Any, **_kwargs: Any) -> CallbackResult:
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    cancelled.append(endpoint)
+                    raise
+                return CallbackResult(payload=rows)
+
+            return callback
+
+        payloads = _upstream_payloads()
+        payloads["channels"][0]["is_nsfw"] = "no"
+        with aioresponses() as mocked:
+            for endpoint, rows in payloads.items():
+                url = f"{IPTV_ORG_API}/{endpoint}.json"
+                if endpoint == "channels":
+                    mocked.get(url, payload=rows)
+                else:
+                    mocked.get(url, callback=slow(endpoint, rows))
+            with pytest.raises(LoaderError) as error:
+                await asyncio.wait_for(loader.load(), timeout=2)
+
+        assert isinstance(error.value.cause, UpstreamSchemaError)
+        # Every request starts at once, so every one in flight is cancelled.
+        assert sorted(cancelled) == sorted(set(payloads) - {"channels"})
+        assert loader._channels_data == [{"id": "Previous.in"}]
+        assert loader.taxonomies == {"categories": [{"id": "previous"}]}
+
+    async def test_network_failure_is_reported_as_its_own_cause(self) -> None:
+        loader = IptvOrgLoader(SourceConfig(enabled=True, base_url=IPTV_ORG_API))
+
+        with aioresponses() as mocked:
+            for endpoint, rows in _upstream_payloads().items():
+                url = f"{IPTV_ORG_API}/{endpoint}.json"
+                if endpoint == "logos":
+                    mocked.get(url, exception=aiohttp.ClientConnectionError("offline"))
+                else:
+                    mocked.get(url, payload=rows)
+            with pytest.raises(LoaderError) as error:
+                await loader.load()
+
+        assert isinstance(error.value.cause, aiohttp.ClientConnectionError)
+
     def test_schema_guard_rejects_missing_and_wrong_types(self) -> None:
         loader = IptvOrgLoader(SourceConfig(enabled=True))
         valid = {
@@ -0,0 +1,54 @@
+"""Tests for the pipeline entry point."""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from src.main import _load_streaming, run_pipeline
+from src.processors import Normalizer, StreamValidator
+from src.utils import Config
+from src.utils.config import NormalizationConfig, ValidationConfig
+from src.utils.validation_cache import ValidationCache
+
+
+async def test_streaming_load_without_loaders_ends_validation() -> None:
+    streamed = await asyncio.wait_for(
+        _load_streaming(
+            [],
+            Normalizer(NormalizationConfig()),
+            StreamValidator(ValidationConfig()),
+            Config(),
+        ),
+        timeout=5,
+    )
+
+    assert streamed == ([], 0)
+
+
+async def test_failed_run_still_saves_state_and_closes_the_cache(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    closed: list[ValidationCache] = []
+    close = ValidationCache.close
+
+    def record_close(cache: ValidationCache) -> None:
+        closed.append(cache)
+        close(cache)
+
+    monkeypatch.setattr(ValidationCache, "close", record_close)
+    config_path = tmp_path / "config" / "default.yaml"
+    config_path.parent.mkdir()
+    config_path.write_text(
+        "processing:\n"
+        "  delta:\n"
+        "    enabled: true\n"
+        "  validation_cache:\n"
+        "    enabled: true\n"
+    )
+
+    # No sources, so the run ends early with "No channels loaded".
+    assert await run_pipeline(str(config_path)) == 1
+
+    assert (tmp_path / "cache" / "delta" / "state.json.gz").exists()
+    assert len(closed) == 1
@@ -1,10 +1,59 @@
 """Tests for channel normalizer."""
 
+import functools
+import re
+from pathlib import Path
+
 import pytest
 
+from src.loaders.m3u_loader import M3ULoader
 from src.models import RawChannel, SourceType
 from src.processors.normalizer import Normalizer
-from src.utils.config import NormalizationConfig
+from src.utils.config import NormalizationConfig, SourceConfig, load_config
+
+CONFIG_DIR = Path(__file__).parents[1] / "config"
+IPTV_ORG_INDEX = Path(__file__).parents[1] / "fixtures" / "iptv-org" / "index.m3u"
+TRICKY_NAMES = [
+    "HD",
+    "Plus",
+    "Star Plus HD",
+    "News HD Live",
+    "Live News HD",
+    "Sports_HD-TV",
+    "Zee TV 4K",
+    "Channel  TV\tHD ",
+    "Music \u212a",  # Kelvin sign folds onto "k"
+    "Cinema 4\u212a",
+    "İndia TV",
+    "Tamil TV India\n",
+    "Movies hd\n",
+    "",
+]
+
+
+@functools.cache
+def _fixture_names() -> tuple[str, ...]:
+    channels = M3ULoader(SourceConfig(enabled=True))._parse_m3u(
+        IPTV_ORG_INDEX.read_text(encoding="utf-8")
+    )
+    names = {channel.tvg_name or channel.name for channel in channels} | set(TRICKY_NAMES)
+    return tuple(sorted(names))
+
+
+def _legacy_normalize_name(config: NormalizationConfig, name: str) -> str:
+    """The original per-suffix regex implementation."""
+    result = name
+    if config.lowercase:
+        result = result.lower()
+    if config.strip_symbols:
+        result = re.sub(r"[^\w\s]", "", result)
+    if config.collapse_whitespace:
+        result = re.sub(r"\s+", " ", result).strip()
+    for suffix_list in config.remove_suffixes.values():
+        for suffix in suffix_list:
+            pattern = re.compile(rf"(?:^|[\s_-]){re.escape(suffix)}$", re.IGNORECASE)
+            result = pattern.sub("", result)
+    return result.strip()
 
 
 class TestNormalizer:
@@ -155,3 +204,75 @@ class TestNormalizer:
 
         result = normalizer._normalize_channel(raw)
         assert result.country == "IN"
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [{}, {"lowercase": False}, {"strip_symbols": False, "collapse_whitespace": False}],
+)
+@pytest.mark.parametrize("config_name", ["default.yaml", "development.yaml"])
+def test_suffix_stripping_matches_legacy_regexes(
+    config_name: str, overrides: dict[str, bool]
+) -> None:
+    """Every fixture playlist name normalizes exactly as with the old regexes."""
+    base = load_config(CONFIG_DIR / config_name).normalization
+    config = NormalizationConfig(**{**base.__dict__, **overrides})
+    normalizer = Normalizer(config)
+
+    for name in _fixture_names():
+        assert normalizer._normalize_name(name) == _legacy_normalize_name(config, name), name
+
+
+def test_normalized_names_are_memoised() -> None:
+    """Repeated names are served from the bounded cache."""
+    normalizer = Normalizer(NormalizationConfig(remove_suffixes={"quality": ["hd"]}))
+
+    for _ in range(3):
+        assert normalizer._normalize_name("Star HD") == "star"
+
+    info = normalizer._cached_name.cache_info()
+    assert (info.hits, info.misses) == (2, 1)
+
+
+def test_batch_normalization_keeps_order_scopes_and_failure_logs(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    channels = [
+        RawChannel(name=f"Channel {index} HD", stream_url=f"http://{index}", source=SourceType.M3U)
+        for index in range(3)
+    ]
+    channels.insert(1, RawChannel(name=None, stream_url="http://bad", source=SourceType.M3U))  # type: ignore[arg-type]
+    channels.append(
+        RawChannel(
+            name="Sony",
+            stream_url="http://sony",
+            source=SourceType.IPTV_ORG,
+            tvg_id="Sony.in",
+            language="hin, eng",
+        )
+    )
+    channels.append(
+        RawChannel(
+            name="BBC",
+            stream_url="http://bbc",
+            source=SourceType.IPTV_ORG,
+            extra_attrs={"tvg_country": "gb", "languages": ["eng"]},
+        )
+    )
+
+    normalized = Normalizer(
+        NormalizationConfig(remove_suffixes={"quality": ["hd"]}), "US"
+    ).normalize(channels)
+
+    assert [(c.normalized_name, c.country, c.language) for c in normalized] == [
+        ("channel 0", "US", "en"),
+        ("channel 1", "US", "en"),
+        ("channel 2", "US", "en"),
+        ("sony", "US", "hi"),
+        ("bbc", "GB", "en"),
+    ]
+    assert normalized[3].id == "Sony.in"
+    assert normalized[0].id.startswith("unmatched-")
+    assert [r.getMessage() for r in caplog.records if "Failed to normalize" in r.getMessage()] == [
+        "Failed to normalize channel None: 'NoneType' object has no attribute 'lower'"
+    ]
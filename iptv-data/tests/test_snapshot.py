@@ -0,0 +1,88 @@
+"""Tests for stored IPTV-org snapshots and offline replay."""
+
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+from aioresponses import aioresponses
+
+from src.loaders.base_loader import LoaderError
+from src.loaders.iptv_org_loader import ENDPOINTS, IptvOrgLoader, UpstreamSchemaError
+from src.loaders.snapshot import SnapshotError, read_snapshot, write_snapshot
+from src.utils.config import SourceConfig
+from tests.test_loaders import IPTV_ORG_API, _upstream_payloads
+
+
+def test_snapshot_round_trips_payloads(tmp_path: Path) -> None:
+    path = tmp_path / "snapshots" / "iptv-org.json.gz"
+    write_snapshot(path, _upstream_payloads(), IPTV_ORG_API)
+
+    assert read_snapshot(path, ENDPOINTS) == _upstream_payloads()
+    assert [p.name for p in path.parent.iterdir()] == ["iptv-org.json.gz"]
+
+
+@pytest.mark.parametrize(
+    ("document", "message"),
+    [
+        ({"format": "other", "version": 1, "endpoints": {}}, "not an IPTV-org snapshot"),
+        ({"format": "iptv-org-snapshot", "version": 99, "endpoints": {}}, "version 99"),
+        ({"format": "iptv-org-snapshot", "version": 1, "endpoints": {}}, "missing endpoints"),
+    ],
+)
+def test_unsupported_snapshots_are_rejected(
+    tmp_path: Path, document: dict[str, object], message: str
+) -> None:
+    path = tmp_path / "snapshot.json.gz"
+    path.write_bytes(gzip.compress(json.dumps(document).encode()))
+
+    with pytest.raises(SnapshotError, match=message):
+        read_snapshot(path, ENDPOINTS)
+
+
+async def test_saved_snapshot_replays_without_network(tmp_path: Path) -> None:
+    path = tmp_path / "iptv-org.json.gz"
+    live = IptvOrgLoader(
+        SourceConfig(enabled=True, base_url=IPTV_ORG_API), ["IN"], keep_snapshot=True
+    )
+    with aioresponses() as mocked:
+        for endpoint, rows in _upstream_payloads().items():
+            mocked.get(f"{IPTV_ORG_API}/{endpoint}.json", payload=rows)
+        live_channels = await live.load()
+    live.save_snapshot(path)
+
+    offline = IptvOrgLoader(SourceConfig(enabled=True), ["IN"], snapshot_path=path)
+    # Any request would fail: nothing is mocked.
+    with aioresponses():
+        replayed = await offline.load()
+
+    assert replayed == live_channels
+    assert offline.taxonomies == live.taxonomies
+
+
+async def test_replayed_snapshot_is_schema_checked(tmp_path: Path) -> None:
+    payloads = _upstream_payloads()
+    del payloads["channels"][0]["country"]
+    path = tmp_path / "iptv-org.json.gz"
+    write_snapshot(path, payloads)
+
+    with pytest.raises(LoaderError) as error:
+        await IptvOrgLoader(SourceConfig(enabled=True), snapshot_path=path).load()
+
+    assert isinstance(error.value.cause, UpstreamSchemaError)
+
+
+def test_saving_before_loading_fails(tmp_path: Path) -> None:
+    with pytest.raises(SnapshotError):
+        IptvOrgLoader(SourceConfig(enabled=True)).save_snapshot(tmp_path / "snapshot.json.gz")
+
+
+async def test_payloads_reduced_to_target_countries_cannot_be_saved(tmp_path: Path) -> None:
+    loader = IptvOrgLoader(SourceConfig(enabled=True, base_url=IPTV_ORG_API), ["IN"])
+    with aioresponses() as mocked:
+        for endpoint, rows in _upstream_payloads().items():
+            mocked.get(f"{IPTV_ORG_API}/{endpoint}.json", payload=rows)
+        await loader.load()
+
+    with pytest.raises(SnapshotError, match="keep_snapshot"):
+        loader.save_snapshot(tmp_path / "snapshot.json.gz")
@@ -1,8 +1,11 @@
 import asyncio
+from pathlib import Path
 
+import aiohttp
 import pytest
+from aioresponses import aioresponses
 
-from src.models import ProcessedChannel
+from src.models import ProcessedChannel, StreamSource
 from src.processors.stream_health import StreamHealthProcessor
 from src.utils.config import StreamHealthConfig
 
@@ -112,6 +115,43 @@ async def test_restricted_is_retained_and_probe_failure_is_unchecked() -> None:
     assert summary.unchecked == 1
 
 
+@pytest.mark.asyncio
+async def test_equally_healthy_sources_keep_the_deduplicator_order() -> None:
+    async def runner(
+        _url: str, _headers: dict[str, str], _timeout: float
+    ) -> dict[str, object]:
+        return _probe(720)
+
+    channel = _channel(
+        [
+            {"url": "https://z.example.test/fast", "responseMs": 90.0},
+            {"url": "https://a.example.test/slow", "responseMs": 900.0},
+        ]
+    )
+    channels, _ = await StreamHealthProcessor(
+        StreamHealthConfig(enabled=True), runner
+    ).enrich([channel])
+
+    assert channels[0].stream_url == "https://z.example.test/fast"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("reverse", [False, True])
+async def test_equal_rank_sources_sort_by_url_whatever_the_input_order(reverse: bool) -> None:
+    async def runner(
+        _url: str, _headers: dict[str, str], _timeout: float
+    ) -> dict[str, object]:
+        return _probe(720)
+
+    urls = ["https://a.example.test/live", "https://b.example.test/live"]
+    channel = _channel([{"url": url} for url in (urls[::-1] if reverse else urls)])
+    channels, _ = await StreamHealthProcessor(
+        StreamHealthConfig(enabled=True), runner
+    ).enrich([channel])
+
+    assert [source["url"] for source in channels[0].stream_sources] == urls
+
+
 @pytest.mark.asyncio
 async def test_global_budget_cancels_work_and_leaves_unchecked() -> None:
     async def runner(
@@ -133,3 +173,198 @@ async def test_global_budget_cancels_work_and_leaves_unchecked() -> None:
     ).enrich([channel])
 
     assert summary.unchecked == 1
+
+
+async def test_adaptive_concurrency_grows_past_its_starting_limit() -> None:
+    in_flight = 0
+    peak = 0
+
+    async def runner(
+        _url: str, _headers: dict[str, str], _timeout: float
+    ) -> dict[str, object]:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+        return _probe(720)
+
+    channel = _channel(
+        [{"url": f"https://example.test/{index}", "health": "unchecked"} for index in range(40)]
+    )
+    _, summary = await StreamHealthProcessor(
+        StreamHealthConfig(
+            enabled=True,
+            max_concurrent=2,
+            adaptive_concurrency=True,
+            max_adaptive_concurrent=8,
+        ),
+        runner,
+    ).enrich([channel])
+
+    assert summary.available == 40
+    assert 2 < peak <= 8
+
+
+@pytest.mark.parametrize(
+    ("error", "expected_probes"),
+    # A probe that runs out of time reached the host; only one that cannot connect counts.
+    [(ConnectionError("ffprobe_unreachable"), 3), (TimeoutError(), 12)],
+)
+async def test_probes_skip_a_host_that_cannot_be_reached(
+    error: OSError, expected_probes: int
+) -> None:
+    probed: list[str] = []
+
+    async def runner(
+        url: str, _headers: dict[str, str], _timeout: float
+    ) -> dict[str, object]:
+        probed.append(url)
+        raise error
+
+    channel = _channel(
+        [{"url": f"https://down.test/{index}", "health": "unchecked"} for index in range(12)]
+    )
+    _, summary = await StreamHealthProcessor(
+        StreamHealthConfig(enabled=True, max_concurrent=1, host_failure_threshold=3),
+        runner,
+    ).enrich([channel])
+
+    assert len(probed) == expected_probes
+    assert summary.unchecked == 12
+
+
+@pytest.mark.parametrize(
+    ("stderr", "error"),
+    [
+        ("Connection refused", ConnectionError),
+        ("Server returned 404 Not Found", OSError),
+        ("https://ssl.example.test/tls:live: Server returned 403 Forbidden", OSError),
+        ("https://ssl.example.test/tls:live: Connection timed out", ConnectionError),
+        ("tls: certificate verify failed", ConnectionError),
+    ],
+)
+async def test_ffprobe_failures_tell_unreachable_hosts_apart(
+    tmp_path: Path, stderr: str, error: type[OSError]
+) -> None:
+    ffprobe = tmp_path / "ffprobe"
+    ffprobe.write_text(f"#!/bin/sh\necho '{stderr}' >&2\nexit 1\n")
+    ffprobe.chmod(0o755)
+    processor = StreamHealthProcessor(StreamHealthConfig(ffprobe_path=str(ffprobe)))
+
+    with pytest.raises(OSError) as raised:
+        await processor._run_ffprobe("https://ssl.example.test/tls:live", {}, 5)
+
+    assert type(raised.value) is error
+
+
+@pytest.mark.asyncio
+async def test_stream_source_records_export_like_the_dicts_they_replace() -> None:
+    async def runner(
+        url: str, _headers: dict[str, str], _timeout: float
+    ) -> dict[str, object]:
+        if url.endswith("error"):
+            raise OSError("fixture failure")
+        return _probe(1080)
+
+    def rows() -> list[dict[str, object]]:
+        return [
+            {
+                "url": f"https://example.test/{name}",
+                "health": "unchecked",
+                "feedId": None,
+                "advertisedQuality": "720p",
+                "quality": "720p",
+                "userAgent": None,
+                "referrer": None,
+                "labelCorrect": False,
+                "framesPerSecond": None,
+                "height": None,
+                "bitrate": None,
+            }
+            for name in ("probed", "error")
+        ]
+
+    exported = []
+    for sources in (rows(), [StreamSource(**row) for row in rows()]):
+        channel = _channel(sources)  # type: ignore[arg-type]
+        channels, _ = await StreamHealthProcessor(
+            StreamHealthConfig(enabled=True), runner
+        ).enrich([channel])
+        exported.append(channels[0].to_dict()["streamSources"])
+
+    # Same keys, values and key order, so the JSON artifact is byte-identical.
+    assert [list(row.items()) for row in exported[1]] == [
+        list(row.items()) for row in exported[0]
+    ]
+
+
+@pytest.mark.asyncio
+async def test_hls_playlists_stand_in_for_ffprobe_when_complete() -> None:
+    probed: list[str] = []
+
+    async def runner(
+        url: str, _headers: dict[str, str], _timeout: float
+    ) -> dict[str, object]:
+        probed.append(url)
+        return _probe(720)
+
+    master = (
+        "#EXTM3U\n"
+        '#EXT-X-STREAM-INF:BANDWIDTH=800000,RESOLUTION=640x360,FRAME-RATE=25,CODECS="avc1.4d401e"\n'
+        "360.m3u8\n"
+        "#EXT-X-STREAM-INF:BANDWIDTH=3000000,RESOLUTION=1920x1080,FRAME-RATE=25,"
+        'CODECS="avc1.640028,mp4a.40.2"\n'
+        "1080.m3u8\n"
+    )
+    channel = _channel(
+        [
+            {"url": "https://example.test/full.m3u8", "health": "unchecked", "quality": "1080p"},
+            {"url": "https://example.test/bare.m3u8", "health": "unchecked"},
+            {"url": "https://example.test/live.ts", "health": "unchecked"},
+        ]
+    )
+    processor = StreamHealthProcessor(StreamHealthConfig(enabled=True, hls_probe=True), runner)
+    with aioresponses() as mocked:
+        mocked.get("https://example.test/full.m3u8", body=master)
+        mocked.get(
+            "https://example.test/bare.m3u8",
+            body="#EXTM3U\n#EXT-X-STREAM-INF:BANDWIDTH=1\na.m3u8\n",
+        )
+        mocked.get("https://example.test/live.ts", content_type="video/mp2t", body=b"\x47")
+        channels, summary = await processor.enrich([channel])
+
+    assert sorted(probed) == ["https://example.test/bare.m3u8", "https://example.test/live.ts"]
+    assert processor.playlist_probes == 1
+    assert summary.available == 3
+    full = next(row for row in channels[0].stream_sources if row["url"].endswith("full.m3u8"))
+    assert (full["width"], full["height"], full["framesPerSecond"]) == (1920, 1080, 25.0)
+    assert (full["videoCodec"], full["audioCodec"]) == ("h264", "aac")
+    assert full["lowFramerate"] is True
+    assert full["mislabeled"] is False
+
+
+@pytest.mark.parametrize(
+    ("error", "expected_probes"),
+    [(aiohttp.ConnectionTimeoutError(), []), (aiohttp.SocketTimeoutError(), ["live.m3u8"])],
+)
+async def test_only_playlist_connect_timeouts_count_against_the_host(
+    error: Exception, expected_probes: list[str]
+) -> None:
+    probed: list[str] = []
+
+    async def runner(
+        url: str, _headers: dict[str, str], _timeout: float
+    ) -> dict[str, object]:
+        probed.append(url.rsplit("/", 1)[-1])
+        return _probe(720)
+
+    channel = _channel([{"url": "https://slow.test/live.m3u8", "health": "unchecked"}])
+    processor = StreamHealthProcessor(
+        StreamHealthConfig(enabled=True, hls_probe=True, host_failure_threshold=1), runner
+    )
+    with aioresponses() as mocked:
+        mocked.get("https://slow.test/live.m3u8", exception=error)
+        await processor.enrich([channel])
+
+    assert probed == expected_probes
@@ -0,0 +1,207 @@
+"""Tests for the persistent stream check cache."""
+
+import sqlite3
+from pathlib import Path
+
+from aioresponses import aioresponses
+
+from src.models import NormalizedChannel, SourceType, ValidationStatus
+from src.processors.validator import StreamValidator
+from src.utils.config import ValidationConfig
+from src.utils.validation_cache import CachedCheck, CachedRedirect, ValidationCache
+
+STREAM_URL = "https://news.example/live.m3u8"
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _channel() -> NormalizedChannel:
+    return NormalizedChannel(
+        id="News.in",
+        name="News",
+        normalized_name="news",
+        stream_url=STREAM_URL,
+        source=SourceType.M3U,
+    )
+
+
+def test_results_expire_after_their_ttl(tmp_path: Path) -> None:
+    clock = _Clock()
+    path = tmp_path / "checks.sqlite3"
+    cache = ValidationCache(path, positive_ttl_seconds=100, negative_ttl_seconds=10, clock=clock)
+    cache.put("https://live/", "", "valid", True, http_code=200, latency_ms=12.5, redirects=0)
+    cache.put("https://dead/", "", "invalid", False, http_code=404)
+    cache.close()
+
+    clock.now += 50
+    reopened = ValidationCache(path, 100, 10, clock=clock)
+    assert reopened.get("https://live/", "") == CachedCheck(
+        "valid", 200, 12.5, 0, 1_000_000.0
+    )
+    assert reopened.get("https://dead/", "") is None
+    assert reopened.get("https://live/", "User-Agent: Player") is None
+    clock.now += 60
+    assert reopened.get("https://live/", "") is None
+    assert (reopened.hits, reopened.misses) == (1, 3)
+
+
+def test_jitter_only_shortens_lifetimes() -> None:
+    clock = _Clock()
+    draws = iter([0.0, 1.0])
+    cache = ValidationCache(None, 100, 10, jitter=0.5, clock=clock, rng=lambda: next(draws))
+    cache.put("https://a/", "", "valid", True)
+    cache.put("https://b/", "", "valid", True)
+    cache.flush()
+
+    clock.now += 75
+    assert cache.get("https://a/", "") is not None
+    assert cache.get("https://b/", "") is None
+
+
+def test_unreadable_database_is_ignored(tmp_path: Path) -> None:
+    path = tmp_path / "checks.sqlite3"
+    path.write_bytes(b"not a database" * 100)
+    cache = ValidationCache(path, 100, 10)
+
+    assert cache.get("https://a/", "") is None
+    cache.put("https://a/", "", "valid", True)
+    cache.close()
+
+
+def test_tables_of_an_older_schema_are_replaced(tmp_path: Path) -> None:
+    path = tmp_path / "checks.sqlite3"
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE checks (url TEXT, headers TEXT, status TEXT)")
+        connection.execute("INSERT INTO checks VALUES ('https://a/', '', 'valid')")
+    connection.close()
+    cache = ValidationCache(path, 100, 10)
+
+    assert cache.get("https://a/", "") is None
+    cache.put("https://a/", "", "valid", True, latency_ms=80.0)
+    cache.flush()
+    assert cache.get("https://a/", "") is not None
+    cache.close()
+
+
+def test_redirect_observations_count_checks_reaching_one_target(tmp_path: Path) -> None:
+    path = tmp_path / "checks.sqlite3"
+    cache = ValidationCache(path, 100, 10)
+    assert cache.observe_redirect("https://a/", "", "https://cdn/1", ["https://a/"]) == (
+        CachedRedirect("https://cdn/1", ("https://a/",), 1)
+    )
+    cache.close()
+
+    reopened = ValidationCache(path, 100, 10)
+    assert reopened.observe_redirect("https://a/", "", "https://cdn/1", ["https://a/"]) == (
+        CachedRedirect("https://cdn/1", ("https://a/",), 2)
+    )
+    moved = reopened.observe_redirect("https://a/", "", "https://cdn/2", ["https://a/"])
+    assert moved.observations == 1
+    reopened.close()
+
+
+async def test_validator_reuses_cached_results_across_runs(tmp_path: Path) -> None:
+    path = tmp_path / "checks.sqlite3"
+    config = ValidationConfig(retry_once=False)
+    requests_per_run = []
+    for _ in range(2):
+        cache = ValidationCache(path, positive_ttl_seconds=3600, negative_ttl_seconds=3600)
+        validator = StreamValidator(config, cache=cache)
+        channel = _channel()
+        with aioresponses() as mocked:
+            mocked.head(STREAM_URL, status=404)
+            _, dead = await validator.validate([channel])
+            requests_per_run.append(len(mocked.requests))
+        cache.close()
+        assert dead == 1
+        assert channel.validation_status == ValidationStatus.INVALID
+
+    assert requests_per_run == [1, 0]
+    assert validator.cached_results == 1
+
+
+async def test_throttled_results_are_not_cached(tmp_path: Path) -> None:
+    cache = ValidationCache(None, positive_ttl_seconds=3600, negative_ttl_seconds=3600)
+    validator = StreamValidator(ValidationConfig(retry_once=False, throttle_retries=1), cache=cache)
+
+    with aioresponses() as mocked:
+        for _ in range(2):
+            mocked.head(STREAM_URL, status=429, headers={"Retry-After": "0"})
+        await validator.validate([_channel()])
+
+    assert cache.get(STREAM_URL, "User-Agent: IPTV-Sanity-Agent/1.0") is None
+
+
+async def test_cached_live_results_do_not_count_towards_a_stable_redirect(
+    tmp_path: Path,
+) -> None:
+    path = tmp_path / "checks.sqlite3"
+    target = "https://cdn.example/a.m3u8"
+    stable = []
+    for _ in range(3):
+        cache = ValidationCache(path, positive_ttl_seconds=3600, negative_ttl_seconds=3600)
+        validator = StreamValidator(ValidationConfig(retry_once=False), cache=cache)
+        channel = _channel()
+        with aioresponses() as mocked:
+            mocked.head(STREAM_URL, status=302, headers={"Location": target})
+            mocked.get(target, status=200)
+            await validator.validate([channel])
+        cache.close()
+        stable.append(channel.extra_attrs["redirect_stable"])
+
+    # One real check, then cached hits that re-apply its target only.
+    assert validator.cached_results == 1
+    assert channel.extra_attrs["resolved_url"] == target
+    assert stable == [False, False, False]
+    assert cache.redirect(STREAM_URL, "User-Agent: IPTV-Sanity-Agent/1.0").observations == 1
+
+
+async def test_redirected_live_results_expire_with_the_negative_ttl(tmp_path: Path) -> None:
+    path = tmp_path / "checks.sqlite3"
+    target = "https://cdn.example/a.m3u8"
+    stable = []
+    cached_results = []
+    for _ in range(2):
+        cache = ValidationCache(path, positive_ttl_seconds=3600, negative_ttl_seconds=0)
+        validator = StreamValidator(ValidationConfig(retry_once=False), cache=cache)
+        channel = _channel()
+        with aioresponses() as mocked:
+            mocked.head(STREAM_URL, status=302, headers={"Location": target})
+            mocked.get(target, status=200)
+            await validator.validate([channel])
+        cache.close()
+        stable.append(channel.extra_attrs["redirect_stable"])
+        cached_results.append(validator.cached_results)
+
+    assert cached_results == [0, 0]
+    assert stable == [False, True]
+
+
+async def test_only_redirects_stable_across_checks_are_marked(tmp_path: Path) -> None:
+    path = tmp_path / "checks.sqlite3"
+    config = ValidationConfig(retry_once=False, stable_redirect_checks=2)
+    first, second = "https://cdn.example/a.m3u8", "https://cdn.example/b.m3u8"
+    targets = [first, first, second]
+    stable = []
+    for target in targets:
+        # Live results are not kept, so every run checks the stream again.
+        cache = ValidationCache(path, positive_ttl_seconds=0, negative_ttl_seconds=0)
+        validator = StreamValidator(config, cache=cache)
+        channel = _channel()
+        with aioresponses() as mocked:
+            mocked.head(STREAM_URL, status=302, headers={"Location": target})
+            mocked.get(target, status=200)
+            await validator.validate([channel])
+        cache.close()
+        assert channel.extra_attrs["resolved_url"] == target
+        assert channel.extra_attrs["redirect_chain"] == [STREAM_URL]
+        stable.append(channel.extra_attrs["redirect_stable"])
+
+    assert stable == [False, True, False]
+    assert validator.changed_redirects == 1
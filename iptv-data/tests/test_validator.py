@@ -0,0 +1,278 @@
+"""Tests for stream URL validation."""
+
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Any
+
+import aiohttp
+import pytest
+from aioresponses import CallbackResult, aioresponses
+
+from src.models import ChannelHeaders, NormalizedChannel, SourceType, ValidationStatus
+from src.processors.validator import StreamValidator, canonical_url
+from src.utils.config import ValidationConfig
+
+
+def _channel(name: str) -> NormalizedChannel:
+    return NormalizedChannel(
+        id=name,
+        name=name,
+        normalized_name=name,
+        stream_url=f"https://{name}.example/live.m3u8",
+        source=SourceType.M3U,
+    )
+
+
+async def test_validate_stream_checks_channels_as_they_arrive() -> None:
+    validator = StreamValidator(ValidationConfig(retry_once=False))
+    first_checked = asyncio.Event()
+
+    async def live(_url: Any, **_kwargs: Any) -> CallbackResult:
+        first_checked.set()
+        return CallbackResult(status=200)
+
+    async def produce() -> AsyncIterator[NormalizedChannel]:
+        yield _channel("live")
+        # The second channel is only produced once the first check has run.
+        await asyncio.wait_for(first_checked.wait(), timeout=1)
+        yield _channel("dead")
+
+    with aioresponses() as mocked:
+        mocked.head("https://live.example/live.m3u8", callback=live)
+        mocked.head("https://dead.example/live.m3u8", status=404)
+        channels, dead_count = await validator.validate_stream(produce())
+
+    assert [(c.name, c.validation_status) for c in channels] == [
+        ("live", ValidationStatus.VALID),
+        ("dead", ValidationStatus.INVALID),
+    ]
+    assert dead_count == 1
+
+
+async def test_validate_stream_passes_through_when_disabled() -> None:
+    validator = StreamValidator(ValidationConfig(enabled=False))
+
+    async def produce() -> AsyncIterator[NormalizedChannel]:
+        yield _channel("a")
+
+    channels, dead_count = await validator.validate_stream(produce())
+
+    assert [c.validation_status for c in channels] == [ValidationStatus.UNKNOWN]
+    assert dead_count == 0
+
+
+async def test_checks_share_one_pooled_session(monkeypatch: Any) -> None:
+    config = ValidationConfig(connection_limit=8, connection_limit_per_host=2)
+    validator = StreamValidator(config)
+    connectors: list[aiohttp.TCPConnector] = []
+    session_class = aiohttp.ClientSession
+
+    def counting_session(*args: Any, **kwargs: Any) -> aiohttp.ClientSession:
+        connectors.append(kwargs["connector"])
+        return session_class(*args, **kwargs)
+
+    monkeypatch.setattr(aiohttp, "ClientSession", counting_session)
+    channels = [_channel("live"), _channel("dead"), _channel("other")]
+    with aioresponses() as mocked:
+        mocked.head("https://live.example/live.m3u8", status=200)
+        mocked.head("https://dead.example/live.m3u8", status=404)
+        mocked.head("https://dead.example/live.m3u8", status=404)
+        mocked.head("https://other.example/live.m3u8", status=200)
+        valid, dead = await validator.validate(channels)
+
+    assert (len(valid), dead) == (3, 1)
+    assert len(connectors) == 1
+    assert (connectors[0].limit, connectors[0].limit_per_host) == (8, 2)
+    assert validator._session is None
+
+
+async def test_throttled_stream_is_rechecked_after_retry_after() -> None:
+    validator = StreamValidator(ValidationConfig(retry_once=False))
+    channel = _channel("busy")
+
+    with aioresponses() as mocked:
+        mocked.head("https://busy.example/live.m3u8", status=429, headers={"Retry-After": "0"})
+        mocked.head("https://busy.example/live.m3u8", status=200)
+        _, dead = await validator.validate([channel])
+
+    assert dead == 0
+    assert channel.validation_status == ValidationStatus.VALID
+
+
+async def test_long_retry_after_is_not_waited_out() -> None:
+    validator = StreamValidator(ValidationConfig(retry_once=False, max_retry_after_seconds=5))
+    channel = _channel("busy")
+
+    with aioresponses() as mocked:
+        mocked.head("https://busy.example/live.m3u8", status=429, headers={"Retry-After": "60"})
+        _, dead = await validator.validate([channel])
+        assert len(mocked.requests) == 1
+
+    assert dead == 1
+    assert channel.validation_status == ValidationStatus.INVALID
+
+
+async def test_budget_leaves_pending_checks_unchecked() -> None:
+    validator = StreamValidator(ValidationConfig(retry_once=False, global_budget_seconds=0.05))
+    fast, slow = _channel("fast"), _channel("slow")
+
+    async def stall(_url: Any, **_kwargs: Any) -> CallbackResult:
+        await asyncio.sleep(1)
+        return CallbackResult(status=200)
+
+    with aioresponses() as mocked:
+        mocked.head("https://fast.example/live.m3u8", status=200)
+        mocked.head("https://slow.example/live.m3u8", callback=stall)
+        _, dead = await validator.validate([fast, slow])
+
+    assert dead == 0
+    assert fast.validation_status == ValidationStatus.VALID
+    assert slow.validation_status == ValidationStatus.UNCHECKED
+
+
+async def test_stream_arrivals_after_the_budget_stay_unchecked() -> None:
+    validator = StreamValidator(ValidationConfig(retry_once=False, global_budget_seconds=0.05))
+
+    async def produce() -> AsyncIterator[NormalizedChannel]:
+        yield _channel("early")
+        await asyncio.sleep(0.1)
+        yield _channel("late")
+
+    with aioresponses() as mocked:
+        mocked.head("https://early.example/live.m3u8", status=200)
+        channels, dead = await validator.validate_stream(produce())
+
+    assert dead == 0
+    assert [channel.validation_status for channel in channels] == [
+        ValidationStatus.VALID,
+        ValidationStatus.UNCHECKED,
+    ]
+
+
+async def test_valuable_channels_are_checked_first() -> None:
+    validator = StreamValidator(
+        ValidationConfig(retry_once=False, max_concurrent=1), target_countries=["IN"]
+    )
+    foreign = _channel("foreign")
+    foreign.country = "US"
+    duplicated = _channel("duplicated")
+    duplicated_twin = _channel("twin")
+    duplicated_twin.normalized_name = duplicated.normalized_name
+    unique = _channel("unique")
+    main_feed = _channel("main")
+    main_feed.country = "US"
+    main_feed.extra_attrs["is_main_feed"] = True
+    checked: list[str] = []
+
+    async def record(url: Any, **_kwargs: Any) -> CallbackResult:
+        checked.append(str(url).split("//")[1].split(".")[0])
+        return CallbackResult(status=200)
+
+    channels = [foreign, duplicated, duplicated_twin, unique, main_feed]
+    with aioresponses() as mocked:
+        for channel in channels:
+            mocked.head(channel.stream_url, callback=record)
+        await validator.validate(channels)
+
+    assert checked == ["main", "unique", "duplicated", "twin", "foreign"]
+
+
+@pytest.mark.parametrize(
+    ("url", "canonical"),
+    [
+        ("HTTPS://CDN.Example:443/Live.m3u8#t=1", "https://cdn.example/Live.m3u8"),
+        ("http://cdn.example:8080", "http://cdn.example:8080/"),
+        ("http://user:pw@CDN.example:80/a?b=1", "http://user:pw@cdn.example/a?b=1"),
+        ("http://[::1]:80/a", "http://[::1]/a"),
+        ("http://cdn.example:bad/a", "http://cdn.example:bad/a"),
+    ],
+)
+def test_canonical_url(url: str, canonical: str) -> None:
+    assert canonical_url(url) == canonical
+
+
+async def test_each_unique_request_is_checked_once() -> None:
+    validator = StreamValidator(ValidationConfig(retry_once=False))
+    first = _channel("shared")
+    respelled = _channel("respelled")
+    respelled.stream_url = "HTTPS://Shared.example:443/live.m3u8#start"
+    with_headers = _channel("headers")
+    with_headers.stream_url = first.stream_url
+    with_headers.headers = ChannelHeaders(user_agent="Player/1.0")
+
+    with aioresponses() as mocked:
+        mocked.head(first.stream_url, status=404)
+        mocked.head(first.stream_url, status=200)
+        _, dead = await validator.validate([first, respelled, with_headers])
+        requests = sum(len(calls) for calls in mocked.requests.values())
+
+    assert requests == 2
+    assert (validator.unique_requests, validator.saved_requests) == (2, 1)
+    assert dead == 2
+    assert respelled.validation_status == ValidationStatus.INVALID
+    assert with_headers.validation_status == ValidationStatus.VALID
+
+
+async def test_unreachable_host_is_short_circuited() -> None:
+    validator = StreamValidator(ValidationConfig(max_concurrent=1, host_failure_threshold=3))
+    channels = [_channel("down") for _ in range(8)]
+    for index, channel in enumerate(channels):
+        channel.stream_url = f"https://down.example/{index}.m3u8"
+
+    with aioresponses() as mocked:
+        for channel in channels:
+            mocked.head(
+                channel.stream_url,
+                exception=aiohttp.ConnectionTimeoutError(),
+                repeat=True,
+            )
+        _, dead = await validator.validate(channels)
+        requests = sum(len(calls) for calls in mocked.requests.values())
+
+    # Two checks with their retries, then the third failure marks the host down.
+    assert requests == 5
+    assert dead == 8
+    assert {channel.validation_status for channel in channels} == {ValidationStatus.TIMEOUT}
+    assert validator.host_health.short_circuited == 5
+
+
+async def test_slow_responses_do_not_mark_a_host_down() -> None:
+    validator = StreamValidator(
+        ValidationConfig(max_concurrent=1, retry_once=False, host_failure_threshold=3)
+    )
+    channels = [_channel("slow") for _ in range(8)]
+    for index, channel in enumerate(channels):
+        channel.stream_url = f"https://slow.example/{index}.m3u8"
+
+    with aioresponses() as mocked:
+        for channel in channels:
+            # The connection was made; the response did not arrive in time.
+            mocked.head(channel.stream_url, exception=aiohttp.SocketTimeoutError())
+        _, dead = await validator.validate(channels)
+        requests = sum(len(calls) for calls in mocked.requests.values())
+
+    assert requests == 8
+    assert dead == 8
+    assert validator.host_health.short_circuited == 0
+
+
+async def test_checks_record_response_time_and_redirects() -> None:
+    validator = StreamValidator(ValidationConfig(retry_once=False))
+    channel, sharer = _channel("moved"), _channel("moved")
+
+    with aioresponses() as mocked:
+        mocked.head(
+            "https://moved.example/live.m3u8",
+            status=302,
+            headers={"Location": "https://cdn.example/live.m3u8"},
+        )
+        # aioresponses follows every redirect with a GET.
+        mocked.get("https://cdn.example/live.m3u8", status=200)
+        await validator.validate([channel, sharer])
+
+    assert channel.validation_status == ValidationStatus.VALID
+    assert channel.extra_attrs["redirects"] == 1
+    assert channel.extra_attrs["response_ms"] >= 0
+    assert {name: sharer.extra_attrs[name] for name in ("response_ms", "redirects")} == {
+        name: channel.extra_attrs[name] for name in ("response_ms", "redirects")
+    }